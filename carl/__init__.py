@@ -4,8 +4,6 @@ __author__ = "Carolin Benjamins, Theresa Eimer, Frederik Schubert, André Bieden
 
 
 import datetime
-import importlib.util as iutil
-import warnings
 
 name = "CARL"
 package_name = "carl-bench"
@@ -28,60 +26,16 @@ try:
 
     from carl import envs
 
-    for e in envs.gymnasium.classic_control.__all__:
-        register(
-            id=f"carl/{e}-v0",
-            entry_point=f"carl.envs.gymnasium.classic_control:{e}",
-        )
-
-    def check_spec(spec_name: str) -> bool:
-        """Check if the spec is installed
-
-        Parameters
-        ----------
-        spec_name : str
-            Name of package that is necessary for the environment suite.
-
-        Returns
-        -------
-        bool
-            Whether the spec was found.
-        """
-        spec = iutil.find_spec(spec_name)
-        found = spec is not None
-        if not found:
-            with warnings.catch_warnings():
-                warnings.simplefilter("once")
-                warnings.warn(
-                    f"""Module {spec_name} not found. If you want to use these environments,
-                    please follow the installation guide."""
-                )
-        return found
-
-    found = check_spec("Box2D")
-    if found:
-        for e in envs.gymnasium.box2d.__all__:
+    # Entry points are strings, so registering does not import the envs
+    for family in ["classic_control", "box2d", "dmc", "mario"]:
+        _, module, env_names = envs.ENV_FAMILIES[family]
+        for e in env_names:
+            if e not in envs.__all__:  # backend not installed
+                continue
             register(
                 id=f"carl/{e}-v0",
-                entry_point=f"carl.envs.gymnasium.box2d:{e}",
+                entry_point=f"{module}:{e}",
             )
-
-    found = check_spec("dm_control")
-    if found:
-        for e in envs.dmc.__all__:
-            register(
-                id=f"carl/{e}-v0",
-                entry_point=f"carl.envs.dmc:{e}",
-            )
-
-    found = check_spec("py4j")
-    if found:
-        register(
-            id="carl/CARLMarioEnv-v0",
-            entry_point="carl.envs.mario:CARLMarioEnv",
-        )
 except:
-    print(
-        """Gym registration failed - this is normal during installation.
-        After that, please check that gymnasium is installed correctly."""
-    )
+    print("""Gym registration failed - this is normal during installation.
+        After that, please check that gymnasium is installed correctly.""")
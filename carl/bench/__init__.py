@@ -0,0 +1,16 @@
+# flake8: noqa: F401
+from carl.bench.benchmark import (
+    BenchmarkResult,
+    benchmark_env,
+    compare_to_baseline,
+    load_results,
+    run_benchmarks,
+)
+
+__all__ = [
+    "BenchmarkResult",
+    "benchmark_env",
+    "compare_to_baseline",
+    "load_results",
+    "run_benchmarks",
+]
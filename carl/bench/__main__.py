@@ -0,0 +1,110 @@
+"""Benchmark the CARL envs, run `python -m carl.bench --help` for the options."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import argparse
+import json
+import sys
+
+from carl.bench.benchmark import (
+    SELECTORS,
+    BenchmarkResult,
+    compare_to_baseline,
+    load_results,
+    results_to_json,
+    run_benchmarks,
+)
+from carl.envs import ENV_FAMILIES
+
+
+def _print_result(result: BenchmarkResult) -> None:
+    print(
+        f"{result.env:<32} n_contexts={result.n_contexts:<6} "
+        f"selector={result.selector:<12} "
+        f"steps/s={result.steps_per_s:>10.1f} "
+        f"reset={result.reset_latency_s * 1e3:>8.3f}ms "
+        f"switch={result.context_switch_latency_s * 1e3:>8.3f}ms "
+        f"memory={result.memory_per_env_bytes / 2**20:>7.2f}MiB",
+        file=sys.stderr,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m carl.bench",
+        description="Measure steps/s, reset latency, context switch latency and "
+        "memory per env for the installed CARL env families.",
+    )
+    parser.add_argument(
+        "--families",
+        nargs="+",
+        choices=list(ENV_FAMILIES),
+        default=None,
+        help="Env families to benchmark (default: all installed ones).",
+    )
+    parser.add_argument(
+        "--all-envs",
+        action="store_true",
+        help="Benchmark every env of a family instead of only the representative "
+        "one.",
+    )
+    parser.add_argument(
+        "--context-set-sizes", nargs="+", type=int, default=[1, 10, 100]
+    )
+    parser.add_argument("--selectors", nargs="+", choices=list(SELECTORS), default=None)
+    parser.add_argument("--n-steps", type=int, default=1000)
+    parser.add_argument("--n-resets", type=int, default=20)
+    parser.add_argument(
+        "--output", "-o", default=None, help="Write the JSON report to this file."
+    )
+    parser.add_argument(
+        "--baseline", default=None, help="JSON report to compare against."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative change before a metric counts as regression.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        families=args.families,
+        context_set_sizes=args.context_set_sizes,
+        selectors=args.selectors,
+        n_steps=args.n_steps,
+        n_resets=args.n_resets,
+        all_envs=args.all_envs,
+        callback=_print_result,
+    )
+    report = results_to_json(results)
+
+    exit_code = 0
+    if args.baseline is not None:
+        regressions = compare_to_baseline(
+            results, load_results(args.baseline), tolerance=args.tolerance
+        )
+        report["regressions"] = regressions
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['env']} n_contexts={regression['n_contexts']} "
+                f"selector={regression['selector']} {regression['metric']}: "
+                f"{regression['baseline']:.6g} -> {regression['value']:.6g} "
+                f"({regression['change']:+.1%})",
+                file=sys.stderr,
+            )
+        exit_code = int(bool(regressions))
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
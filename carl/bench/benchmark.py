@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Sequence
+
+import dataclasses
+import gc
+import importlib
+import importlib.util as iutil
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+from carl.context.context_space import (
+    NormalFloatContextFeature,
+    UniformFloatContextFeature,
+)
+from carl.context.selection import (
+    AbstractSelector,
+    PrioritizedSelector,
+    RandomSelector,
+    RoundRobinSelector,
+)
+from carl.envs import ENV_FAMILIES
+from carl.envs.carl_env import CARLEnv
+from carl.utils.types import Contexts
+
+# Representative env of each family, benchmarked unless all envs are requested
+REPRESENTATIVE_ENVS: dict[str, str] = {
+    "classic_control": "CARLCartPole",
+    "box2d": "CARLLunarLander",
+    "brax": "CARLBraxInvertedPendulum",
+    "dmc": "CARLDmcPointMassEnv",
+    "mario": "CARLMarioEnv",
+    "rna": "CARLRnaDesignEnv",
+}
+
+SELECTORS: dict[str, type[AbstractSelector]] = {
+    "round_robin": RoundRobinSelector,
+    "random": RandomSelector,
+    "prioritized": PrioritizedSelector,
+}
+
+# Metrics where higher values are better, all others are better if lower
+HIGHER_IS_BETTER = ("steps_per_s",)
+METRICS = (
+    "steps_per_s",
+    "reset_latency_s",
+    "context_switch_latency_s",
+    "memory_per_env_bytes",
+)
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    """Measurements for one env, context set size and selector."""
+
+    env: str
+    family: str
+    n_contexts: int
+    selector: str
+    n_steps: int
+    steps_per_s: float
+    reset_latency_s: float
+    context_switch_latency_s: float
+    memory_per_env_bytes: float
+
+    @property
+    def key(self) -> tuple[str, int, str]:
+        return self.env, self.n_contexts, self.selector
+
+
+def available_env_classes(
+    families: Sequence[str] | None = None, all_envs: bool = False
+) -> list[tuple[str, type[CARLEnv]]]:
+    """Get the env classes of the installed env families.
+
+    Parameters
+    ----------
+    families : Sequence[str] | None, optional
+        Names of the families (see `carl.envs.ENV_FAMILIES`), by default None
+        (all).
+    all_envs : bool, optional
+        Whether to return all envs of a family, by default False. If False,
+        only return the representative env of each family (see
+        `REPRESENTATIVE_ENVS`, the first env if the family has none).
+
+    Returns
+    -------
+    list[tuple[str, type[CARLEnv]]]
+        Family name and env class.
+    """
+    env_classes = []
+    for family in families or ENV_FAMILIES:
+        required, module_name, class_names = ENV_FAMILIES[family]
+        if required is not None and iutil.find_spec(required) is None:
+            continue
+        try:
+            module = importlib.import_module(module_name)
+        except Exception:
+            continue
+        if not all_envs:
+            class_names = [REPRESENTATIVE_ENVS.get(family, class_names[0])]
+        for class_name in class_names:
+            env_class = getattr(module, class_name, None)
+            if env_class is not None:
+                env_classes.append((family, env_class))
+    return env_classes
+
+
+def make_contexts(env_class: type[CARLEnv], n_contexts: int) -> Contexts:
+    """Make a context set by varying one float context feature.
+
+    The feature (gravity if available) is scaled from 0.8 to 1.2 times its
+    default, clipped to its bounds, so every context is valid.
+
+    Parameters
+    ----------
+    env_class : type[CARLEnv]
+        The env class.
+    n_contexts : int
+        Number of contexts.
+
+    Returns
+    -------
+    Contexts
+        Context set.
+    """
+    context_space = env_class.get_context_space()
+    default_context = env_class.get_default_context()
+    float_features = [
+        name
+        for name, cf in context_space.context_space.items()
+        if isinstance(cf, (UniformFloatContextFeature, NormalFloatContextFeature))
+        and name in default_context
+        and default_context[name] != 0
+    ]
+    if not float_features or n_contexts == 1:
+        return {i: dict(default_context) for i in range(n_contexts)}
+    name = "gravity" if "gravity" in float_features else float_features[0]
+    i = context_space.feature_index[name]
+    values = np.clip(
+        default_context[name] * np.linspace(0.8, 1.2, n_contexts),
+        context_space.lower_bounds[i],
+        context_space.upper_bounds[i],
+    )
+    return {
+        j: dict(default_context, **{name: float(value)})
+        for j, value in enumerate(values)
+    }
+
+
+def _run_steps(env: CARLEnv, n_steps: int) -> None:
+    env.reset()
+    for _ in range(n_steps):
+        _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+        if terminated or truncated:
+            env.reset()
+
+
+def benchmark_env(
+    env_class: type[CARLEnv],
+    n_contexts: int,
+    selector: str,
+    n_steps: int = 1000,
+    n_resets: int = 20,
+    family: str = "",
+    env_kwargs: dict | None = None,
+) -> BenchmarkResult:
+    """Benchmark one env class.
+
+    Parameters
+    ----------
+    env_class : type[CARLEnv]
+        The env class.
+    n_contexts : int
+        Size of the context set.
+    selector : str
+        Name of the context selector (see `SELECTORS`).
+    n_steps : int, optional
+        Number of timed steps, by default 1000. The env is reset when an episode ends.
+    n_resets : int, optional
+        Number of timed resets, by default 20.
+    family : str, optional
+        Name of the env family, only used for the result.
+    env_kwargs : dict | None, optional
+        Further keyword arguments for the env.
+
+    Returns
+    -------
+    BenchmarkResult
+        Steps per second, mean reset latency, mean context switch latency
+        (`_update_context`) and the memory allocated by creating and resetting
+        one env. The memory is traced with `tracemalloc`, so memory allocated
+        outside of Python (e.g. by simulators) is not included.
+    """
+    contexts = make_contexts(env_class, n_contexts)
+
+    def make_env() -> CARLEnv:
+        return env_class(
+            contexts=contexts,
+            context_selector=SELECTORS[selector],
+            **(env_kwargs or {}),
+        )
+
+    # Warm up, e.g. for jit compilation and caches shared between envs
+    env = make_env()
+    env.action_space.seed(0)
+    _run_steps(env, min(n_steps, 10))
+
+    gc.collect()
+    tracemalloc.start()
+    other_env = make_env()
+    other_env.reset(seed=0)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    other_env.close()
+    del other_env
+
+    # Timed with plain perf_counter calls, the timing wrappers of
+    # `CARLEnv.enable_timing` would add their own overhead to the latencies
+    start = time.perf_counter()
+    for _ in range(n_resets):
+        env.reset()
+    reset_latency = (time.perf_counter() - start) / n_resets
+    n_updates = 0
+    update_time = 0.0
+    for _ in range(n_resets):
+        last_context_id = env.context_id
+        env._progress_instance()
+        if env.context_id != last_context_id:
+            start = time.perf_counter()
+            env._update_context()
+            update_time += time.perf_counter() - start
+            n_updates += 1
+    context_switch_latency = update_time / n_updates if n_updates else 0.0
+
+    env.reset()
+    start = time.perf_counter()
+    _run_steps(env, n_steps)
+    steps_per_s = n_steps / (time.perf_counter() - start)
+    env.close()
+
+    return BenchmarkResult(
+        env=env_class.__name__,
+        family=family,
+        n_contexts=n_contexts,
+        selector=selector,
+        n_steps=n_steps,
+        steps_per_s=steps_per_s,
+        reset_latency_s=reset_latency,
+        context_switch_latency_s=context_switch_latency,
+        memory_per_env_bytes=float(memory),
+    )
+
+
+def run_benchmarks(
+    families: Sequence[str] | None = None,
+    context_set_sizes: Sequence[int] = (1, 10, 100),
+    selectors: Sequence[str] | None = None,
+    n_steps: int = 1000,
+    n_resets: int = 20,
+    all_envs: bool = False,
+    callback: Callable[[BenchmarkResult], Any] | None = None,
+) -> list[BenchmarkResult]:
+    """Benchmark the installed env families.
+
+    Parameters
+    ----------
+    families : Sequence[str] | None, optional
+        Env families, by default None (all installed ones).
+    context_set_sizes : Sequence[int], optional
+        Sizes of the context sets, by default (1, 10, 100).
+    selectors : Sequence[str] | None, optional
+        Context selectors, by default None (all of `SELECTORS`).
+    n_steps : int, optional
+        Number of timed steps per benchmark, by default 1000.
+    n_resets : int, optional
+        Number of timed resets per benchmark, by default 20.
+    all_envs : bool, optional
+        Whether to benchmark all envs of each family, by default False
+        (only the representative one, see `REPRESENTATIVE_ENVS`).
+    callback : Callable[[BenchmarkResult], Any] | None, optional
+        Called with each result, e.g. to report progress.
+
+    Returns
+    -------
+    list[BenchmarkResult]
+        The results.
+    """
+    if selectors is None:
+        selectors = list(SELECTORS)
+    results = []
+    for family, env_class in available_env_classes(families, all_envs):
+        for n_contexts in context_set_sizes:
+            for selector in selectors:
+                result = benchmark_env(
+                    env_class,
+                    n_contexts=n_contexts,
+                    selector=selector,
+                    n_steps=n_steps,
+                    n_resets=n_resets,
+                    family=family,
+                )
+                results.append(result)
+                if callback is not None:
+                    callback(result)
+    return results
+
+
+def results_to_json(results: Sequence[BenchmarkResult]) -> dict[str, Any]:
+    """Convert results to a JSON serializable report with metadata.
+
+    Parameters
+    ----------
+    results : Sequence[BenchmarkResult]
+        The results.
+
+    Returns
+    -------
+    dict[str, Any]
+        Report with "metadata" and "results".
+    """
+    import carl
+
+    return {
+        "metadata": {
+            "carl_version": carl.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [dataclasses.asdict(result) for result in results],
+    }
+
+
+def load_results(path: str) -> list[BenchmarkResult]:
+    """Load results from a JSON report.
+
+    Parameters
+    ----------
+    path : str
+        Path of the report written by `python -m carl.bench`.
+
+    Returns
+    -------
+    list[BenchmarkResult]
+        The results.
+    """
+    with open(path) as file:
+        report = json.load(file)
+    return [BenchmarkResult(**result) for result in report["results"]]
+
+
+def compare_to_baseline(
+    results: Sequence[BenchmarkResult],
+    baseline: Sequence[BenchmarkResult],
+    tolerance: float = 0.2,
+) -> list[dict[str, Any]]:
+    """Find regressions compared to a baseline.
+
+    Results without a matching baseline (same env, context set size and
+    selector) are skipped.
+
+    Parameters
+    ----------
+    results : Sequence[BenchmarkResult]
+        Current results.
+    baseline : Sequence[BenchmarkResult]
+        Baseline results.
+    tolerance : float, optional
+        Allowed relative change, by default 0.2. For example, with 0.2 the steps
+        per second may drop by 20 % and the latencies and memory may grow by 20 %.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        One entry per regressed metric with env, n_contexts, selector, metric,
+        baseline, value and the relative change.
+    """
+    baseline_by_key = {result.key: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_key.get(result.key)
+        if base is None:
+            continue
+        for metric in METRICS:
+            value, base_value = getattr(result, metric), getattr(base, metric)
+            if base_value <= 0:
+                continue
+            change = (value - base_value) / base_value
+            if metric in HIGHER_IS_BETTER:
+                regressed = change < -tolerance
+            else:
+                regressed = change > tolerance
+            if regressed:
+                regressions.append(
+                    {
+                        "env": result.env,
+                        "n_contexts": result.n_contexts,
+                        "selector": result.selector,
+                        "metric": metric,
+                        "baseline": base_value,
+                        "value": value,
+                        "change": change,
+                    }
+                )
+    return regressions
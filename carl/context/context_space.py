@@ -1,43 +1,464 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Any, Callable, List, Mapping, Sequence
 
 import warnings
+from types import MappingProxyType
 
 import gymnasium.spaces as spaces
 import numpy as np
 from ConfigSpace.hyperparameters import (
     CategoricalHyperparameter,
+    Constant,
     Hyperparameter,
     NormalFloatHyperparameter,
+    NormalIntegerHyperparameter,
     NumericalHyperparameter,
+    OrdinalHyperparameter,
     UniformFloatHyperparameter,
     UniformIntegerHyperparameter,
 )
+from scipy.stats import norm, qmc, truncnorm
 from typing_extensions import TypeAlias
 
 from carl.utils.types import Context, Contexts
 
 warnings.filterwarnings("ignore", message="invalid value encountered in scalar divide")
 
+# Sampling methods: i.i.d. random and quasi-random, space-filling designs
+SAMPLING_METHODS = ("random", "sobol", "halton", "lhs")
+
 ContextFeature: TypeAlias = Hyperparameter
 NumericalContextFeature: TypeAlias = NumericalHyperparameter
 NormalFloatContextFeature: TypeAlias = NormalFloatHyperparameter
+NormalIntegerContextFeature: TypeAlias = NormalIntegerHyperparameter
 UniformFloatContextFeature: TypeAlias = UniformFloatHyperparameter
 UniformIntegerContextFeature: TypeAlias = UniformIntegerHyperparameter
 CategoricalContextFeature: TypeAlias = CategoricalHyperparameter
+# Vectorized predicate over context features: gets the columns of N contexts
+# by feature name (vector encoding) and returns N booleans, True if valid
+ContextConstraint: TypeAlias = Callable[[Mapping[str, np.ndarray]], np.ndarray]
+
+
+def get_feature_bounds(context_feature: ContextFeature) -> tuple[float, float]:
+    """Get the bounds of a context feature in its vector encoding.
+
+    Numerical features are bounded by their lower and upper values (infinite
+    if unset), categorical features by the range of their choice indices.
+
+    Parameters
+    ----------
+    context_feature : ContextFeature
+        The context feature.
+
+    Returns
+    -------
+    tuple[float, float]
+        Lower and upper bound.
+    """
+    if isinstance(context_feature, CategoricalContextFeature):
+        return 0.0, float(context_feature.num_choices - 1)
+    lower = getattr(context_feature, "lower", None)
+    upper = getattr(context_feature, "upper", None)
+    lower = -np.inf if lower is None else float(lower)
+    upper = np.inf if upper is None else float(upper)
+    return lower, upper
+
+
+def get_rng(
+    seed: int | np.random.Generator | None = None,
+) -> np.random.Generator:
+    """Get a numpy random generator.
+
+    Parameters
+    ----------
+    seed : int | np.random.Generator | None, optional
+        Seed or generator, by default None. If None, the generator is seeded
+        with fresh OS entropy, which leaves numpy's global random state
+        untouched.
+
+    Returns
+    -------
+    np.random.Generator
+        Random generator.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def sample_feature_values(
+    context_feature: ContextFeature, size: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Sample values of a context feature in its vector encoding.
+
+    Uniform, normal (also truncated), integer, categorical, ordinal and
+    constant features are sampled vectorized with numpy, other feature types
+    (e.g. beta distributions) via ConfigSpace. Categorical features are
+    encoded as the index of the choice, all others by their value.
+
+    Parameters
+    ----------
+    context_feature : ContextFeature
+        The context feature (distribution) to sample from.
+    size : int
+        Number of samples.
+    rng : np.random.Generator
+        Random generator.
+
+    Returns
+    -------
+    np.ndarray
+        Float array of shape (size,).
+
+    Raises
+    ------
+    TypeError
+        If the values of a non-categorical feature are not numbers.
+    """
+    cf = context_feature
+    if isinstance(cf, CategoricalContextFeature):
+        return rng.choice(cf.num_choices, size=size, p=cf.probabilities).astype(
+            np.float64
+        )
+
+    if isinstance(cf, (UniformFloatContextFeature, UniformIntegerContextFeature)):
+        is_integer = isinstance(cf, UniformIntegerContextFeature)
+        if is_integer and not cf.log:
+            return rng.integers(cf.lower, cf.upper, size=size, endpoint=True).astype(
+                np.float64
+            )
+        lower, upper = float(cf.lower), float(cf.upper)
+        if is_integer:
+            # Same as ConfigSpace: every integer gets an equally wide interval
+            lower, upper = lower - 0.4999, upper + 0.4999
+        if cf.log:
+            lower, upper = np.log(lower), np.log(upper)
+        # Like ConfigSpace, unbounded features yield infinite values
+        with np.errstate(over="ignore", invalid="ignore"):
+            values = lower + (upper - lower) * rng.random(size=size)
+        if cf.log:
+            values = np.exp(values)
+    elif isinstance(cf, (NormalFloatContextFeature, NormalIntegerContextFeature)):
+        lower = -np.inf if cf.lower is None else float(cf.lower)
+        upper = np.inf if cf.upper is None else float(cf.upper)
+        if cf.log:
+            lower, upper = np.log(lower), np.log(upper)
+        if cf.sigma == 0:
+            values = np.full(size, float(cf.mu))
+        elif np.isfinite(lower) or np.isfinite(upper):
+            a = (lower - cf.mu) / cf.sigma
+            b = (upper - cf.mu) / cf.sigma
+            values = truncnorm.rvs(
+                a, b, loc=cf.mu, scale=cf.sigma, size=size, random_state=rng
+            )
+        else:
+            values = rng.normal(cf.mu, cf.sigma, size=size)
+        if cf.log:
+            values = np.exp(values)
+    else:
+        if isinstance(cf, OrdinalHyperparameter):
+            values = np.asarray(cf.sequence)[rng.integers(cf.num_elements, size=size)]
+        elif isinstance(cf, Constant):
+            values = np.full(size, cf.value)
+        else:
+            random_state = np.random.RandomState(rng.integers(2**31))
+            values = np.atleast_1d(cf.rvs(size=size, random_state=random_state))
+        if values.shape != (size,) or not np.issubdtype(values.dtype, np.number):
+            raise TypeError(
+                f"Values of the {type(cf).__name__} `{cf.name}` cannot be encoded "
+                "as floats."
+            )
+        return values.astype(np.float64)
+
+    q = getattr(cf, "q", None)
+    if q is not None:
+        values = np.round(values / q) * q
+    if isinstance(cf, (UniformIntegerContextFeature, NormalIntegerContextFeature)):
+        values = np.round(values)
+    return values
+
+
+def sample_unit_cube(
+    method: str, size: int, n_dims: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Sample points in the unit hypercube.
+
+    Parameters
+    ----------
+    method : str
+        One of `SAMPLING_METHODS`. "sobol" and "halton" are scrambled
+        low-discrepancy sequences, "lhs" is Latin hypercube sampling.
+        Sobol points are best balanced if `size` is a power of two.
+    size : int
+        Number of points.
+    n_dims : int
+        Number of dimensions.
+    rng : np.random.Generator
+        Random generator (for the scrambling).
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (size, n_dims) with values in [0, 1).
+
+    Raises
+    ------
+    ValueError
+        When the method is unknown.
+    """
+    if method == "random":
+        return rng.random((size, n_dims))
+    return make_unit_cube_sampler(method, n_dims, rng)(size)
+
+
+def make_unit_cube_sampler(
+    method: str, n_dims: int, rng: np.random.Generator
+) -> Callable[[int], np.ndarray]:
+    """Make a function drawing points in the unit hypercube.
+
+    For the quasi-random methods, successive calls continue the same
+    sequence (or draw a new Latin hypercube), e.g. to replace rejected points.
+
+    Parameters
+    ----------
+    method : str
+        One of `SAMPLING_METHODS` (see `sample_unit_cube`).
+    n_dims : int
+        Number of dimensions.
+    rng : np.random.Generator
+        Random generator.
+
+    Returns
+    -------
+    Callable[[int], np.ndarray]
+        Gets the number of points and returns an array of shape (size, n_dims).
+
+    Raises
+    ------
+    ValueError
+        When the method is unknown.
+    """
+    if method == "random":
+        return lambda size: rng.random((size, n_dims))
+    if method == "sobol":
+        engine = qmc.Sobol(max(n_dims, 1), scramble=True, seed=rng)
+    elif method == "halton":
+        engine = qmc.Halton(max(n_dims, 1), scramble=True, seed=rng)
+    elif method == "lhs":
+        engine = qmc.LatinHypercube(max(n_dims, 1), seed=rng)
+    else:
+        raise ValueError(
+            f"Unknown sampling method `{method}`, choose one of {SAMPLING_METHODS}."
+        )
+
+    def draw(size: int) -> np.ndarray:
+        if size == 0 or n_dims == 0:
+            return np.empty((size, n_dims))
+        return engine.random(size)
+
+    return draw
+
+
+def feature_values_from_unit(
+    context_feature: ContextFeature, unit_values: np.ndarray
+) -> np.ndarray:
+    """Map values in [0, 1) to values of a context feature in its vector encoding.
+
+    This is the inverse of the feature's distribution function, so uniformly
+    spread unit values (e.g. from `sample_unit_cube`) stay spread over the
+    distribution. Log-scale features are spread in log space, integer and
+    categorical features get equally wide (categorical: probability weighted)
+    intervals of the unit interval.
+
+    Parameters
+    ----------
+    context_feature : ContextFeature
+        The context feature (distribution). Uniform, normal (also truncated),
+        integer and categorical features are supported.
+    unit_values : np.ndarray
+        Values in [0, 1).
+
+    Returns
+    -------
+    np.ndarray
+        Float array of the same shape.
+
+    Raises
+    ------
+    ValueError
+        When the feature type is not supported.
+    """
+    cf = context_feature
+    u = np.asarray(unit_values, dtype=np.float64)
+    if isinstance(cf, CategoricalContextFeature):
+        probabilities = cf.probabilities
+        if probabilities is None:
+            probabilities = np.full(cf.num_choices, 1 / cf.num_choices)
+        cumulative = np.cumsum(probabilities)
+        index = np.searchsorted(cumulative / cumulative[-1], u, side="right")
+        return np.minimum(index, cf.num_choices - 1).astype(np.float64)
+
+    if isinstance(cf, (UniformFloatContextFeature, UniformIntegerContextFeature)):
+        is_integer = isinstance(cf, UniformIntegerContextFeature)
+        if is_integer and not cf.log:
+            values = np.floor(cf.lower + u * (cf.upper - cf.lower + 1))
+            return np.minimum(values, cf.upper)
+        lower, upper = float(cf.lower), float(cf.upper)
+        if is_integer:
+            lower, upper = lower - 0.4999, upper + 0.4999
+        if cf.log:
+            lower, upper = np.log(lower), np.log(upper)
+        with np.errstate(over="ignore", invalid="ignore"):
+            values = lower + (upper - lower) * u
+        if cf.log:
+            values = np.exp(values)
+    elif isinstance(cf, (NormalFloatContextFeature, NormalIntegerContextFeature)):
+        lower = -np.inf if cf.lower is None else float(cf.lower)
+        upper = np.inf if cf.upper is None else float(cf.upper)
+        if cf.log:
+            lower, upper = np.log(lower), np.log(upper)
+        if cf.sigma == 0:
+            values = np.full(u.shape, float(cf.mu))
+        elif np.isfinite(lower) or np.isfinite(upper):
+            a = (lower - cf.mu) / cf.sigma
+            b = (upper - cf.mu) / cf.sigma
+            values = truncnorm.ppf(u, a, b, loc=cf.mu, scale=cf.sigma)
+        else:
+            values = norm.ppf(u, loc=cf.mu, scale=cf.sigma)
+        if cf.log:
+            values = np.exp(values)
+    else:
+        raise ValueError(
+            f"Context feature type `{type(cf).__name__}` is not supported for "
+            "quasi-random sampling."
+        )
+
+    q = getattr(cf, "q", None)
+    if q is not None:
+        values = np.round(values / q) * q
+    if isinstance(cf, (UniformIntegerContextFeature, NormalIntegerContextFeature)):
+        values = np.round(values)
+    return values
 
 
 class ContextSpace(object):
-    def __init__(self, context_space: dict[str, ContextFeature]) -> None:
+    def __init__(
+        self,
+        context_space: Mapping[str, ContextFeature],
+        constraints: Sequence[ContextConstraint] = (),
+    ) -> None:
         """Context space
 
+        The context space is immutable after construction. Defaults, bounds
+        and the feature index are computed once so that they can be queried
+        cheaply, e.g. on every reset.
+
         Parameters
         ----------
-        context_space : dict[str, ContextFeature]
+        context_space : Mapping[str, ContextFeature]
             Raw definition of the context space.
+        constraints : Sequence[ContextConstraint], optional
+            Constraints between context features, by default none. Each is a
+            vectorized predicate getting the columns of a batch of contexts by
+            feature name (in the vector encoding, i.e. categorical features as
+            choice indices) and returning True for valid contexts. They are
+            checked by `verify_context(s)` and sampling only returns contexts
+            satisfying them. Use module-level functions rather than lambdas,
+            else the context space cannot be pickled.
+
+        Attributes
+        ----------
+        context_space : Mapping[str, ContextFeature]
+            Read-only definition of the context space.
+        default_context : Mapping[str, Any]
+            Read-only default context.
+        default_vector : np.ndarray
+            Read-only default context in the vector encoding.
+        feature_index : Mapping[str, int]
+            Position of each context feature in the feature order.
+        constraints : tuple[ContextConstraint, ...]
+            Constraints between context features.
+        lower_bounds : np.ndarray
+            Read-only lower bounds of all context features (see `get_feature_bounds`).
+        upper_bounds : np.ndarray
+            Read-only upper bounds of all context features (see `get_feature_bounds`).
         """
-        self.context_space = context_space
+        context_space = dict(context_space)
+        bounds = np.array(
+            [get_feature_bounds(cf) for cf in context_space.values()], dtype=np.float64
+        ).reshape(-1, 2)
+        lower_bounds = np.ascontiguousarray(bounds[:, 0])
+        upper_bounds = np.ascontiguousarray(bounds[:, 1])
+        lower_bounds.flags.writeable = False
+        upper_bounds.flags.writeable = False
+
+        object.__setattr__(self, "context_space", MappingProxyType(context_space))
+        object.__setattr__(
+            self,
+            "default_context",
+            MappingProxyType(
+                {cf.name: cf.default_value for cf in context_space.values()}
+            ),
+        )
+        object.__setattr__(
+            self,
+            "feature_index",
+            MappingProxyType({name: i for i, name in enumerate(context_space)}),
+        )
+        object.__setattr__(self, "constraints", tuple(constraints))
+        object.__setattr__(self, "lower_bounds", lower_bounds)
+        object.__setattr__(self, "upper_bounds", upper_bounds)
+        object.__setattr__(
+            self,
+            "_choice_indices",
+            MappingProxyType(
+                {
+                    name: {choice: i for i, choice in enumerate(cf.choices)}
+                    for name, cf in context_space.items()
+                    if isinstance(cf, CategoricalContextFeature)
+                }
+            ),
+        )
+        object.__setattr__(
+            self,
+            "_integral_mask",
+            np.array(
+                [
+                    isinstance(
+                        cf,
+                        (
+                            CategoricalContextFeature,
+                            UniformIntegerContextFeature,
+                            NormalIntegerContextFeature,
+                        ),
+                    )
+                    for cf in context_space.values()
+                ],
+                dtype=bool,
+            ),
+        )
+        # Keyed like the context space: a feature's name may differ from its key
+        default_vector = self.encode_context(
+            {name: cf.default_value for name, cf in context_space.items()}
+        )
+        default_vector.flags.writeable = False
+        object.__setattr__(self, "default_vector", default_vector)
+
+    def __reduce__(self) -> tuple:
+        # Mapping proxies cannot be pickled, rebuild the space from its definition
+        return (type(self), (dict(self.context_space), self.constraints))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    @property
+    def n_features(self) -> int:
+        """Number of context features."""
+        return len(self.context_space)
 
     @property
     def context_feature_names(self) -> list[str]:
@@ -82,8 +503,8 @@ class ContextSpace(object):
     def verify_context(self, context: Context) -> bool:
         """Verify context.
 
-        Check if context feature names are correct and the
-        values are in bounds.
+        Check if context feature names are correct, the
+        values are in bounds and the constraints are satisfied.
 
         Parameters
         ----------
@@ -96,11 +517,10 @@ class ContextSpace(object):
             True if valid, False if not.
         """
         is_valid = True
-        cfs = self.context_feature_names
         for cfname, v in context.items():
             # Check if context feature exists in space
             # by checking name
-            if cfname not in cfs:
+            if cfname not in self.feature_index:
                 is_valid = False
                 break
 
@@ -110,6 +530,9 @@ class ContextSpace(object):
                 if not (cf.lower <= v <= cf.upper):
                     is_valid = False
                     break
+        if is_valid and self.constraints:
+            # Missing features are checked with their defaults
+            is_valid = bool(self.check_constraints(self.encode_context(context))[0])
         return is_valid
 
     def get_default_context(self) -> Context:
@@ -120,7 +543,7 @@ class ContextSpace(object):
         Context
             Default context.
         """
-        context = {cf.name: cf.default_value for cf in self.context_space.values()}
+        context = dict(self.default_context)
         return context
 
     def get_lower_and_upper_bound(
@@ -178,18 +601,19 @@ class ContextSpace(object):
                     )
             return spaces.Dict(context_space)
         else:
-            low = np.array(
-                [self.context_space[cf].lower for cf in context_feature_names]
-            )
-            high = np.array(
-                [self.context_space[cf].upper for cf in context_feature_names]
-            )
+            idx = [self.feature_index[cf] for cf in context_feature_names]
+            low = self.lower_bounds[idx]
+            high = self.upper_bounds[idx]
 
             return spaces.Box(low=low, high=high, dtype=np.float32)
 
     def sample_contexts(
-        self, context_keys: List[str] | None = None, size: int = 1
-    ) -> Context | List[Contexts]:
+        self,
+        context_keys: List[str] | None = None,
+        size: int = 1,
+        seed: int | np.random.Generator | None = None,
+        method: str = "random",
+    ) -> Context | List[Context]:
         """Sample a number of contexts from the space.
 
         Parameters
@@ -198,10 +622,14 @@ class ContextSpace(object):
             The context feature names to sample for, by default None
         size : int, optional
             The number of contexts to sample, by default 1
+        seed : int | np.random.Generator | None, optional
+            Seed or random generator, by default None (see `get_rng`).
+        method : str, optional
+            Sampling method, by default "random" (see `sample_context_array`).
 
         Returns
         -------
-        Context | List[Contexts]
+        Context | List[Context]
             A context or list of contexts. Always filled with defaults
             if context features missing.
 
@@ -210,20 +638,393 @@ class ContextSpace(object):
         ValueError
             When elements of context_keys are not valid.
         """
-        if context_keys is None:
-            context_keys = self.context_space.keys()
-        else:
-            for key in context_keys:
-                if key not in self.context_space.keys():
-                    raise ValueError(f"Invalid context feature name: {key}")
-
-        contexts = []
-        for _ in range(size):
-            context = {cf.name: cf.rvs() for cf in self.context_space.values()}
-            context = self.insert_defaults(context, context_keys)
-            contexts += [context]
+        values = self.sample_context_array(
+            context_keys=context_keys, size=size, seed=seed, method=method
+        )
+        contexts = self.decode_contexts(values)
 
         if size == 1:
             return contexts[0]
         else:
             return contexts
+
+    def get_feature_indices(
+        self, context_keys: Sequence[str] | None = None
+    ) -> np.ndarray:
+        """Get the positions of context features in the vector encoding.
+
+        Parameters
+        ----------
+        context_keys : Sequence[str] | None, optional
+            Context feature names, by default None. If None, use all features.
+
+        Returns
+        -------
+        np.ndarray
+            Integer indices.
+
+        Raises
+        ------
+        ValueError
+            When elements of context_keys are not valid.
+        """
+        if context_keys is None:
+            return np.arange(self.n_features)
+        for key in context_keys:
+            if key not in self.feature_index:
+                raise ValueError(f"Invalid context feature name: {key}")
+        return np.array([self.feature_index[key] for key in context_keys], dtype=int)
+
+    def encode_context(self, context: Mapping[str, Any]) -> np.ndarray:
+        """Encode a context as a vector.
+
+        The vector holds the features in the order of the context space.
+        Categorical features are encoded as the index of their choice,
+        missing features as their default.
+
+        Parameters
+        ----------
+        context : Mapping[str, Any]
+            The context.
+
+        Returns
+        -------
+        np.ndarray
+            Float vector of shape (n_features,).
+        """
+        vector = np.empty(self.n_features, dtype=np.float64)
+        for name, i in self.feature_index.items():
+            if name not in context:
+                vector[i] = self.default_vector[i]
+                continue
+            value = context[name]
+            choice_index = self._choice_indices.get(name)
+            vector[i] = value if choice_index is None else choice_index[value]
+        return vector
+
+    def encode_contexts(
+        self, contexts: Contexts | Sequence[Context] | Mapping[Any, Mapping[str, Any]]
+    ) -> np.ndarray:
+        """Encode contexts as an N x F array (see `encode_context`).
+
+        A `ContextTable` is encoded column by column.
+
+        Parameters
+        ----------
+        contexts : Contexts | Sequence[Context] | ContextTable
+            Context set, list of contexts or context table.
+
+        Returns
+        -------
+        np.ndarray
+            Float array of shape (n_contexts, n_features).
+        """
+        columns = getattr(contexts, "columns", None)
+        if columns is None:
+            if isinstance(contexts, Mapping):
+                contexts = list(contexts.values())
+            values = np.empty((len(contexts), self.n_features), dtype=np.float64)
+            for i, context in enumerate(contexts):
+                values[i] = self.encode_context(context)
+            return values
+
+        values = np.empty((len(contexts), self.n_features), dtype=np.float64)
+        values[:] = self.default_vector
+        for name, i in self.feature_index.items():
+            if name not in columns:
+                continue
+            column = columns[name]
+            choice_index = self._choice_indices.get(name)
+            if choice_index is None:
+                values[:, i] = column
+            else:
+                values[:, i] = np.fromiter(
+                    (choice_index[v] for v in column),
+                    dtype=np.float64,
+                    count=len(column),
+                )
+        return values
+
+    def decode_context(self, vector: np.ndarray) -> Context:
+        """Decode a context vector to a context (inverse of `encode_context`).
+
+        Parameters
+        ----------
+        vector : np.ndarray
+            Vector of shape (n_features,).
+
+        Returns
+        -------
+        Context
+            The context.
+        """
+        context = {}
+        for name, value in zip(self.context_space, vector.tolist()):
+            cf = self.context_space[name]
+            if isinstance(cf, CategoricalContextFeature):
+                value = cf.choices[int(value)]
+            elif isinstance(
+                cf, (UniformIntegerContextFeature, NormalIntegerContextFeature)
+            ):
+                value = int(round(value))
+            context[name] = value
+        return context
+
+    def decode_contexts(self, values: np.ndarray) -> List[Context]:
+        """Decode an N x F array to a list of contexts.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Array of shape (n_contexts, n_features).
+
+        Returns
+        -------
+        List[Context]
+            The contexts.
+        """
+        return [self.decode_context(vector) for vector in values]
+
+    def insert_defaults_batch(
+        self, values: np.ndarray, context_keys: Sequence[str] | None = None
+    ) -> np.ndarray:
+        """Insert defaults into a batch of context vectors.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Array of shape (n_contexts, len(context_keys)). NaN entries are
+            treated as missing.
+        context_keys : Sequence[str] | None, optional
+            The context features in the columns of `values`, by default None.
+            If None, `values` holds all context features.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (n_contexts, n_features) filled with defaults.
+
+        Raises
+        ------
+        ValueError
+            When the shape of `values` does not match the context keys.
+        """
+        idx = self.get_feature_indices(context_keys)
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != len(idx):
+            raise ValueError(
+                f"Expected values of shape (n, {len(idx)}), got {values.shape}."
+            )
+        filled = np.empty((len(values), self.n_features), dtype=np.float64)
+        filled[:] = self.default_vector
+        filled[:, idx] = values
+        np.copyto(filled, self.default_vector, where=np.isnan(filled))
+        return filled
+
+    def verify_contexts(
+        self, values: np.ndarray, context_keys: Sequence[str] | None = None
+    ) -> np.ndarray:
+        """Verify a batch of context vectors.
+
+        Check if the values are in bounds, if integer and categorical
+        features hold integral values and, for complete context vectors,
+        if the constraints are satisfied.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Array of shape (n_contexts, len(context_keys)).
+        context_keys : Sequence[str] | None, optional
+            The context features in the columns of `values`, by default None.
+            If None, `values` holds all context features.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (n_contexts,), True for valid contexts.
+        """
+        idx = self.get_feature_indices(context_keys)
+        values = np.asarray(values, dtype=np.float64)
+        valid = np.all(
+            (values >= self.lower_bounds[idx]) & (values <= self.upper_bounds[idx]),
+            axis=1,
+        )
+        integral = self._integral_mask[idx]
+        if integral.any():
+            integral_values = values[:, integral]
+            valid &= np.all(integral_values == np.round(integral_values), axis=1)
+        if context_keys is None and self.constraints:
+            valid &= self.check_constraints(values)
+        return valid
+
+    def check_constraints(self, values: np.ndarray) -> np.ndarray:
+        """Check the constraints for a batch of context vectors.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Array of shape (n_contexts, n_features) or one vector.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (n_contexts,), True if all constraints hold.
+        """
+        values = np.atleast_2d(values)
+        columns = {name: values[:, i] for name, i in self.feature_index.items()}
+        valid = np.ones(len(values), dtype=bool)
+        for constraint in self.constraints:
+            valid &= np.asarray(constraint(columns), dtype=bool)
+        return valid
+
+    def resample_invalid(
+        self,
+        values: np.ndarray,
+        draw: Callable[[int], np.ndarray],
+        max_rounds: int = 100,
+    ) -> np.ndarray:
+        """Replace contexts violating the constraints by valid new samples.
+
+        Rejection sampling in bulk: each round draws enough candidates for
+        all invalid rows at the acceptance rate observed so far.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Array of shape (n_contexts, n_features), changed in place.
+        draw : Callable[[int], np.ndarray]
+            Draws a given number of new context vectors.
+        max_rounds : int, optional
+            Maximum number of rounds, by default 100.
+
+        Returns
+        -------
+        np.ndarray
+            The values, all satisfying the constraints.
+
+        Raises
+        ------
+        ValueError
+            If not enough valid contexts were found, e.g. because the
+            constraints cannot be satisfied with the sampled features.
+        """
+        if not self.constraints:
+            return values
+        valid = self.check_constraints(values)
+        invalid = np.flatnonzero(~valid)
+        n_drawn, n_accepted = len(values), len(values) - len(invalid)
+        for _ in range(max_rounds):
+            if len(invalid) == 0:
+                return values
+            acceptance = max(n_accepted / n_drawn, 0.01)
+            n_candidates = int(np.ceil(1.1 * len(invalid) / acceptance))
+            candidates = draw(n_candidates)
+            accepted = candidates[self.check_constraints(candidates)]
+            n_drawn += n_candidates
+            n_accepted += len(accepted)
+            n_replaced = min(len(accepted), len(invalid))
+            values[invalid[:n_replaced]] = accepted[:n_replaced]
+            invalid = invalid[n_replaced:]
+        if len(invalid) > 0:
+            raise ValueError(
+                f"Could not sample {len(invalid)} contexts satisfying the constraints "
+                f"({n_accepted} of {n_drawn} samples were valid)."
+            )
+        return values
+
+    def clip_contexts(
+        self,
+        values: np.ndarray,
+        context_keys: Sequence[str] | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Clip a batch of context vectors to the bounds.
+
+        Integer and categorical features are rounded.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Array of shape (n_contexts, len(context_keys)).
+        context_keys : Sequence[str] | None, optional
+            The context features in the columns of `values`, by default None.
+            If None, `values` holds all context features.
+        out : np.ndarray | None, optional
+            Array to write the result to, by default None. Can be `values`.
+
+        Returns
+        -------
+        np.ndarray
+            The clipped values.
+        """
+        idx = self.get_feature_indices(context_keys)
+        clipped = np.clip(
+            values, self.lower_bounds[idx], self.upper_bounds[idx], out=out
+        )
+        integral = np.flatnonzero(self._integral_mask[idx])
+        if len(integral) > 0:
+            clipped[:, integral] = np.round(clipped[:, integral])
+        return clipped
+
+    def sample_context_array(
+        self,
+        context_keys: Sequence[str] | None = None,
+        size: int = 1,
+        seed: int | np.random.Generator | None = None,
+        method: str = "random",
+    ) -> np.ndarray:
+        """Sample a batch of context vectors from the space.
+
+        Only the requested context features are sampled, the others are
+        set to their defaults. Besides i.i.d. sampling ("random"), the
+        quasi-random methods "sobol", "halton" and "lhs" cover the space
+        more evenly with the same number of contexts. They spread unit cube
+        points over the features (see `feature_values_from_unit`), so
+        bounded features are covered between their bounds. Contexts violating
+        the constraints are replaced by new samples (see `resample_invalid`).
+
+        Parameters
+        ----------
+        context_keys : Sequence[str] | None, optional
+            The context feature names to sample for, by default None.
+            If None, sample all context features.
+        size : int, optional
+            The number of contexts to sample, by default 1.
+        seed : int | np.random.Generator | None, optional
+            Seed or random generator, by default None (see `get_rng`).
+        method : str, optional
+            One of `SAMPLING_METHODS`, by default "random".
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (size, n_features) in the vector encoding.
+
+        Raises
+        ------
+        ValueError
+            When elements of context_keys or the method are not valid, or if
+            not enough contexts satisfying the constraints were found.
+        """
+        idx = self.get_feature_indices(context_keys)
+        rng = get_rng(seed)
+        features = list(self.context_space.values())
+        draw_unit = (
+            None
+            if method == "random"
+            else make_unit_cube_sampler(method, len(idx), rng)
+        )
+
+        def draw(n: int) -> np.ndarray:
+            values = np.empty((n, self.n_features), dtype=np.float64)
+            values[:] = self.default_vector
+            if draw_unit is None:
+                for i in idx:
+                    values[:, i] = sample_feature_values(features[i], n, rng)
+                return values
+            unit_values = draw_unit(n)
+            for j, i in enumerate(idx):
+                values[:, i] = feature_values_from_unit(features[i], unit_values[:, j])
+            return values
+
+        return self.resample_invalid(draw(size), draw)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Iterator, Mapping
+
+from collections import OrderedDict
+
+from carl.context.context_space import ContextSpace
+from carl.context.sampler import ContextSampler
+from carl.utils.types import Context, Contexts
+
+
+def _sample_forever(
+    sampler: ContextSampler, chunk_size: int, method: str
+) -> Iterator[Context]:
+    while True:
+        values = sampler.sample_context_array(chunk_size, method=method)
+        yield from sampler.context_space.decode_contexts(values)
+
+
+def _call_forever(function: Callable[[], Context]) -> Iterator[Context]:
+    while True:
+        yield function()
+
+
+class ContextStream(Mapping[int, Context]):
+    """
+    Context source yielding contexts on demand.
+
+    Instead of a context set which is materialized up front, contexts are
+    drawn one at a time from a generator, a function or a `ContextSampler`,
+    e.g. for a new context every episode. Each drawn context gets the next
+    integer id (0, 1, 2, ...), and only the `window_size` most recent
+    contexts are kept, so memory stays bounded for arbitrarily long streams.
+
+    As a mapping, the stream holds the contexts of the current window by id,
+    so it can be passed as `contexts` to CARL envs (which select from it with
+    a `StreamSelector`). The first context is drawn on construction.
+
+    Parameters
+    ----------
+    source : Iterable[Context] | Callable[[], Context] | ContextSampler
+        Source of the contexts. A function is called for every context, a
+        sampler is sampled in chunks of `chunk_size` contexts.
+    window_size : int, optional
+        Number of most recent contexts kept, by default 16.
+    chunk_size : int, optional
+        Number of contexts sampled at once from a `ContextSampler`, by default 1024.
+    method : str, optional
+        Sampling method for a `ContextSampler`, by default "random".
+
+    Attributes
+    ----------
+    n_drawn : int
+        Number of contexts drawn from the source, without rejected ones.
+    n_rejected : int
+        Number of contexts skipped for violating the constraints, see `validate`.
+
+    Raises
+    ------
+    ValueError
+        When the window size is smaller than 1.
+
+    Examples
+    --------
+    >>> sampler = ContextSampler(distributions, CARLCartPole.get_context_space(), seed=0)
+    >>> env = CARLCartPole(contexts=ContextStream(sampler))
+    >>> env.reset()  # every reset selects a new context
+    >>> env.contexts.window  # most recent contexts by id, e.g. for logging
+    """
+
+    # Consecutive rejected contexts before a draw gives up, see `validate`
+    _MAX_REJECTIONS = 1000
+
+    def __init__(
+        self,
+        source: Iterable[Context] | Callable[[], Context] | ContextSampler,
+        window_size: int = 16,
+        chunk_size: int = 1024,
+        method: str = "random",
+    ) -> None:
+        if window_size < 1:
+            raise ValueError(f"Window size must be at least 1, got {window_size}.")
+        self.source = source
+        self.window_size = window_size
+        self._iterator: Iterator[Context]
+        if isinstance(source, ContextSampler):
+            self._iterator = _sample_forever(source, chunk_size, method)
+        elif callable(source) and not isinstance(source, Iterable):
+            self._iterator = _call_forever(source)
+        else:
+            self._iterator = iter(source)
+        self._window: OrderedDict[int, Context] = OrderedDict()
+        self._transform: Callable[[Context], Context] | None = None
+        self._context_space: ContextSpace | None = None
+        self.n_drawn = 0
+        self.n_rejected = 0
+        self.draw()
+
+    def draw(self) -> int:
+        """Draw the next context from the source.
+
+        The oldest context leaves the window if it is full.
+
+        Returns
+        -------
+        int
+            Id of the new context.
+
+        Raises
+        ------
+        RuntimeError
+            When a finite source is exhausted or only yields contexts
+            violating the constraints.
+        """
+        for _ in range(self._MAX_REJECTIONS):
+            try:
+                context = next(self._iterator)
+            except StopIteration:
+                raise RuntimeError(
+                    f"Context stream is exhausted after {self.n_drawn} contexts."
+                ) from None
+            if self._transform is not None:
+                context = self._transform(context)
+            if self._is_valid(context):
+                break
+            self.n_rejected += 1
+        else:
+            raise RuntimeError(
+                f"{self._MAX_REJECTIONS} contexts in a row violate the constraints "
+                "of the context space."
+            )
+        context_id = self.n_drawn
+        self._window[context_id] = context
+        if len(self._window) > self.window_size:
+            self._window.popitem(last=False)
+        self.n_drawn += 1
+        return context_id
+
+    @property
+    def latest_id(self) -> int:
+        """Id of the most recently drawn context."""
+        return self.n_drawn - 1
+
+    @property
+    def window(self) -> Contexts:
+        """Copy of the contexts in the window by id, oldest first."""
+        return dict(self._window)
+
+    def to_contexts(self) -> Contexts:
+        """Contexts in the window as a context set (see `window`)."""
+        return self.window
+
+    def with_defaults(self, context_space: ContextSpace) -> ContextStream:
+        """Fill missing context features with their default values.
+
+        Unlike `ContextTable.with_defaults`, the stream is updated in place,
+        as the source can only be consumed once. Contexts in the window and
+        all contexts drawn later are filled.
+
+        Parameters
+        ----------
+        context_space : ContextSpace
+            Context space providing the default values.
+
+        Returns
+        -------
+        ContextStream
+            The stream itself.
+        """
+        self._transform = context_space.insert_defaults
+        for context_id, context in self._window.items():
+            self._window[context_id] = context_space.insert_defaults(context)
+        return self
+
+    def validate(self, context_space: ContextSpace) -> ContextStream:
+        """Skip contexts violating the constraints of a context space.
+
+        Contexts in the window which violate them are removed, if the most
+        recent one does, a new context is drawn. Contexts drawn later which
+        violate them are skipped and counted in `n_rejected`. Like
+        `with_defaults`, this updates the stream in place.
+
+        Parameters
+        ----------
+        context_space : ContextSpace
+            The context space.
+
+        Returns
+        -------
+        ContextStream
+            The stream itself.
+
+        Raises
+        ------
+        RuntimeError
+            If no valid context can be drawn.
+        """
+        self._context_space = context_space
+        latest_id = self.latest_id
+        for context_id, context in list(self._window.items()):
+            if not self._is_valid(context):
+                del self._window[context_id]
+                self.n_rejected += 1
+        if latest_id not in self._window:
+            self.draw()
+        return self
+
+    def _is_valid(self, context: Context) -> bool:
+        context_space = self._context_space
+        if context_space is None or not context_space.constraints:
+            return True
+        return bool(
+            context_space.check_constraints(context_space.encode_context(context))[0]
+        )
+
+    def __getitem__(self, context_id: int) -> Context:
+        try:
+            return self._window[context_id]
+        except KeyError:
+            raise KeyError(
+                f"Context {context_id} is not in the window (ids "
+                f"{next(iter(self._window))} to {self.latest_id})."
+            ) from None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._window)
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(n_drawn={self.n_drawn}, "
+            f"window_size={self.window_size})"
+        )
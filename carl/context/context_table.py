@@ -0,0 +1,692 @@
+from __future__ import annotations
+
+from typing import Any, Iterator, Mapping, Sequence
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+
+from carl.context.context_space import (
+    CategoricalContextFeature,
+    ContextSpace,
+    NormalIntegerContextFeature,
+    UniformIntegerContextFeature,
+)
+from carl.utils.types import Context, Contexts
+
+# On-disk format of a context table: a directory with the schema and one
+# .npy file per column (and the keys, if any)
+TABLE_FORMAT = "carl-context-table"
+TABLE_FORMAT_VERSION = 1
+SCHEMA_FILE = "schema.json"
+KEYS_FILE = "keys.npy"
+
+
+def _full(value: Any, size: int) -> np.ndarray:
+    """Create a read-only column repeating `value` without allocating `size` entries.
+
+    Parameters
+    ----------
+    value : Any
+        The value to repeat.
+    size : int
+        Length of the column.
+
+    Returns
+    -------
+    np.ndarray
+        Zero-strided column.
+    """
+    if np.isscalar(value):
+        scalar = np.asarray(value)
+    else:
+        scalar = np.empty((), dtype=object)
+        scalar[()] = value
+    return np.broadcast_to(scalar, (size,))
+
+
+def _to_json(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _hash_arrays(schema: Mapping[str, Any], arrays: Sequence[np.ndarray]) -> str:
+    """Hash the schema (without hash) and the raw bytes of the arrays.
+
+    Parameters
+    ----------
+    schema : Mapping[str, Any]
+        Schema of the table.
+    arrays : Sequence[np.ndarray]
+        Column (and key) arrays in file order.
+
+    Returns
+    -------
+    str
+        Hex SHA-256 digest.
+    """
+    content = {k: v for k, v in schema.items() if k != "content_hash"}
+    digest = hashlib.sha256(json.dumps(content, sort_keys=True).encode())
+    for array in arrays:
+        digest.update(memoryview(np.ascontiguousarray(array)).cast("B"))
+    return digest.hexdigest()
+
+
+def _load_rows(
+    cls: type[ContextTable], path: str, rows: tuple[int, int] | None
+) -> ContextTable:
+    table = cls.load(path)
+    if rows is not None:
+        table = table.take(np.arange(*rows))
+    return table
+
+
+class ContextRow(Mapping[str, Any]):
+    """
+    Lightweight, read-only view of one row of a `ContextTable`.
+
+    Behaves like a `Context` dictionary but does not copy any values.
+
+    Parameters
+    ----------
+    table : ContextTable
+        The table this row belongs to.
+    index : int
+        Row index in the table.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: ContextTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._table.columns[name][self._index]
+        if isinstance(value, np.generic):
+            value = value.item()
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.columns)
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)})"
+
+
+class ContextTable(Mapping[Any, ContextRow]):
+    """
+    Columnar context set.
+
+    Stores one array per context feature (struct of arrays) instead of one
+    dictionary per context. Accessing a context returns a `ContextRow` view,
+    so very large context sets can be used without materializing dictionaries.
+    A `ContextTable` can be passed wherever a `Contexts` dictionary is expected.
+
+    Parameters
+    ----------
+    columns : Mapping[str, Sequence | np.ndarray]
+        Values per context feature. All columns must have the same length.
+        Arrays are used as they are, without copying.
+    keys : Sequence | np.ndarray | None, optional
+        Unique keys of the contexts, by default None. If None, the keys are
+        the row indices `0, ..., n - 1`.
+
+    Raises
+    ------
+    ValueError
+        If the columns have different lengths or the keys do not match
+        the number of rows or are not unique.
+
+    Attributes
+    ----------
+    content_hash : str | None
+        Content hash of a table loaded with `load`, else None.
+
+    Examples
+    --------
+    >>> table = ContextTable({"gravity": np.linspace(5, 15, 1000)})
+    >>> table[3]["gravity"]
+    5.03003003003003
+    """
+
+    def __init__(
+        self,
+        columns: Mapping[str, Sequence | np.ndarray],
+        keys: Sequence | np.ndarray | None = None,
+    ) -> None:
+        arrays = {name: np.asarray(values) for name, values in columns.items()}
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(
+                f"All columns must have the same length, got lengths {lengths}."
+            )
+        n_rows = lengths.pop() if lengths else 0
+        if not arrays and keys is not None:
+            n_rows = len(keys)
+
+        self._columns = MappingProxyType(arrays)
+        self._n_rows = n_rows
+        self._path: str | None = None
+        self._rows: tuple[int, int] | None = None
+        self.content_hash: str | None = None
+        # Context spaces whose constraints the contexts satisfy, see `validate`
+        self._validated: list[ContextSpace] = []
+        self._keys: Sequence | np.ndarray
+        self._key_to_row: dict[Any, int] | None
+        if keys is None:
+            self._keys = range(n_rows)
+            self._key_to_row = None
+        else:
+            if len(keys) != n_rows:
+                raise ValueError(f"Got {len(keys)} keys for {n_rows} rows.")
+            self._keys = keys
+            self._key_to_row = {
+                (k.item() if isinstance(k, np.generic) else k): i
+                for i, k in enumerate(keys)
+            }
+            if len(self._key_to_row) != n_rows:
+                raise ValueError("Context keys must be unique.")
+
+    @classmethod
+    def from_contexts(cls, contexts: Contexts | Sequence[Context]) -> ContextTable:
+        """Build a table from context dictionaries.
+
+        Parameters
+        ----------
+        contexts : Contexts | Sequence[Context]
+            Context set or list of contexts. All contexts must have the same features.
+
+        Returns
+        -------
+        ContextTable
+            The context table. Keys are kept for a context set.
+        """
+        keys = None
+        if isinstance(contexts, Mapping):
+            keys = list(contexts.keys())
+            contexts = list(contexts.values())
+        names = list(contexts[0].keys()) if len(contexts) > 0 else []
+        columns = {}
+        for name in names:
+            values = [context[name] for context in contexts]
+            column = np.asarray(values)
+            if column.ndim != 1:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            columns[name] = column
+        return cls(columns, keys=keys)
+
+    @classmethod
+    def from_array(
+        cls,
+        values: np.ndarray,
+        context_space: ContextSpace,
+        keys: Sequence | np.ndarray | None = None,
+    ) -> ContextTable:
+        """Build a table from context vectors.
+
+        Float features are views of the columns of `values`, integer features
+        are converted and categorical indices are mapped to their choices.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Array of shape (n_contexts, n_features) in the vector encoding of
+            the context space (see `ContextSpace.encode_context`).
+        context_space : ContextSpace
+            The context space defining the features.
+        keys : Sequence | np.ndarray | None, optional
+            Keys of the contexts, by default None (row indices).
+
+        Returns
+        -------
+        ContextTable
+            The context table.
+        """
+        columns = {}
+        for i, (name, cf) in enumerate(context_space.context_space.items()):
+            column = values[:, i]
+            if isinstance(cf, CategoricalContextFeature):
+                choices = np.empty(cf.num_choices, dtype=object)
+                choices[:] = list(cf.choices)
+                column = choices[column.astype(np.intp)]
+            elif isinstance(
+                cf, (UniformIntegerContextFeature, NormalIntegerContextFeature)
+            ):
+                column = np.round(column).astype(np.int64)
+            columns[name] = column
+        return cls(columns, keys=keys)
+
+    @property
+    def columns(self) -> Mapping[str, np.ndarray]:
+        """Read-only mapping of context feature names to their columns."""
+        return self._columns
+
+    @property
+    def column_names(self) -> list[str]:
+        """Names of the context features in the table."""
+        return list(self._columns.keys())
+
+    def keys(self) -> Sequence | np.ndarray:  # type: ignore[override]
+        """Keys of the contexts in row order.
+
+        Returns
+        -------
+        Sequence | np.ndarray
+            A `range` if the table uses row indices as keys, else the key array.
+        """
+        return self._keys
+
+    def row_index(self, key: Any) -> int:
+        """Get the row index of a context key.
+
+        Parameters
+        ----------
+        key : Any
+            Context key.
+
+        Returns
+        -------
+        int
+            Row index.
+
+        Raises
+        ------
+        KeyError
+            If the key is not in the table.
+        """
+        if self._key_to_row is None:
+            if (
+                isinstance(key, (int, np.integer))
+                and not isinstance(key, bool)
+                and 0 <= key < self._n_rows
+            ):
+                return int(key)
+            raise KeyError(key)
+        if isinstance(key, np.generic):
+            key = key.item()
+        return self._key_to_row[key]
+
+    def row(self, index: int) -> ContextRow:
+        """Get a view of the context at row `index`.
+
+        Parameters
+        ----------
+        index : int
+            Row index.
+
+        Returns
+        -------
+        ContextRow
+            The context.
+        """
+        if not 0 <= index < self._n_rows:
+            raise IndexError(f"Row {index} out of range for {self._n_rows} rows.")
+        return ContextRow(self, int(index))
+
+    def __getitem__(self, key: Any) -> ContextRow:
+        return ContextRow(self, self.row_index(key))
+
+    def __contains__(self, key: Any) -> bool:
+        try:
+            self.row_index(key)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(n_contexts={self._n_rows}, "
+            f"columns={self.column_names})"
+        )
+
+    def with_defaults(self, context_space: ContextSpace) -> ContextTable:
+        """Fill missing context features with their default values.
+
+        Existing columns are shared, missing columns are zero-strided views
+        of the default value, so this does not allocate per-context memory.
+        Columns are ordered as in the context space, followed by unknown columns.
+
+        Parameters
+        ----------
+        context_space : ContextSpace
+            Context space providing the default values.
+
+        Returns
+        -------
+        ContextTable
+            Table holding all context features of the context space.
+        """
+        if list(self._columns)[: context_space.n_features] == list(
+            context_space.default_context
+        ):
+            # Complete and ordered, e.g. a saved table
+            return self
+        columns = {}
+        for name, default_value in context_space.default_context.items():
+            if name in self._columns:
+                columns[name] = self._columns[name]
+            else:
+                columns[name] = _full(default_value, self._n_rows)
+        for name, values in self._columns.items():
+            if name not in columns:
+                columns[name] = values
+        table = self._replace(columns)
+        # Filling in the defaults does not change the validity of the contexts
+        table._validated = list(self._validated)
+        return table
+
+    def validated_for(self, context_space: ContextSpace) -> bool:
+        """Whether the contexts are known to satisfy the constraints of a context space.
+
+        Parameters
+        ----------
+        context_space : ContextSpace
+            The context space.
+
+        Returns
+        -------
+        bool
+            True if `validate` passed for this context space.
+        """
+        return any(space is context_space for space in self._validated)
+
+    def validate(self, context_space: ContextSpace) -> None:
+        """Check that all contexts satisfy the constraints of a context space.
+
+        Missing context features are checked with their defaults. Tables are
+        treated as immutable, so a passed check is remembered and the table
+        is only checked once per context space, e.g. when many envs share it.
+
+        Parameters
+        ----------
+        context_space : ContextSpace
+            The context space.
+
+        Raises
+        ------
+        ValueError
+            If contexts violate the constraints of the context space.
+        """
+        if self.validated_for(context_space):
+            return
+        if context_space.constraints:
+            valid = context_space.check_constraints(context_space.encode_contexts(self))
+            if not valid.all():
+                invalid_keys = [
+                    self._keys[i] for i in np.flatnonzero(~valid)[:10].tolist()
+                ]
+                raise ValueError(
+                    f"Contexts {invalid_keys} violate the constraints of the "
+                    "context space."
+                )
+        self._validated.append(context_space)
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> ContextTable:
+        """Select a subset of the contexts by row index.
+
+        Parameters
+        ----------
+        indices : Sequence[int] | np.ndarray
+            Row indices of the contexts to keep.
+
+        Returns
+        -------
+        ContextTable
+            Table holding the selected rows and their keys.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        rows: slice | np.ndarray = indices
+        start = int(indices[0]) if len(indices) > 0 else 0
+        contiguous = np.array_equal(indices, np.arange(start, start + len(indices)))
+        if contiguous:
+            # Views instead of copies, e.g. for shards of a memory-mapped table
+            rows = slice(start, start + len(indices))
+        columns = {name: values[rows] for name, values in self._columns.items()}
+        keys = None
+        if self._key_to_row is not None:
+            keys = np.asarray(self._keys)[rows]
+        elif not (contiguous and start == 0):
+            keys = indices
+        table = ContextTable(columns, keys=keys)
+        if contiguous and self._path is not None and self._rows is None:
+            table._path = self._path
+            table._rows = (start, start + len(indices))
+        return table
+
+    def __reduce__(self) -> tuple:
+        if self._path is not None:
+            # Memory-mapped tables are reopened instead of copied, so processes
+            # share the file through the page cache
+            return _load_rows, (type(self), self._path, self._rows)
+        # Mapping proxies cannot be pickled, e.g. to send a table to a subprocess
+        keys = None if self._key_to_row is None else self._keys
+        return type(self), (dict(self._columns), keys)
+
+    def save(self, path: str | os.PathLike, context_space: ContextSpace) -> str:
+        """Save the table as a directory of memory-mappable `.npy` columns.
+
+        The schema (feature names, types and categorical choices) is taken
+        from the context space and written to `schema.json` together with a
+        content hash. Missing context features are saved with their defaults.
+        Categorical features are saved as their values if the choices are
+        numbers, booleans or strings of one type, else as choice indices.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Directory to write, created if it does not exist.
+        context_space : ContextSpace
+            Context space of the env the contexts belong to.
+
+        Returns
+        -------
+        str
+            Content hash of the table (hex SHA-256 of schema and values).
+
+        Raises
+        ------
+        ValueError
+            If the table has columns which are not in the context space, or
+            keys or categorical choices which cannot be saved.
+        """
+        unknown = set(self._columns) - set(context_space.context_space)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} are not in the context space.")
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        features = []
+        arrays = []
+        for i, (name, cf) in enumerate(context_space.context_space.items()):
+            column = self._columns.get(name)
+            if column is None:
+                column = _full(cf.default_value, self._n_rows)
+            feature: dict[str, Any] = {
+                "name": name,
+                "type": type(cf).__name__,
+                "file": f"column_{i}.npy",
+            }
+            if isinstance(cf, CategoricalContextFeature):
+                choices = [_to_json(choice) for choice in cf.choices]
+                try:
+                    json.dumps(choices)
+                except TypeError:
+                    raise ValueError(
+                        f"Choices of `{name}` cannot be saved: {choices}."
+                    ) from None
+                feature["choices"] = choices
+                typed_choices = np.asarray(choices)
+                if len({type(choice) for choice in choices}) == 1 and (
+                    typed_choices.dtype.kind in "biufU"
+                ):
+                    feature["encoding"] = "values"
+                    column = np.asarray(column, dtype=typed_choices.dtype)
+                else:
+                    feature["encoding"] = "codes"
+                    choice_index = context_space._choice_indices[name]
+                    column = np.fromiter(
+                        (choice_index[v] for v in column),
+                        dtype=np.int64,
+                        count=len(column),
+                    )
+            elif isinstance(
+                cf, (UniformIntegerContextFeature, NormalIntegerContextFeature)
+            ):
+                column = np.asarray(column, dtype=np.int64)
+            else:
+                column = np.asarray(column, dtype=np.float64)
+            features.append(feature)
+            arrays.append(np.ascontiguousarray(column))
+
+        keys_file = None
+        if self._key_to_row is not None:
+            keys = np.asarray(self._keys)
+            if keys.dtype.kind not in "biuU":
+                raise ValueError(
+                    "Only integer or string context keys can be saved, "
+                    f"got dtype {keys.dtype}."
+                )
+            keys_file = KEYS_FILE
+            arrays.append(keys)
+
+        schema: dict[str, Any] = {
+            "format": TABLE_FORMAT,
+            "version": TABLE_FORMAT_VERSION,
+            "n_contexts": self._n_rows,
+            "features": features,
+            "keys": keys_file,
+        }
+        schema["content_hash"] = _hash_arrays(schema, arrays)
+        files = [feature["file"] for feature in features]
+        if keys_file is not None:
+            files.append(keys_file)
+        for file, array in zip(files, arrays):
+            np.save(path / file, array, allow_pickle=False)
+        with open(path / SCHEMA_FILE, "w") as f:
+            json.dump(schema, f, indent=2)
+        return schema["content_hash"]
+
+    @classmethod
+    def load(
+        cls,
+        path: str | os.PathLike,
+        context_space: ContextSpace | None = None,
+        verify: bool = False,
+    ) -> ContextTable:
+        """Load a table saved with `save`.
+
+        Columns are memory-mapped read-only, so loading does not copy the
+        values and all processes loading the same table share one copy in
+        the page cache. Only categorical columns saved as choice indices are
+        converted when loading. Pickling a loaded table (e.g. to send it to a
+        subprocess) pickles its path.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Directory written by `save`.
+        context_space : ContextSpace | None, optional
+            If given, check that the schema matches the context space.
+        verify : bool, optional
+            Whether to recompute the content hash, by default False.
+            This reads all values.
+
+        Returns
+        -------
+        ContextTable
+            The table. Its `content_hash` is the hash from the schema.
+
+        Raises
+        ------
+        ValueError
+            If the directory is not a saved context table, the schema does not
+            match the context space or the content hash does not match.
+        """
+        path = Path(path)
+        with open(path / SCHEMA_FILE) as f:
+            schema = json.load(f)
+        if schema.get("format") != TABLE_FORMAT:
+            raise ValueError(f"{path} is not a saved context table.")
+        if schema["version"] > TABLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Context table format version {schema['version']} is not supported."
+            )
+        features = schema["features"]
+
+        if context_space is not None:
+            for feature in features:
+                cf = context_space.context_space.get(feature["name"])
+                if cf is None or type(cf).__name__ != feature["type"]:
+                    raise ValueError(
+                        f"Context feature `{feature['name']}` ({feature['type']}) "
+                        "does not match the context space."
+                    )
+                if "choices" in feature and feature["choices"] != [
+                    _to_json(choice) for choice in cf.choices
+                ]:
+                    raise ValueError(
+                        f"Choices of `{feature['name']}` do not match the context space."
+                    )
+
+        arrays = [
+            np.load(path / feature["file"], mmap_mode="r", allow_pickle=False)
+            for feature in features
+        ]
+        keys = None
+        if schema["keys"] is not None:
+            keys = np.load(path / schema["keys"], mmap_mode="r", allow_pickle=False)
+        if verify:
+            all_arrays = arrays if keys is None else [*arrays, keys]
+            if _hash_arrays(schema, all_arrays) != schema["content_hash"]:
+                raise ValueError(f"Content hash of {path} does not match.")
+
+        columns = {}
+        for feature, column in zip(features, arrays):
+            if feature.get("encoding") == "codes":
+                choices = np.empty(len(feature["choices"]), dtype=object)
+                choices[:] = feature["choices"]
+                column = choices[column]
+            columns[feature["name"]] = column
+        table = cls(columns, keys=keys)
+        table._path = os.fspath(path)
+        table.content_hash = schema["content_hash"]
+        return table
+
+    def _replace(self, columns: Mapping[str, np.ndarray]) -> ContextTable:
+        table = object.__new__(type(self))
+        table._columns = MappingProxyType(dict(columns))
+        table._n_rows = self._n_rows
+        table._keys = self._keys
+        table._key_to_row = self._key_to_row
+        table._path = None
+        table._rows = None
+        table.content_hash = None
+        table._validated = []
+        return table
+
+    def to_contexts(self) -> Contexts:
+        """Convert the table to a context set of dictionaries.
+
+        Returns
+        -------
+        Contexts
+            Context set.
+        """
+        return {
+            (k.item() if isinstance(k, np.generic) else k): dict(self.row(i))
+            for i, k in enumerate(self._keys)
+        }
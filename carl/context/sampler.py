@@ -1,20 +1,61 @@
 from __future__ import annotations
 
+import numpy as np
 from ConfigSpace import ConfigurationSpace
 from omegaconf import DictConfig
 
-from carl.context.context_space import ContextFeature, ContextSpace
+from carl.context.context_space import (
+    CategoricalContextFeature,
+    ContextFeature,
+    ContextSpace,
+    feature_values_from_unit,
+    make_unit_cube_sampler,
+    sample_feature_values,
+)
+from carl.context.context_table import ContextTable
 from carl.context.search_space_encoding import search_space_to_config_space
 from carl.utils.types import Context, Contexts
 
 
 class ContextSampler(ConfigurationSpace):
+    """
+    Sample contexts from distributions over (some of) the context features.
+
+    Samples are drawn vectorized per feature directly into the vector
+    encoding of the context space (see `ContextSpace.encode_context`),
+    without building a ConfigSpace `Configuration` per sample. Features
+    without a distribution are set to their defaults. Results are
+    reproducible from `seed`.
+
+    Besides i.i.d. sampling, the distributions can be covered with
+    quasi-random, space-filling designs ("sobol", "halton" or "lhs", see
+    `ContextSpace.sample_context_array`), which need fewer contexts for the
+    same coverage.
+
+    Parameters
+    ----------
+    context_distributions : list[ContextFeature] | dict[str, ContextFeature] | str | DictConfig
+        Distributions of the context features to sample. Their names must be
+        context features of `context_space`.
+    context_space : ContextSpace
+        The context space of the env.
+    seed : int
+        Seed of the random generator.
+    name : str | None, optional
+        Name of the configuration space, by default None.
+
+    Raises
+    ------
+    ValueError
+        When `context_distributions` has an unknown type or contains
+        features which are not in the context space.
+    """
+
     def __init__(
         self,
-        context_distributions: list[ContextFeature]
-        | dict[str, ContextFeature]
-        | str
-        | DictConfig,
+        context_distributions: (
+            list[ContextFeature] | dict[str, ContextFeature] | str | DictConfig
+        ),
         context_space: ContextSpace,
         seed: int,
         name: str | None = None,
@@ -36,6 +77,12 @@ class ContextSampler(ConfigurationSpace):
 
         self.context_feature_names = [cf.name for cf in self.get_context_features()]
         self.context_space = context_space
+        for name in self.context_feature_names:
+            if name not in context_space.feature_index:
+                raise ValueError(
+                    f"Context feature `{name}` is not in the context space."
+                )
+        self.rng = np.random.default_rng(seed)
 
     def add_context_features(self, context_features: list[ContextFeature]) -> None:
         self.add_hyperparameters(context_features)
@@ -43,20 +90,85 @@ class ContextSampler(ConfigurationSpace):
     def get_context_features(self) -> list[ContextFeature]:
         return list(self.values())
 
-    def sample_contexts(self, n_contexts: int) -> Contexts:
-        contexts = self._sample_contexts(size=n_contexts)
+    def sample_context_array(
+        self, n_contexts: int, method: str = "random"
+    ) -> np.ndarray:
+        """Sample contexts as an N x F array.
+
+        Parameters
+        ----------
+        n_contexts : int
+            Number of contexts.
+        method : str, optional
+            Sampling method, one of `SAMPLING_METHODS`, by default "random".
+
+        Returns
+        -------
+        np.ndarray
+            Float array of shape (n_contexts, n_features) in the vector
+            encoding of the context space. All contexts satisfy the
+            constraints of the context space.
+
+        Raises
+        ------
+        ValueError
+            If not enough contexts satisfying the constraints were found.
+        """
+        context_features = self.get_context_features()
+        draw_unit = None
+        if method != "random":
+            draw_unit = make_unit_cube_sampler(method, len(context_features), self.rng)
+
+        def draw(n: int) -> np.ndarray:
+            values = np.empty((n, self.context_space.n_features), dtype=np.float64)
+            values[:] = self.context_space.default_vector
+            unit_values = None if draw_unit is None else draw_unit(n)
+            for j, cf in enumerate(context_features):
+                i = self.context_space.feature_index[cf.name]
+                if unit_values is None:
+                    column = sample_feature_values(cf, n, self.rng)
+                else:
+                    column = feature_values_from_unit(cf, unit_values[:, j])
+                if isinstance(cf, CategoricalContextFeature):
+                    # Map the choices of the distribution to those of the context space
+                    choice_index = self.context_space._choice_indices[cf.name]
+                    mapping = np.array([choice_index[c] for c in cf.choices])
+                    column = mapping[column.astype(np.intp)]
+                values[:, i] = column
+            return values
+
+        return self.context_space.resample_invalid(draw(n_contexts), draw)
+
+    def sample_contexts(self, n_contexts: int, method: str = "random") -> Contexts:
+        contexts = self._sample_contexts(size=n_contexts, method=method)
 
         # Convert to dict
         contexts = {i: C for i, C in enumerate(contexts)}
 
         return contexts
 
-    def _sample_contexts(self, size: int = 1) -> list[Context]:
-        contexts = self.sample_configuration(size=size)
-        default_context = self.context_space.get_default_context()
+    def sample_context_table(
+        self, n_contexts: int, method: str = "random"
+    ) -> ContextTable:
+        """Sample contexts as a columnar context table.
 
-        if size == 1:
-            contexts = [contexts]
-        contexts = [dict(default_context | dict(C)) for C in contexts]
+        Contexts are only converted to dictionaries on access.
 
-        return contexts
+        Parameters
+        ----------
+        n_contexts : int
+            Number of contexts.
+        method : str, optional
+            Sampling method, one of `SAMPLING_METHODS`, by default "random".
+
+        Returns
+        -------
+        ContextTable
+            The contexts with all features of the context space.
+        """
+        values = self.sample_context_array(n_contexts, method=method)
+        return ContextTable.from_array(values, self.context_space)
+
+    def _sample_contexts(self, size: int = 1, method: str = "random") -> list[Context]:
+        values = self.sample_context_array(size, method=method)
+        return self.context_space.decode_contexts(values)
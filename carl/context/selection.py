@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from typing import Any, Callable, List, Optional, Tuple
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+import inspect
 
 import numpy as np
 
+from carl.context.context_space import get_rng
+from carl.context.context_stream import ContextStream
+from carl.context.context_table import ContextTable
+from carl.utils.sum_tree import SumTree
 from carl.utils.types import Context, Contexts
 
 
@@ -17,33 +23,50 @@ class AbstractSelector(object):
 
     Parameters
     ----------
-    contexts: Contexts
+    contexts: Contexts | ContextTable
         Context set. A `Context` is a Dict[str, Any].
+    seed: int | None, optional
+        Seed of the random generator of the selector, by default None. If
+        None, the generator is seeded from numpy's global random state, so
+        `np.random.seed` keeps the selection reproducible.
 
 
     Attributes
     ----------
-    contexts : Contexts
+    contexts : Contexts | ContextTable
         Context set.
-    context_ids : List[int]
+    context_ids : np.ndarray
         Integer index for contexts.
-    contexts_keys : List[Any]
+    contexts_keys : Sequence[Any]
         Keys of contexts dictionary.
     n_calls : int
-        Number of times `select` has been called.
+        Number of times `select` has been called (counting each context of
+        `select_batch`).
     context_id : Optional[int]
         Context id of current selected context. Is None at first.
+    rng : np.random.Generator
+        Random generator of the selector.
 
     """
 
-    def __init__(self, contexts: Contexts):
-        self.contexts: Contexts = contexts
-        self.context_ids: List[int] = list(np.arange(len(contexts)))
-        self.contexts_keys: List[Any] = list(contexts.keys())
+    def __init__(self, contexts: Contexts | ContextTable, seed: int | None = None):
+        self.contexts: Contexts | ContextTable = contexts
+        self.rng: np.random.Generator = get_rng(seed)
+        self._index_contexts(contexts)
         self.n_calls: int = 0
-        self.context_id: Optional[
-            int
-        ] = None  # holds index of current context (integer index of context keys)
+        self.context_id: Optional[int] = (
+            None  # holds index of current context (integer index of context keys)
+        )
+
+    def _index_contexts(self, contexts: Contexts | ContextTable) -> None:
+        """Set `context_ids` and `contexts_keys` of the context set."""
+        self.context_ids: np.ndarray = np.arange(len(contexts), dtype=np.int64)
+        self.contexts_keys: Sequence[Any]
+        if isinstance(contexts, ContextTable):
+            # Already a sequence, avoid materializing a list for large tables
+            self.contexts_keys = contexts.keys()
+        else:
+            self.contexts_keys = list(contexts.keys())
 
     @abstractmethod
     def _select(self) -> Tuple[Context, int]:
@@ -75,6 +98,65 @@ class AbstractSelector(object):
         self.n_calls += 1
         return context
 
+    def _select_batch(self, n: int) -> np.ndarray:
+        """
+        Select the ids of the next n contexts (internal).
+
+        By default, `_select` is called n times. Child classes can override
+        this with a vectorized selection.
+
+        Parameters
+        ----------
+        n : int
+            Number of contexts.
+
+        Returns
+        -------
+        np.ndarray
+            Integer ids of the selected contexts.
+        """
+        context_ids = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            _, context_ids[i] = self._select()
+            self.context_id = int(context_ids[i])
+        return context_ids
+
+    def select_batch(self, n: int) -> np.ndarray:
+        """
+        Select the next n contexts at once (API).
+
+        E.g. for the copies of a vector env which are reset together. This is
+        equivalent to calling `select` n times, but only returns the ids of
+        the contexts, so no contexts are looked up. The current context is
+        the last one selected.
+
+        Parameters
+        ----------
+        n : int
+            Number of contexts.
+
+        Returns
+        -------
+        np.ndarray
+            Integer ids of the selected contexts, shape (n,).
+        """
+        context_ids = self._select_batch(n)
+        if n > 0:
+            self.context_id = int(context_ids[-1])
+        self.n_calls += n
+        return context_ids
+
+    def seed(self, seed: int | None = None) -> None:
+        """
+        Reset the random generator of the selector.
+
+        Parameters
+        ----------
+        seed : int | None, optional
+            Seed, by default None (seeded from numpy's global random state).
+        """
+        self.rng = get_rng(seed)
+
     @property
     def context_key(self) -> Any | None:
         """
@@ -98,14 +180,19 @@ class AbstractSelector(object):
 class RandomSelector(AbstractSelector):
     """
     Random Context Selector.
+
+    Selects contexts uniformly at random with the random generator of the
+    selector, so the selection is reproducible by passing a `seed`.
     """
 
     def _select(self) -> Tuple[Context, int]:
-        # TODO seed?
-        context_id = np.random.choice(self.context_ids)
+        context_id = int(self.rng.integers(len(self.context_ids)))
         context = self.contexts[self.contexts_keys[context_id]]
         return context, context_id
 
+    def _select_batch(self, n: int) -> np.ndarray:
+        return self.rng.integers(len(self.context_ids), size=n, dtype=np.int64)
+
 
 class RoundRobinSelector(AbstractSelector):
     """
@@ -121,6 +208,10 @@ class RoundRobinSelector(AbstractSelector):
         context = self.contexts[self.contexts_keys[self.context_id]]
         return context, self.context_id
 
+    def _select_batch(self, n: int) -> np.ndarray:
+        start = -1 if self.context_id is None else self.context_id
+        return (start + 1 + np.arange(n, dtype=np.int64)) % len(self.contexts)
+
 
 class StaticSelector(AbstractSelector):
     """
@@ -131,10 +222,14 @@ class StaticSelector(AbstractSelector):
 
     def _select(self) -> Tuple[Context, int]:
         if self.context_id is None:
-            self.context_id = self.context_ids[0]
+            self.context_id = int(self.context_ids[0])
         context = self.contexts[self.contexts_keys[self.context_id]]
         return context, self.context_id
 
+    def _select_batch(self, n: int) -> np.ndarray:
+        context_id = self.context_ids[0] if self.context_id is None else self.context_id
+        return np.full(n, context_id, dtype=np.int64)
+
 
 class CustomSelector(AbstractSelector):
     """
@@ -145,11 +240,13 @@ class CustomSelector(AbstractSelector):
 
     Parameters
     ----------
-    contexts: Contexts
+    contexts: Contexts | ContextTable
         Set of contexts.
     selector_function: callable
         Function receiving a pointer to the selector implementing selection logic.
         See example below.
+    seed: int | None, optional
+        Seed of the random generator `rng` of the selector, by default None.
 
     Examples
     --------
@@ -168,13 +265,267 @@ class CustomSelector(AbstractSelector):
 
     def __init__(
         self,
-        contexts: Contexts,
+        contexts: Contexts | ContextTable,
         selector_function: Callable[[AbstractSelector], Tuple[Context, int]],
+        seed: int | None = None,
     ):
-        super().__init__(contexts=contexts)
+        super().__init__(contexts=contexts, seed=seed)
         self.selector_function = selector_function
 
     def _select(self) -> Tuple[Context, int]:
         context, context_id = self.selector_function(self)
         self.context_id = context_id
         return context, context_id
+
+
+class PrioritizedSelector(AbstractSelector):
+    """
+    Prioritized context selector.
+
+    Keeps a priority per context, e.g. the learning progress or the recent
+    return on it, and selects contexts with probability proportional to
+    `(priority + min_priority) ** (1 / temperature)`. The weights are kept in
+    a sum tree, so selecting a context and updating priorities take O(log n),
+    independent of the size of the context set.
+
+    Priorities are fed back from episode results with `update_priorities`,
+    using the context ids reported in `info["context_id"]`. With a
+    `staleness_decay`, the weight of a context decays by this fraction for
+    every `update_priorities` call which does not refresh its priority, so
+    outdated priorities lose influence. Contexts which were never updated
+    decay as well, so an optimistic `initial_priority` makes sure that every
+    context is tried early on.
+
+    Parameters
+    ----------
+    contexts: Contexts | ContextTable
+        Set of contexts.
+    seed: int | None, optional
+        Seed of the random generator of the selector, by default None.
+    initial_priority: float, optional
+        Priority of all contexts before their first update, by default 1.
+    temperature: float, optional
+        Temperature of the selection, by default 1. Values above 1 flatten the
+        distribution towards uniform, values below 1 sharpen it.
+    staleness_decay: float, optional
+        Fraction in [0, 1) by which weights decay per update without a refresh,
+        by default 0 (no decay).
+    min_priority: float, optional
+        Added to all priorities so that every context keeps a chance to be
+        selected, by default 1e-6.
+
+    Attributes
+    ----------
+    priorities : np.ndarray
+        Current priority of every context.
+    n_updates : int
+        Number of calls to `update_priorities`.
+
+    Raises
+    ------
+    ValueError
+        If the temperature is not positive or the staleness decay not in [0, 1).
+
+    Examples
+    --------
+    >>> env = CARLCartPole(contexts=contexts, context_selector=PrioritizedSelector)
+    >>> obs, info = env.reset()
+    >>> ...  # run the episode
+    >>> env.context_selector.update_priorities([info["context_id"]], [learning_progress])
+    """
+
+    # Weights are scaled by a growing factor instead of decaying all other
+    # weights. Rescale before the factor overflows.
+    _MAX_LOG_SCALE = 200.0
+    # Lower bound of the decay factor, else rescaling underflows the weights
+    # of long stale contexts to 0 and they can no longer be selected
+    _MIN_SCALE = 1e-100
+
+    def __init__(
+        self,
+        contexts: Contexts | ContextTable,
+        seed: int | None = None,
+        initial_priority: float = 1.0,
+        temperature: float = 1.0,
+        staleness_decay: float = 0.0,
+        min_priority: float = 1e-6,
+    ):
+        super().__init__(contexts=contexts, seed=seed)
+        if temperature <= 0:
+            raise ValueError(f"Temperature must be positive, got {temperature}.")
+        if not 0 <= staleness_decay < 1:
+            raise ValueError(
+                f"Staleness decay must be in [0, 1), got {staleness_decay}."
+            )
+        self.temperature = temperature
+        self.staleness_decay = staleness_decay
+        self.min_priority = min_priority
+        self.priorities = np.full(len(contexts), initial_priority, dtype=np.float64)
+        self.n_updates = 0
+        # Update counter at the last update of each context and at the last rescale
+        self._updated_at = np.zeros(len(contexts), dtype=np.int64)
+        self._rescaled_at = 0
+        self._log_growth = -np.log1p(-staleness_decay)
+        self.tree = SumTree(self._weights(self.priorities, self._updated_at))
+
+    def _weights(self, priorities: np.ndarray, updated_at: np.ndarray) -> np.ndarray:
+        weights = (priorities + self.min_priority) ** (1 / self.temperature)
+        if self._log_growth > 0:
+            weights = weights * np.maximum(
+                np.exp(self._log_growth * (updated_at - self._rescaled_at)),
+                self._MIN_SCALE,
+            )
+        return weights
+
+    def update_priorities(
+        self,
+        context_ids: Sequence[int] | np.ndarray,
+        priorities: Sequence[float] | np.ndarray,
+    ) -> None:
+        """
+        Set the priorities of some contexts.
+
+        Parameters
+        ----------
+        context_ids : Sequence[int] | np.ndarray
+            Ids of the contexts as in `info["context_id"]`.
+        priorities : Sequence[float] | np.ndarray
+            New non-negative priorities, broadcastable to the context ids.
+
+        Raises
+        ------
+        ValueError
+            If priorities are negative or not finite.
+        """
+        context_ids = np.asarray(context_ids, dtype=np.int64).ravel()
+        priorities = np.broadcast_to(
+            np.asarray(priorities, dtype=np.float64), context_ids.shape
+        )
+        if not np.all(np.isfinite(priorities)) or np.any(priorities < 0):
+            raise ValueError("Priorities must be finite and non-negative.")
+        self.n_updates += 1
+        self.priorities[context_ids] = priorities
+        self._updated_at[context_ids] = self.n_updates
+        if (
+            self._log_growth * (self.n_updates - self._rescaled_at)
+            > self._MAX_LOG_SCALE
+        ):
+            self._rescaled_at = self.n_updates
+            self.tree.rebuild(self._weights(self.priorities, self._updated_at))
+        else:
+            self.tree.update(
+                context_ids, self._weights(priorities, self._updated_at[context_ids])
+            )
+
+    @property
+    def probabilities(self) -> np.ndarray:
+        """Current selection probability of every context."""
+        return self.tree.weights / self.tree.total
+
+    def _select(self) -> Tuple[Context, int]:
+        context_id = int(self.tree.sample(self.rng))
+        context = self.contexts[self.contexts_keys[context_id]]
+        return context, context_id
+
+    def _select_batch(self, n: int) -> np.ndarray:
+        return self.tree.sample(self.rng, size=n).astype(np.int64)
+
+
+class StreamSelector(AbstractSelector):
+    """
+    Stream selector.
+
+    Selects a new context from a `ContextStream` each time, so no context is
+    visited twice. The context id is the monotonic id of the stream and
+    only the contexts in the stream's window can be looked up.
+
+    Parameters
+    ----------
+    contexts: ContextStream
+        Context stream.
+    seed: int | None, optional
+        Seed of the random generator `rng` of the selector, by default None.
+        The stream has its own seed.
+    """
+
+    def __init__(self, contexts: ContextStream, seed: int | None = None):
+        if not isinstance(contexts, ContextStream):
+            raise ValueError(
+                f"StreamSelector needs a ContextStream, got type {type(contexts)}."
+            )
+        super().__init__(contexts=contexts, seed=seed)  # type: ignore[arg-type]
+
+    def _index_contexts(self, contexts: Contexts | ContextTable) -> None:
+        # Ids and keys are the window of the stream, see the properties
+        pass
+
+    @property
+    def context_ids(self) -> np.ndarray:  # type: ignore[override]
+        """Ids of the contexts in the window of the stream."""
+        return np.fromiter(self.contexts, dtype=np.int64, count=len(self.contexts))
+
+    @property
+    def contexts_keys(self) -> list[int]:  # type: ignore[override]
+        """Ids of the contexts in the window of the stream (ids are the keys)."""
+        return list(self.contexts)
+
+    @property
+    def context_key(self) -> int | None:
+        return self.context_id
+
+    def _select(self) -> Tuple[Context, int]:
+        if self.context_id is None:
+            # The first context is drawn when the stream is created
+            context_id = self.contexts.latest_id
+        else:
+            context_id = self.contexts.draw()
+        return self.contexts[context_id], context_id
+
+
+def make_context_selector(
+    contexts: Contexts | ContextTable | ContextStream,
+    context_selector: AbstractSelector | type[AbstractSelector] | None = None,
+    context_selector_kwargs: dict | None = None,
+) -> AbstractSelector:
+    """
+    Build a context selector.
+
+    Parameters
+    ----------
+    contexts : Contexts | ContextTable | ContextStream
+        Context set or stream the selector selects from.
+    context_selector : AbstractSelector | type[AbstractSelector] | None, optional
+        The context selector, by default None. If None, use a round robin selector,
+        or a `StreamSelector` for a context stream.
+        Can be an object or class. For the latter, you can pass kwargs.
+    context_selector_kwargs : dict | None, optional
+        Keyword arguments for the context selector if it is passed as a class.
+
+    Returns
+    -------
+    AbstractSelector
+        The context selector.
+
+    Raises
+    ------
+    ValueError
+        If `context_selector` is neither None nor an `AbstractSelector` class or instance.
+    """
+    if context_selector is None:
+        if isinstance(contexts, ContextStream):
+            return StreamSelector(contexts=contexts)
+        return RoundRobinSelector(contexts=contexts)
+    elif isinstance(context_selector, AbstractSelector):
+        return context_selector
+    elif inspect.isclass(context_selector) and issubclass(
+        context_selector, AbstractSelector
+    ):
+        if context_selector_kwargs is None:
+            context_selector_kwargs = {}
+        context_selector_kwargs = dict(context_selector_kwargs, contexts=contexts)
+        return context_selector(**context_selector_kwargs)
+    else:
+        raise ValueError(
+            f"Context selector must be None or an AbstractSelector class or instance. "
+            f"Got type {type(context_selector)}."
+        )
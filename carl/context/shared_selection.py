@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from typing import Any, Tuple
+
+import multiprocessing as mp
+
+import numpy as np
+
+from carl.context.context_table import ContextTable
+from carl.context.selection import AbstractSelector
+from carl.utils.types import Context, Contexts
+
+SCHEDULES = ("round_robin", "random")
+
+
+class SharedSchedule(object):
+    """
+    Global context schedule shared by several processes.
+
+    The schedule is a sequence of context ids, repeating passes over the
+    context set: in order ("round_robin") or in a new random order for every
+    pass ("random"). Its only shared state is a cursor into the sequence in
+    shared memory. Processes lease consecutive ids by advancing the cursor
+    under a multiprocessing lock, so every position of the schedule is handed
+    out exactly once and the context set is covered evenly across all
+    processes. The lock is taken once per lease, not per selection, see
+    `SharedSelector`. Random orders are derived from the seed and the pass
+    number in every process, so they are never exchanged, and visit counts
+    are computed from the cursor. Priorities are not shared, a
+    `PrioritizedSelector` only prioritizes within its own process.
+
+    Create the schedule in the main process and pass it to the workers when
+    they are started, e.g. in the `context_selector_kwargs` of
+    `CARLAsyncVectorEnv` (see `SharedSelector`).
+
+    Parameters
+    ----------
+    n_contexts : int
+        Size of the context set.
+    schedule : str, optional
+        Order of the contexts in each pass, "round_robin" (default) or "random".
+    seed : int | None, optional
+        Seed of the random orders, by default None. If None, it is drawn from
+        OS entropy.
+    context : str | None, optional
+        Multiprocessing start method of the workers, by default None
+        (platform default).
+
+    Raises
+    ------
+    ValueError
+        If there are no contexts or the schedule is unknown.
+    """
+
+    def __init__(
+        self,
+        n_contexts: int,
+        schedule: str = "round_robin",
+        seed: int | None = None,
+        context: str | None = None,
+    ) -> None:
+        if n_contexts < 1:
+            raise ValueError("The schedule needs at least one context.")
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Unknown schedule `{schedule}`, use one of {SCHEDULES}.")
+        self.n_contexts = n_contexts
+        self.schedule = schedule
+        if seed is None:
+            # Fresh OS entropy, shared with the workers through pickling
+            seed = int(np.random.SeedSequence().entropy % 2**63)
+        self.seed = seed
+        ctx = mp.get_context(context)
+        self._cursor = ctx.RawValue("q", 0)
+        self._lock = ctx.Lock()
+        self._orders: dict[int, np.ndarray] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_orders"] = {}
+        return state
+
+    @property
+    def cursor(self) -> int:
+        """Number of context ids leased by all processes."""
+        return self._cursor.value
+
+    def order(self, n_pass: int) -> np.ndarray:
+        """Context ids of a pass in schedule order.
+
+        Parameters
+        ----------
+        n_pass : int
+            Number of the pass.
+
+        Returns
+        -------
+        np.ndarray
+            Permutation of the context ids.
+        """
+        if self.schedule == "round_robin":
+            n_pass = 0
+        order = self._orders.get(n_pass)
+        if order is None:
+            if self.schedule == "round_robin":
+                order = np.arange(self.n_contexts, dtype=np.int64)
+            else:
+                rng = np.random.default_rng([self.seed, n_pass])
+                order = rng.permutation(self.n_contexts).astype(np.int64)
+            # Leases only move forward, so older passes are not needed again
+            self._orders = {n_pass: order}
+        return order
+
+    def ids_between(self, start: int, stop: int) -> np.ndarray:
+        """Context ids at the positions `start, ..., stop - 1` of the schedule.
+
+        Parameters
+        ----------
+        start : int
+            First position.
+        stop : int
+            Position after the last one.
+
+        Returns
+        -------
+        np.ndarray
+            Context ids.
+        """
+        ids = []
+        while start < stop:
+            n_pass, offset = divmod(start, self.n_contexts)
+            end = min(stop, (n_pass + 1) * self.n_contexts)
+            ids.append(self.order(n_pass)[offset : offset + end - start])
+            start = end
+        if len(ids) == 1:
+            return ids[0]
+        return np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+
+    def lease(self, n: int) -> np.ndarray:
+        """Lease the next context ids of the schedule.
+
+        Parameters
+        ----------
+        n : int
+            Number of context ids.
+
+        Returns
+        -------
+        np.ndarray
+            Context ids in schedule order, not leased by any other process.
+
+        Notes
+        -----
+        Advancing the cursor takes the lock of the schedule, so concurrent
+        leases of many processes are serialized.
+        """
+        with self._lock:
+            start = self._cursor.value
+            self._cursor.value = start + n
+        return self.ids_between(start, start + n)
+
+    @property
+    def visit_counts(self) -> np.ndarray:
+        """Number of times every context has been leased."""
+        cursor = self.cursor
+        n_passes, n_partial = divmod(cursor, self.n_contexts)
+        counts = np.full(self.n_contexts, n_passes, dtype=np.int64)
+        counts[self.order(n_passes)[:n_partial]] += 1
+        return counts
+
+
+class SharedSelector(AbstractSelector):
+    """
+    Selector drawing contexts from a schedule shared by several processes.
+
+    All selectors of a `SharedSchedule`, e.g. one per worker of a
+    `CARLAsyncVectorEnv`, select from one global schedule instead of each
+    covering the context set on its own. Context ids are leased from the
+    schedule in batches of `lease_size`, so most selections only take an id
+    from the local lease and need no synchronization. Larger leases make
+    selections cheaper and the global order less strict.
+
+    Every selector needs the complete context set, so `CARLAsyncVectorEnv`
+    sends it to every worker instead of a shard. Context dictionaries are
+    copied into each worker, a `ContextTable` loaded from disk is shared
+    through its memory map.
+
+    Parameters
+    ----------
+    contexts: Contexts | ContextTable
+        Set of contexts, the same in all processes.
+    schedule: SharedSchedule
+        The shared schedule.
+    lease_size: int, optional
+        Number of context ids leased at once, by default 16.
+    seed: int | None, optional
+        Seed of the random generator `rng` of the selector, by default None.
+        The schedule has its own seed.
+
+    Raises
+    ------
+    ValueError
+        If the size of the context set does not match the schedule or the
+        lease size is smaller than 1.
+
+    Examples
+    --------
+    >>> schedule = SharedSchedule(len(contexts), schedule="random", seed=0)
+    >>> env = CARLAsyncVectorEnv(
+    >>>     CARLCartPole,
+    >>>     num_envs=64,
+    >>>     contexts=contexts,
+    >>>     context_selector=SharedSelector,
+    >>>     context_selector_kwargs={"schedule": schedule},
+    >>> )
+    """
+
+    def __init__(
+        self,
+        contexts: Contexts | ContextTable,
+        schedule: SharedSchedule,
+        lease_size: int = 16,
+        seed: int | None = None,
+    ):
+        super().__init__(contexts=contexts, seed=seed)
+        if len(contexts) != schedule.n_contexts:
+            raise ValueError(
+                f"Got {len(contexts)} contexts for a schedule of "
+                f"{schedule.n_contexts} contexts."
+            )
+        if lease_size < 1:
+            raise ValueError(f"Lease size must be at least 1, got {lease_size}.")
+        self.schedule = schedule
+        self.lease_size = lease_size
+        self._lease = np.empty(0, dtype=np.int64)
+        self._lease_position = 0
+
+    def _take(self, n: int) -> np.ndarray:
+        available = len(self._lease) - self._lease_position
+        if available < n:
+            self._lease = np.concatenate(
+                [
+                    self._lease[self._lease_position :],
+                    self.schedule.lease(n - available + self.lease_size - 1),
+                ]
+            )
+            self._lease_position = 0
+        context_ids = self._lease[self._lease_position : self._lease_position + n]
+        self._lease_position += n
+        return context_ids
+
+    def _select(self) -> Tuple[Context, int]:
+        context_id = int(self._take(1)[0])
+        context = self.contexts[self.contexts_keys[context_id]]
+        return context, context_id
+
+    def _select_batch(self, n: int) -> np.ndarray:
+        return self._take(n).copy()
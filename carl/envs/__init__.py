@@ -1,18 +1,63 @@
 # flake8: noqa: F401
-# Modular imports
+# Modular, lazy imports: env classes are imported on first access, so importing
+# carl does not import the backends (Box2D, Brax/JAX, dm_control, Mario, RNA).
+from __future__ import annotations
+
+from typing import Any
+
+import importlib
 import importlib.util as iutil
 import warnings
 
-# Classic control is in gym and thus necessary for the base version to run
-from carl.envs.gymnasium import *
-
-__all__ = [
-    "CARLAcrobot",
-    "CARLCartPole",
-    "CARLMountainCar",
-    "CARLMountainCarContinuous",
-    "CARLPendulum",
-]
+# Env family: (package required for the family, module, env class names)
+ENV_FAMILIES: dict[str, tuple[str | None, str, list[str]]] = {
+    # Classic control is in gym and thus necessary for the base version to run
+    "classic_control": (
+        None,
+        "carl.envs.gymnasium.classic_control",
+        [
+            "CARLAcrobot",
+            "CARLCartPole",
+            "CARLMountainCar",
+            "CARLMountainCarContinuous",
+            "CARLPendulum",
+        ],
+    ),
+    "box2d": (
+        "Box2D",
+        "carl.envs.gymnasium.box2d",
+        ["CARLBipedalWalker", "CARLLunarLander", "CARLVehicleRacing"],
+    ),
+    "brax": (
+        "brax",
+        "carl.envs.brax",
+        [
+            "CARLBraxAnt",
+            "CARLBraxHalfcheetah",
+            "CARLBraxHopper",
+            "CARLBraxHumanoid",
+            "CARLBraxHumanoidStandup",
+            "CARLBraxInvertedDoublePendulum",
+            "CARLBraxInvertedPendulum",
+            "CARLBraxPusher",
+            "CARLBraxReacher",
+            "CARLBraxWalker2d",
+        ],
+    ),
+    "mario": ("py4j", "carl.envs.mario", ["CARLMarioEnv"]),
+    "dmc": (
+        "dm_control",
+        "carl.envs.dmc",
+        [
+            "CARLDmcFingerEnv",
+            "CARLDmcFishEnv",
+            "CARLDmcPointMassEnv",
+            "CARLDmcQuadrupedEnv",
+            "CARLDmcWalkerEnv",
+        ],
+    ),
+    "rna": ("distance", "carl.envs.rna", ["CARLRnaDesignEnv"]),
+}
 
 
 def check_spec(spec_name: str) -> bool:
@@ -39,49 +84,28 @@ def check_spec(spec_name: str) -> bool:
     return found
 
 
-# Environment loading
-found = check_spec("Box2D")
-if found:
-    from carl.envs.gymnasium.box2d import *
-
-    __all__ += ["CARLBipedalWalker", "CARLLunarLander", "CARLVehicleRacing"]
-
-found = check_spec("brax")
-if found:
-    from carl.envs.brax import *
-
-    __all__ += [
-        "CARLBraxAnt",
-        "CARLBraxHalfcheetah",
-        "CARLBraxHopper",
-        "CARLBraxHumanoid",
-        "CARLBraxHumanoidStandup",
-        "CARLBraxInvertedDoublePendulum",
-        "CARLBraxInvertedPendulum",
-        "CARLBraxPusher",
-        "CARLBraxReacher",
-        "CARLBraxWalker2d",
-    ]
+# Environment loading: only check which families are installed
+_ENV_MODULES: dict[str, str] = {}
+for _required, _module, _names in ENV_FAMILIES.values():
+    if _required is None or check_spec(_required):
+        _ENV_MODULES.update(dict.fromkeys(_names, _module))
+del _required, _module, _names
 
-found = check_spec("py4j")
-if found:
-    from carl.envs.mario import *
+_SUBMODULES = ("brax", "dmc", "gymnasium", "mario", "rna")
 
-    __all__ += ["CARLMarioEnv"]
+__all__ = list(_ENV_MODULES)
 
-found = check_spec("dm_control")
-if found:
-    from carl.envs.dmc import *
 
-    __all__ += [
-        "CARLDmcFingerEnv",
-        "CARLDmcFishEnv",
-        "CARLDmcQuadrupedEnv",
-        "CARLDmcWalkerEnv",
-    ]
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    module = _ENV_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    env_class = getattr(importlib.import_module(module), name)
+    globals()[name] = env_class
+    return env_class
 
-found = check_spec("distance")
-if found:
-    from carl.envs.rna import *
 
-    __all__ += ["CARLRnaDesignEnv"]
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
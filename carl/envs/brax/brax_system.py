@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+
+import functools
+
+import jax
+import numpy as np
+from brax.base import System
+from brax.io import mjcf
+from etils import epath
+from jax import numpy as jp
+
+# Context features which are written into the system, besides `mass_<link name>`
+SYSTEM_FEATURES = ("gravity", "ang_damping", "viscosity", "friction", "elasticity")
+
+
+@functools.lru_cache(maxsize=None)
+def load_base_system(asset_path: str) -> System:
+    """Load the system of a brax asset.
+
+    The XML is parsed once per asset and process. Systems are immutable, so
+    the same system is shared by all envs and contexts use
+    `apply_system_params` to derive their system from it.
+
+    Parameters
+    ----------
+    asset_path : str
+        Path of the MJCF asset relative to the brax package,
+        e.g. "envs/assets/ant.xml".
+
+    Returns
+    -------
+    System
+        The system with the parameters of the asset.
+    """
+    return mjcf.load(epath.resource_path("brax") / asset_path)
+
+
+def _system_params(context: Mapping[str, Any], base_sys: System) -> dict[str, Any]:
+    params = {name: context[name] for name in SYSTEM_FEATURES if name in context}
+    mass = None
+    for name, value in context.items():
+        if not name.startswith("mass"):
+            continue
+        link_name = name.split("_", 1)[-1]
+        if link_name not in base_sys.link_names:
+            raise RuntimeError(
+                f"Link {link_name} not in available link names {base_sys.link_names}. "
+                "Probably something went wrong during context creation."
+            )
+        if mass is None:
+            mass = np.array(base_sys.link.inertia.mass)
+        mass[base_sys.link_names.index(link_name)] = value
+    if mass is not None:
+        params["mass"] = mass
+    return params
+
+
+def get_system_params(
+    context: Mapping[str, Any], base_sys: System
+) -> dict[str, jax.Array]:
+    """Convert the context features of a context to system parameters.
+
+    The parameters are the arrays which `apply_system_params` writes into the
+    system. Masses are given per link by `mass_<link name>` features and are
+    collected into the complete mass vector of the system.
+
+    Parameters
+    ----------
+    context : Mapping[str, Any]
+        The context.
+    base_sys : System
+        The system the parameters are applied to.
+
+    Returns
+    -------
+    dict[str, jax.Array]
+        Parameters by name, only for the features in the context.
+
+    Raises
+    ------
+    RuntimeError
+        If a `mass_<link name>` feature names an unknown link.
+    """
+    return {
+        name: jp.asarray(value, dtype=jp.float32)
+        for name, value in _system_params(context, base_sys).items()
+    }
+
+
+def stack_system_params(
+    contexts: Sequence[Mapping[str, Any]], base_sys: System
+) -> dict[str, jax.Array]:
+    """Stack the system parameters of several contexts.
+
+    The parameters of every context (see `get_system_params`) are stacked
+    along a new leading axis, one entry per env of a batch, and transferred to
+    the device once per parameter.
+
+    Parameters
+    ----------
+    contexts : Sequence[Mapping[str, Any]]
+        One context per env.
+    base_sys : System
+        The system the parameters are applied to.
+
+    Returns
+    -------
+    dict[str, jax.Array]
+        Batched parameters by name.
+
+    Raises
+    ------
+    ValueError
+        If the contexts do not set the same system parameters.
+    """
+    params = [_system_params(context, base_sys) for context in contexts]
+    names = set(params[0])
+    if any(set(p) != names for p in params[1:]):
+        raise ValueError(
+            "All contexts of a batch must set the same system parameters, got "
+            f"{sorted({tuple(sorted(p)) for p in params})}."
+        )
+    return {
+        name: jp.asarray(np.stack([p[name] for p in params]), dtype=jp.float32)
+        for name in params[0]
+    }
+
+
+@jax.jit
+def apply_system_params(sys: System, params: dict[str, jax.Array]) -> System:
+    """Write system parameters into a system.
+
+    A pure function of the system and the parameters (see `get_system_params`),
+    compiled with `jax.jit` once per system structure and set of parameters.
+    Changing the context thus only transfers the new parameters to the device
+    instead of loading and rebuilding the system.
+
+    Parameters
+    ----------
+    sys : System
+        The base system.
+    params : dict[str, jax.Array]
+        System parameters.
+
+    Returns
+    -------
+    System
+        The system with the parameters.
+    """
+    if "gravity" in params:
+        sys = sys.replace(gravity=sys.gravity.at[2].set(params["gravity"]))
+    if "ang_damping" in params:
+        sys = sys.replace(ang_damping=params["ang_damping"])
+    if "viscosity" in params:
+        # Most assets disable fluid forces (`enable_fluid` is static), so the
+        # viscosity would be ignored. They vanish for zero viscosity and
+        # density, so enabling them keeps the dynamics of the default context.
+        sys = sys.replace(viscosity=params["viscosity"], enable_fluid=True)
+    if "mass" in params:
+        sys = sys.tree_replace({"link.inertia.mass": params["mass"]})
+    if "friction" in params or "elasticity" in params:
+        geoms = []
+        for geom in sys.geoms:
+            for name in ("friction", "elasticity"):
+                if name in params:
+                    value = getattr(geom, name)
+                    geom = geom.replace(
+                        **{name: jp.full_like(value, params[name], dtype=value.dtype)}
+                    )
+            geoms.append(geom)
+        sys = sys.replace(geoms=geoms)
+    return sys
@@ -1,7 +1,14 @@
+from __future__ import annotations
+
+from typing import Any, Mapping
+
 import gym
+import jax
 import numpy as np
-from brax.io import mjcf
-from etils import epath
+from brax.envs.base import State, Wrapper
+from jax import numpy as jp
+
+from carl.envs.brax.wrappers import SystemParamsWrapper
 
 STATE_INDICES = {
     "ant": [13, 14],
@@ -50,94 +57,179 @@ directions = [
 ]
 
 
+# Unit vector of every target direction
+DIRECTION_VALUES = {
+    3: [0, -1],
+    1: [0, 1],
+    2: [1, 0],
+    4: [-1, 0],
+    34: [-np.sqrt(0.5), -np.sqrt(0.5)],
+    14: [-np.sqrt(0.5), np.sqrt(0.5)],
+    32: [np.sqrt(0.5), -np.sqrt(0.5)],
+    12: [np.sqrt(0.5), np.sqrt(0.5)],
+    334: [
+        -np.cos(22.5 * np.pi / 180),
+        -np.sin(22.5 * np.pi / 180),
+    ],
+    434: [
+        -np.sin(22.5 * np.pi / 180),
+        -np.cos(22.5 * np.pi / 180),
+    ],
+    114: [
+        -np.cos(22.5 * np.pi / 180),
+        np.sin(22.5 * np.pi / 180),
+    ],
+    414: [
+        -np.sin(22.5 * np.pi / 180),
+        np.cos(22.5 * np.pi / 180),
+    ],
+    332: [
+        np.cos(22.5 * np.pi / 180),
+        -np.sin(22.5 * np.pi / 180),
+    ],
+    232: [
+        np.sin(22.5 * np.pi / 180),
+        -np.cos(22.5 * np.pi / 180),
+    ],
+    112: [
+        np.cos(22.5 * np.pi / 180),
+        np.sin(22.5 * np.pi / 180),
+    ],
+    212: [np.sin(22.5 * np.pi / 180), np.cos(22.5 * np.pi / 180)],
+}
+
+
+def get_goal_params(context: Mapping[str, Any]) -> dict[str, np.ndarray]:
+    """Convert the goal features of a context to goal parameters.
+
+    The goal parameters are passed to the compiled step like the system
+    parameters (see `carl.envs.brax.brax_system.get_system_params`) and
+    read by `BraxGoalWrapper`.
+
+    Parameters
+    ----------
+    context : Mapping[str, Any]
+        The context with the features `target_direction`, `target_distance`
+        and `target_radius`.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        The goal position relative to the start and the goal radius.
+    """
+    return {
+        "target_position": np.asarray(
+            DIRECTION_VALUES[context["target_direction"]], dtype=np.float32
+        )
+        * np.float32(context["target_distance"]),
+        "target_radius": np.float32(context["target_radius"]),
+    }
+
+
+class BraxGoalWrapper(Wrapper):
+    """Computes the positional goal task of brax walker envs in the brax step.
+
+    The position is integrated from the velocities in the observation, the
+    reward is the progress towards the goal and the episode terminates
+    successfully within the goal radius. Position and success are part of
+    `state.info`, so the goal task is compiled into the step, runs without
+    host synchronization and is vectorized like the env.
+
+    The goal is read from the parameters `target_position` and
+    `target_radius` of the wrapped `SystemParamsWrapper` (see
+    `get_goal_params`), with a leading batch axis for a `SystemVmapWrapper`.
+
+    Parameters
+    ----------
+    env : SystemParamsWrapper
+        The env with the goal parameters.
+    env_name : str
+        Name of the brax env, a key of `STATE_INDICES`.
+    dt : float
+        Time step of the position integration.
+
+    Raises
+    ------
+    ValueError
+        If the env is not a `SystemParamsWrapper`.
+    """
+
+    def __init__(self, env: SystemParamsWrapper, env_name: str, dt: float):
+        if not isinstance(env, SystemParamsWrapper):
+            raise ValueError("The goal wrapper must wrap a `SystemParamsWrapper`.")
+        super().__init__(env)
+        if env_name in ["humanoid", "halfcheetah", "hopper", "walker2d"]:
+            env.unwrapped._forward_reward_weight = 0
+        self.indices = np.array(STATE_INDICES[env_name])
+        self.dt = dt
+
+    def reset(self, rng: jax.Array) -> State:
+        state = self.env.reset(rng)
+        state.info["position"] = jp.zeros(state.obs.shape[:-1] + (2,))
+        state.info["success"] = jp.zeros_like(state.done)
+        # The position restarts after the episode was reset automatically
+        state.info["goal_reset"] = jp.zeros_like(state.done)
+        return state
+
+    def step(self, state: State, action: jax.Array) -> State:
+        goal_position = self.env.params["target_position"]
+        goal_radius = self.env.params["target_radius"]
+        position = jp.where(
+            state.info["goal_reset"][..., None] > 0, 0.0, state.info["position"]
+        )
+        state = self.env.step(state, action)
+        new_position = position + state.obs[..., self.indices] * self.dt
+        current_distance_to_goal = jp.linalg.norm(goal_position - new_position, axis=-1)
+        previous_distance_to_goal = jp.linalg.norm(goal_position - position, axis=-1)
+        direction_reward = jp.maximum(
+            0.0, previous_distance_to_goal - current_distance_to_goal
+        )
+        success = jp.where(current_distance_to_goal <= goal_radius, 1.0, 0.0)
+        done = jp.maximum(state.done, success)
+        state.info.update(position=new_position, success=success, goal_reset=done)
+        return state.replace(reward=direction_reward, done=done)
+
+
 class BraxWalkerGoalWrapper(gym.Wrapper):
-    """Adds a positional goal to brax walker envs"""
+    """Adds a positional goal to brax walker envs
+
+    The goal task is computed in the compiled step by a `BraxGoalWrapper`,
+    this wrapper exposes its state. `position` is the current position (a
+    device array), `goal_position` and `goal_radius` the current goal.
+    """
 
     def __init__(self, env: gym.Env, env_name: str, asset_path: str) -> None:
         super().__init__(env)
-        self.env_name = env_name
-        if (
-            self.env_name == "humanoid"
-            or self.env_name == "halfcheetah"
-            or self.env_name == "hopper"
-            or self.env_name == "walker2d"
+        brax_env = env.unwrapped._env
+        while isinstance(brax_env, Wrapper) and not isinstance(
+            brax_env, BraxGoalWrapper
         ):
-            self.env._forward_reward_weight = 0
+            brax_env = brax_env.env
+        if not isinstance(brax_env, BraxGoalWrapper):
+            raise ValueError("The brax env must be wrapped by a `BraxGoalWrapper`.")
+        self.env_name = env_name
+        self.asset_path = asset_path
         self.context = None
         self.position = None
         self.goal_position = None
         self.goal_radius = None
-        self.direction_values = {
-            3: [0, -1],
-            1: [0, 1],
-            2: [1, 0],
-            4: [-1, 0],
-            34: [-np.sqrt(0.5), -np.sqrt(0.5)],
-            14: [-np.sqrt(0.5), np.sqrt(0.5)],
-            32: [np.sqrt(0.5), -np.sqrt(0.5)],
-            12: [np.sqrt(0.5), np.sqrt(0.5)],
-            334: [
-                -np.cos(22.5 * np.pi / 180),
-                -np.sin(22.5 * np.pi / 180),
-            ],
-            434: [
-                -np.sin(22.5 * np.pi / 180),
-                -np.cos(22.5 * np.pi / 180),
-            ],
-            114: [
-                -np.cos(22.5 * np.pi / 180),
-                np.sin(22.5 * np.pi / 180),
-            ],
-            414: [
-                -np.sin(22.5 * np.pi / 180),
-                np.cos(22.5 * np.pi / 180),
-            ],
-            332: [
-                np.cos(22.5 * np.pi / 180),
-                -np.sin(22.5 * np.pi / 180),
-            ],
-            232: [
-                np.sin(22.5 * np.pi / 180),
-                -np.cos(22.5 * np.pi / 180),
-            ],
-            112: [
-                np.cos(22.5 * np.pi / 180),
-                np.sin(22.5 * np.pi / 180),
-            ],
-            212: [np.sin(22.5 * np.pi / 180), np.cos(22.5 * np.pi / 180)],
-        }
-        path = epath.resource_path("brax") / asset_path
-        sys = mjcf.load(path)
-        self.dt = sys.dt
+        self.direction_values = DIRECTION_VALUES
+        self.dt = brax_env.dt
 
     def reset(self, seed=None, options={}):
         state, info = self.env.reset(seed=seed, options=options)
-        self.position = (0, 0)
-        self.goal_position = (
-            np.array(self.direction_values[self.context["target_direction"]])
-            * self.context["target_distance"]
-        )
-        self.goal_radius = self.context["target_radius"]
-        info["success"] = 0
+        brax_state = self.env.unwrapped._state
+        params = self.env.unwrapped.system_params
+        self.position = brax_state.info["position"]
+        self.goal_position = params["target_position"]
+        self.goal_radius = params["target_radius"]
+        info["success"] = brax_state.info["success"]
         return state, info
 
     def step(self, action):
-        state, _, te, tr, info = self.env.step(action)
-        indices = STATE_INDICES[self.env_name]
-        new_position = (
-            np.array(list(self.position))
-            + np.array([state[indices[0]], state[indices[1]]]) * self.dt
-        )
-        current_distance_to_goal = np.linalg.norm(self.goal_position - new_position)
-        previous_distance_to_goal = np.linalg.norm(self.goal_position - self.position)
-        direction_reward = max(0, previous_distance_to_goal - current_distance_to_goal)
-        self.position = new_position
-        if abs(current_distance_to_goal) <= self.goal_radius:
-            te = True
-            info["success"] = 1
-        else:
-            info["success"] = 0
-        return state, direction_reward, te, tr, info
+        state, reward, te, tr, info = self.env.step(action)
+        self.position = self.env.unwrapped._state.info["position"]
+        return state, reward, te, tr, info
 
 
 class BraxLanguageWrapper(gym.Wrapper):
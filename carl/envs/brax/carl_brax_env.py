@@ -1,135 +1,53 @@
 from __future__ import annotations
 
-from typing import Any
-
-from dataclasses import asdict
+from typing import Any, Mapping
 
 import brax
 import gymnasium
 import numpy as np
-from brax.base import Geometry, Inertia, Link, System
-from brax.io import mjcf
-from etils import epath
+from brax.envs.wrappers import training
 from jax import numpy as jp
 
+from carl.context.context_space import ContextConstraint
 from carl.context.selection import AbstractSelector
+from carl.envs.brax.brax_system import (
+    get_system_params,
+    load_base_system,
+    stack_system_params,
+)
 from carl.envs.brax.brax_walker_goal_wrapper import (
+    BraxGoalWrapper,
     BraxLanguageWrapper,
     BraxWalkerGoalWrapper,
+    get_goal_params,
+)
+from carl.envs.brax.wrappers import (
+    GymWrapper,
+    SystemParamsWrapper,
+    SystemVmapWrapper,
+    VectorGymWrapper,
+    check_output_backend,
+    to_output_backend,
 )
-from carl.envs.brax.wrappers import GymWrapper, VectorGymWrapper
 from carl.envs.carl_env import CARLEnv
+from carl.utils.cache import LRUCache, context_hash
 from carl.utils.types import Context, Contexts
 
+# Those context features can be updated + every feature starting with `mass_`
+REGISTERED_CONTEXT_FEATURES = [
+    "friction",
+    "ang_damping",
+    "gravity",
+    "viscosity",
+    "elasticity",
+    "target_distance",
+    "target_direction",
+    "target_radius",
+]
 
-def set_geom_attr(
-    geom: Geometry, data: dict[str, Any], context: dict[str, Any], key: str
-) -> dict:
-    """Set Geometry attribute
-
-    Check whether the desired attribute is present both in the geometry and in the context.
-
-    Parameters
-    ----------
-    geom : Geometry
-        Brax geometry (a surface or spatial volume with a shape and material properties)
-    data : dict[str, Any]
-        Data from the Geometry dataclass, potentially already modified.
-    context : dict[str, Any]
-        The context to set.
-    key : str
-        The context feature to update.
-
-    Returns
-    -------
-    dict
-        Modified data from the geometry dataclas.
-    """
-    if key in context and key in data:
-        value = getattr(geom, key)
-        n_items = len(value)
-        vec = jp.array([context[key]] * n_items)
-        data[key] = vec
-    return data
-
-
-def set_masses2(sys: System, context: dict[str, Any]) -> System:
-    for cfname, cfvalue in context.items():
-        if cfname.startswith("mass"):
-            link_name = cfname.split("_")[-1]
-            if link_name in sys.link_names:
-                idx = sys.link_names.index(link_name)
-                sys.link.inertia.mass.at[idx].set(cfvalue)
-    return sys
-
-
-def _set_masses(
-    context: dict[str, Any], inertia: Inertia, link_names: list[str]
-) -> Inertia:
-    """Actual/helper method to set masses
-
-    The required syntax for masses is as follows:
-    `mass_<linkname>` where linkname is the name of the entity to update, e.g. torso.
-
-    Parameters
-    ----------
-    context : dict[str, Any]
-        Context to set
-    inertia : Inertia
-        The inertia dataclass.
-    link_names : list[str]
-        Available link names.
-
-    Raises
-    ------
-    RuntimeError
-        When link name not in available names
-
-    Returns
-    -------
-    Inertia
-        Update inertia dataclass.
-    """
-    inertia_data = asdict(inertia)
-    for cfname, cfvalue in context.items():
-        if cfname.startswith("mass"):
-            link_name = cfname.split("_", 1)[-1]
-            if link_name in link_names:
-                idx = link_names.index(link_name)
-                inertia_data["mass"] = inertia_data["mass"].at[idx].set(cfvalue)
-            else:
-                raise RuntimeError(
-                    f"Link {link_name} not in available link names {link_names}. Probably "
-                    "something went wrong during context creation."
-                )
-    inertia_new = Inertia(**inertia_data)
-    return inertia_new
-
-
-def set_masses(sys: System, context: dict[str, Any]) -> System:
-    """Set masses
 
-    The required syntax for masses is as follows:
-    `mass_<linkname>` where linkname is the name of the entity to update, e.g. torso.
-
-    Parameters
-    ----------
-    sys : System
-        The brax system definition.
-    context : dict[str, Any]
-        Context to set.
-
-    Returns
-    -------
-    System
-        The updated system.
-    """
-    link_data = asdict(sys.link)
-    inertia_new = _set_masses(context, sys.link.inertia, sys.link_names)
-    link_data["inertia"] = inertia_new
-    link_new = Link(**link_data)
-    sys = sys.replace(link=link_new)
-    return sys
+def target_outside_radius(context: Mapping[str, np.ndarray]) -> np.ndarray:
+    return context["target_radius"] < context["target_distance"]
 
 
 def check_context(
@@ -157,6 +75,8 @@ class CARLBraxEnv(CARLEnv):
         context_selector: AbstractSelector | type[AbstractSelector] | None = None,
         context_selector_kwargs: dict = None,
         use_language_goals: bool = False,
+        simulator_cache: LRUCache | None = None,
+        output_backend: str = "jax",
         **kwargs,
     ) -> None:
         """
@@ -171,6 +91,11 @@ class CARLBraxEnv(CARLEnv):
             `self.env_name` which is defined in each child class.
         batch_size : int
             Number of environments to batch together, by default 1.
+            Each env of a batch simulates its own context: on reset,
+            `batch_size` contexts are selected and their system parameters
+            are vectorized over in one compiled step. Observations,
+            contexts in the observation and `info["context_id"]` then have a
+            leading batch axis.
         contexts : Contexts | None, optional
             Context set, by default None. If it is None, we build the
             context set with the default context.
@@ -183,6 +108,18 @@ class CARLBraxEnv(CARLEnv):
         context_selector_kwargs : dict, optional
             Optional keyword arguments for the context selector, by default None.
             Only used when `context_selector` is not None.
+        simulator_cache : LRUCache | None, optional
+            Cache of the system parameters built per context, by default None.
+            If None, keep the 32 most recently used parameters of this instance.
+            Parameters are immutable, so a cache can be shared between
+            environments of the same asset.
+        output_backend : str, optional
+            Array type of observations, rewards, terminations and the context
+            vector in the observation, by default "jax". One of "jax", "numpy"
+            and "torch-dlpack" (see `carl.envs.brax.wrappers.to_output_backend`),
+            the arrays are handed out without copies. The context vector
+            (`obs_context_as_dict=False`) is encoded once per context and
+            kept on the device. Only applies if `env` is None.
 
         Attributes
         ----------
@@ -191,24 +128,13 @@ class CARLBraxEnv(CARLEnv):
         backend: str
 
         """
-        if env is None:
-            bs = batch_size if batch_size != 1 else None
-            env = brax.envs.create(
-                env_name=self.env_name, backend=self.backend, batch_size=bs
-            )
-            # Brax uses gym instead of gymnasium
-            if batch_size == 1:
-                env = GymWrapper(env)
-            else:
-                env = VectorGymWrapper(env)
-
-            # The observation space also needs to from gymnasium
-            env.observation_space = gymnasium.spaces.Box(
-                low=env.observation_space.low,
-                high=env.observation_space.high,
-                dtype=np.float32,
-            )
-
+        check_output_backend(output_backend)
+        self.output_backend = output_backend
+        self._context_vector: Any = None  # Set by `_update_context`
+        self.batch_size = batch_size
+        self.context_ids: np.ndarray | None = None  # Set by `_progress_instance`
+        self.batch_contexts: list[Context] = []
+        use_goals = False
         if contexts is not None:
             if (
                 "target_distance" in contexts[list(contexts.keys())[0]].keys()
@@ -234,11 +160,41 @@ class CARLBraxEnv(CARLEnv):
                 max_diff_dist = max(
                     [c["target_distance"] - base_dist for c in contexts.values()]
                 )
-                if max_diff_dir > 0.1 or max_diff_dist > 0.1:
-                    env = BraxWalkerGoalWrapper(env, self.env_name, self.asset_path)
-                    if use_language_goals:
-                        env = BraxLanguageWrapper(env)
+                use_goals = max_diff_dir > 0.1 or max_diff_dist > 0.1
+        if env is None:
+            # Brax uses gym instead of gymnasium
+            # Like `brax.envs.create`, but with system parameters as arguments
+            env = brax.envs.get_environment(self.env_name, backend=self.backend)
+            env = training.EpisodeWrapper(env, episode_length=1000, action_repeat=1)
+            if batch_size == 1:
+                env = SystemParamsWrapper(env)
+            else:
+                env = SystemVmapWrapper(env, batch_size)
+            if use_goals:
+                dt = load_base_system(self.asset_path).dt
+                env = BraxGoalWrapper(env, self.env_name, dt)
+            env = training.AutoResetWrapper(env)
+            if batch_size == 1:
+                env = GymWrapper(env, output_backend=output_backend)
+            else:
+                env = VectorGymWrapper(env, output_backend=output_backend)
+
+            # The observation space also needs to from gymnasium
+            env.observation_space = gymnasium.spaces.Box(
+                low=env.observation_space.low,
+                high=env.observation_space.high,
+                dtype=np.float32,
+            )
+
+        if use_goals:
+            env = BraxWalkerGoalWrapper(env, self.env_name, self.asset_path)
+            if use_language_goals:
+                env = BraxLanguageWrapper(env)
+        self.use_goals = use_goals
         self.use_language_goals = use_language_goals
+        if simulator_cache is None:
+            simulator_cache = LRUCache(max_entries=32)
+        self.simulator_cache = simulator_cache
 
         super().__init__(
             env=env,
@@ -249,64 +205,144 @@ class CARLBraxEnv(CARLEnv):
             context_selector_kwargs=context_selector_kwargs,
             **kwargs,
         )
+        if batch_size > 1 and self.flatten_obs:
+            raise ValueError("Flat observations are not supported for batched envs.")
         self.env.context = self.context
 
+    def _progress_instance(self) -> None:
+        """Select the next context, or one context per env of a batch.
+
+        The current context of a batch is the context of its last env.
+        """
+        if self.batch_size == 1:
+            super()._progress_instance()
+            return
+        self.context_ids = self.context_selector.select_batch(self.batch_size)
+        keys = self.context_selector.contexts_keys
+        self.batch_contexts = [self.contexts[keys[i]] for i in self.context_ids]
+        self.context = self.batch_contexts[-1]
+
     def _update_context(self) -> None:
+        if self.batch_size > 1:
+            self._update_batch_contexts()
+            return
         context = self.context
+        check_context(context, REGISTERED_CONTEXT_FEATURES)
+
+        # The goal features do not change the system
+        sys_context = {k: v for k, v in context.items() if not k.startswith("target_")}
+        env = self.env.unwrapped
+        if self.use_goals:
+            params = self.simulator_cache.get_or_build(
+                (self.asset_path, context_hash(context, env=type(self))),
+                lambda: {
+                    **get_system_params(sys_context, env.base_sys),
+                    **{k: jp.asarray(v) for k, v in get_goal_params(context).items()},
+                },
+            )
+        else:
+            params = self.simulator_cache.get_or_build(
+                (self.asset_path, context_hash(sys_context, env=type(self))),
+                lambda: get_system_params(sys_context, env.base_sys),
+            )
+        env.set_system_params(params)
+        self._update_context_vector()
+
+    def _update_batch_contexts(self) -> None:
+        """Set the system parameters of every env of the batch."""
+        sys_contexts = []
+        for context in self.batch_contexts:
+            check_context(context, REGISTERED_CONTEXT_FEATURES)
+            sys_contexts.append(
+                {k: v for k, v in context.items() if not k.startswith("target_")}
+            )
+        env = self.env.unwrapped
+        params = stack_system_params(sys_contexts, env.base_sys)
+        if self.use_goals:
+            goal_params = [get_goal_params(c) for c in self.batch_contexts]
+            for name in goal_params[0]:
+                params[name] = jp.asarray(np.stack([p[name] for p in goal_params]))
+        env.set_system_params(params)
+        self._update_context_vector()
+
+    def _update_context_vector(self) -> None:
+        """Encode the context features of the observation on the device."""
+        if self.obs_context_as_dict:
+            return
+        contexts = self.batch_contexts if self.batch_size > 1 else [self.context]
+        vector = np.array(
+            [[c[k] for k in self.obs_context_features] for c in contexts],
+            dtype=np.float32,
+        )
+        if self.batch_size == 1:
+            vector = vector[0]
+        self._context_vector = to_output_backend(
+            jp.asarray(vector), self.output_backend
+        )
 
-        # Those context features can be updated + every feature starting with `mass_`
-        registered_cfs = [
-            "friction",
-            "ang_damping",
-            "gravity",
-            "viscosity",
-            "elasticity",
-            "target_distance",
-            "target_direction",
-            "target_radius",
-        ]
-        check_context(context, registered_cfs)
-
-        path = epath.resource_path("brax") / self.asset_path
-        sys = mjcf.load(path)
-
-        if "gravity" in context:
-            sys = sys.replace(gravity=jp.array([0, 0, self.context["gravity"]]))
-        if "ang_damping" in context:
-            sys = sys.replace(ang_damping=self.context["ang_damping"])
-        if "viscosity" in context:
-            sys = sys.replace(ang_damping=self.context["viscosity"])
-
-        sys = set_masses(sys, context)
-
-        if "friction" in context or "elasticity" in context:
-            updated_geoms = []
-            for i, geom in enumerate(sys.geoms):
-                cls = type(geom)
-                data = asdict(geom)
-                data = set_geom_attr(geom, data, context, "friction")
-                data = set_geom_attr(geom, data, context, "elasticity")
-
-                geom_new = cls(**data)
-                updated_geoms.append(geom_new)
-            sys = sys.replace(geoms=updated_geoms)
-
-        self.env.unwrapped.sys = sys
+    def _add_context_to_state(self, state: Any) -> dict[str, Any] | np.ndarray:
+        if self.flatten_obs or (self.batch_size == 1 and self.obs_context_as_dict):
+            return super()._add_context_to_state(state)
+        if not self.obs_context_as_dict:
+            context = self._context_vector
+        else:
+            context = {
+                k: np.array([c[k] for c in self.batch_contexts])
+                for k in self.obs_context_features
+            }
+        return {"obs": state, "context": context}
+
+    @property
+    def compile_count(self) -> int:
+        """Number of times the brax `reset` and `step` have been compiled.
+
+        Context changes only change arguments of the compiled functions, so
+        this stays constant after the first reset and step.
+        """
+        return self.env.unwrapped.compile_count
+
+    def _info_context_id(self) -> int | np.ndarray | None:
+        return self.context_id if self.batch_size == 1 else self.context_ids
 
     def reset(
         self, *, seed: int | None = None, options: dict[str, Any] | None = None
     ) -> tuple[Any, dict[str, Any]]:
         """Overwrites reset in super to update context in wrapper."""
-        last_context_id = self.context_id
+        if seed is not None:
+            self.context_selector.seed(seed)
+        last_context_id = self._info_context_id()
         self._progress_instance()
-        if self.context_id != last_context_id:
+        if not np.array_equal(self._info_context_id(), last_context_id):
             self._update_context()
         self.env.context = self.context
-        state, info = self.env.reset(seed=seed, options=options)
+        state, info = self._env_reset(seed=seed, options=options)
         state = self._add_context_to_state(state)
-        info["context_id"] = self.context_id
+        info["context_id"] = self._info_context_id()
         return state, info
 
+    def step(self, action: Any) -> tuple[Any, Any, Any, Any, dict[str, Any]]:
+        """Overwrites step in super to report the context id of every env of a batch."""
+        state, reward, terminated, truncated, info = super().step(action)
+        info["context_id"] = self._info_context_id()
+        return state, reward, terminated, truncated, info
+
+    @classmethod
+    def get_context_constraints(cls) -> list[ContextConstraint]:
+        """Get the constraints between context features
+
+        For goal envs, the goal must lie outside of the goal radius, else it
+        is reached at the start.
+
+        Returns
+        -------
+        list[ContextConstraint]
+            Vectorized predicates.
+        """
+        features = cls.get_context_features()
+        if "target_distance" in features and "target_radius" in features:
+            return [target_outside_radius]
+        return []
+
     @classmethod
     def get_default_context(cls) -> Context:
         """Get the default context (without any goal features)
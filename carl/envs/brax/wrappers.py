@@ -17,19 +17,268 @@
 # limitations under the License.
 
 """Wrappers to convert brax envs to gym envs."""
-from typing import ClassVar, Optional
+
+from typing import Any, ClassVar, Dict, Iterator, Optional
+
+import contextlib
+import importlib.util as iutil
 
 import gym
 import jax
 import numpy as np
-from brax.envs.base import PipelineEnv
+from brax.base import System
+from brax.envs.base import Env, PipelineEnv, State, Wrapper
 from brax.io import image
 from gym import spaces
 from gym.vector import utils
 
+from carl.envs.brax.brax_system import apply_system_params
+
+
+class SystemParamsWrapper(Wrapper):
+    """Applies system parameters to the system of a brax env.
+
+    The parameters (see `carl.envs.brax.brax_system.get_system_params`) are
+    written into the original system of the env whenever `reset` or `step`
+    is traced. Set them with `use_params` around the call, so that they are
+    arguments of the compiled function instead of constants baked into it.
+    """
+
+    def __init__(self, env: Env):
+        super().__init__(env)
+        self.base_sys: System = env.unwrapped.sys
+        self.params: Dict[str, jax.Array] = {}
+
+    @contextlib.contextmanager
+    def use_params(self, params: Dict[str, jax.Array]) -> Iterator[None]:
+        """Apply `params` in `reset` and `step` calls within the context."""
+        self.params = params
+        try:
+            yield
+        finally:
+            # Do not keep tracers in the env after tracing
+            self.params = {}
+            self.env.unwrapped.sys = self.base_sys
+
+    def _apply(self, params: Dict[str, jax.Array]) -> None:
+        self.env.unwrapped.sys = apply_system_params(self.base_sys, params)
+
+    def reset(self, rng: jax.Array) -> State:
+        self._apply(self.params)
+        return self.env.reset(rng)
+
+    def step(self, state: State, action: jax.Array) -> State:
+        self._apply(self.params)
+        return self.env.step(state, action)
+
+
+class SystemVmapWrapper(SystemParamsWrapper):
+    """Vectorizes a brax env over per-env system parameters.
+
+    Like brax' `VmapWrapper`, but every env of the batch simulates its own
+    system: all parameters have a leading axis of size `batch_size`.
+    """
+
+    def __init__(self, env: Env, batch_size: int):
+        super().__init__(env)
+        self.batch_size = batch_size
+
+    def reset(self, rng: jax.Array) -> State:
+        def reset(params: Dict[str, jax.Array], rng: jax.Array) -> State:
+            self._apply(params)
+            return self.env.reset(rng)
+
+        rng = jax.random.split(rng, self.batch_size)
+        return jax.vmap(reset)(self.params, rng)
+
+    def step(self, state: State, action: jax.Array) -> State:
+        def step(
+            params: Dict[str, jax.Array], state: State, action: jax.Array
+        ) -> State:
+            self._apply(params)
+            return self.env.step(state, action)
+
+        return jax.vmap(step)(self.params, state, action)
+
+
+def _find_system_wrapper(env: Env) -> Optional[SystemParamsWrapper]:
+    while isinstance(env, Wrapper):
+        if isinstance(env, SystemParamsWrapper):
+            return env
+        env = env.env
+    return None
+
+
+# Array types of the observations, rewards and terminations of the wrappers
+OUTPUT_BACKENDS = ("jax", "numpy", "torch-dlpack")
+
+
+def check_output_backend(backend: str) -> None:
+    """Check that an output backend is known and its package is installed.
+
+    Parameters
+    ----------
+    backend : str
+        One of `OUTPUT_BACKENDS`.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown.
+    ImportError
+        If the backend is "torch-dlpack" and torch is not installed.
+    """
+    if backend not in OUTPUT_BACKENDS:
+        raise ValueError(
+            f"Unknown output backend `{backend}`, use one of {OUTPUT_BACKENDS}."
+        )
+    if backend == "torch-dlpack" and iutil.find_spec("torch") is None:
+        raise ImportError("The output backend `torch-dlpack` requires torch.")
+
+
+def to_output_backend(x: jax.Array, backend: str) -> Any:
+    """Convert a jax array to the array type of an output backend.
+
+    The conversion does not copy: "numpy" returns a read-only view of the
+    array on CPU (on accelerators, numpy needs a transfer to the host),
+    "torch-dlpack" a torch tensor sharing the device memory via DLPack.
+
+    Parameters
+    ----------
+    x : jax.Array
+        The array.
+    backend : str
+        One of `OUTPUT_BACKENDS`.
+
+    Returns
+    -------
+    Any
+        The jax array, numpy array or torch tensor.
+    """
+    if backend == "jax":
+        return x
+    if backend == "numpy":
+        return np.asarray(x)
+    from torch.utils import dlpack
+
+    return dlpack.from_dlpack(x)
+
+
+def _strong_types(tree: Any) -> Any:
+    # Brax steps return some weakly typed arrays, reset does not. Fixed types
+    # keep the state of reset and step alike, so `step` is traced only once.
+    return jax.tree_util.tree_map(
+        lambda x: jax.lax.convert_element_type(x, x.dtype), tree
+    )
+
+
+class _SystemParamsMixin:
+    """Compiled `reset` and `step` taking the system parameters as arguments.
+
+    The system parameters of a `SystemParamsWrapper` in the wrapped env are
+    traced arguments of the compiled functions. Setting new parameters thus
+    never recompiles, and the compiled functions never simulate a stale
+    system. `compile_count` counts the traces to verify this.
+
+    Observations, rewards and terminations are returned as arrays of
+    `output_backend`, see `to_output_backend`.
+    """
+
+    _env: Env
+    backend: Optional[str]
+    _output_backend: str = "jax"
+
+    @property
+    def output_backend(self) -> str:
+        """Array type of the outputs, one of `OUTPUT_BACKENDS`."""
+        return self._output_backend
 
-class GymWrapper(gym.Env):
-    """A wrapper that converts Brax Env to one that follows Gym API."""
+    @output_backend.setter
+    def output_backend(self, backend: str) -> None:
+        check_output_backend(backend)
+        self._output_backend = backend
+
+    def _outputs(self, *arrays: jax.Array) -> tuple:
+        return tuple(to_output_backend(x, self._output_backend) for x in arrays)
+
+    def _action(self, action: Any) -> Any:
+        if self._output_backend == "torch-dlpack" and not isinstance(
+            action, (jax.Array, np.ndarray)
+        ):
+            # Torch tensors stay on their device
+            action = jax.dlpack.from_dlpack(action)
+        return action
+
+    def _init_system(self) -> None:
+        self._system_env = _find_system_wrapper(self._env)
+        self._system_params: Dict[str, Any] = {}
+        self._trace_counts = {"reset": 0, "step": 0}
+
+        def reset(params, key):
+            self._trace_counts["reset"] += 1
+            key1, key2 = jax.random.split(key)
+            with self._use_params(params):
+                state = _strong_types(self._env.reset(key2))
+            return state, state.obs, key1
+
+        self._reset = jax.jit(reset, backend=self.backend)
+
+        def step(params, state, action):
+            self._trace_counts["step"] += 1
+            with self._use_params(params):
+                state = _strong_types(self._env.step(state, action))
+            info = {**state.metrics, **state.info}
+            return state, state.obs, state.reward, state.done, info
+
+        self._step = jax.jit(step, backend=self.backend)
+
+    def _use_params(self, params):
+        if self._system_env is None:
+            return contextlib.nullcontext()
+        return self._system_env.use_params(params)
+
+    @property
+    def base_sys(self) -> System:
+        """The original system of the env, without system parameters."""
+        if self._system_env is None:
+            return self._env.unwrapped.sys
+        return self._system_env.base_sys
+
+    @property
+    def system_params(self) -> Dict[str, jax.Array]:
+        """The system parameters of the next `reset` and `step`."""
+        return self._system_params
+
+    @property
+    def compile_count(self) -> int:
+        """Number of times `reset` and `step` have been traced and compiled."""
+        return sum(self._trace_counts.values())
+
+    def set_system_params(self, params: Dict[str, jax.Array]) -> None:
+        """Set the system parameters used from the next `reset` or `step` on.
+
+        Parameters
+        ----------
+        params : Dict[str, jax.Array]
+            System parameters, see `carl.envs.brax.brax_system.get_system_params`.
+
+        Raises
+        ------
+        ValueError
+            If the env is not wrapped by a `SystemParamsWrapper`.
+        """
+        if self._system_env is None:
+            raise ValueError("The env must be wrapped by a `SystemParamsWrapper`.")
+        self._system_params = params
+
+
+class GymWrapper(_SystemParamsMixin, gym.Env):
+    """A wrapper that converts Brax Env to one that follows Gym API.
+
+    If the env is wrapped by a `SystemParamsWrapper`, its system parameters
+    are set with `set_system_params`. They are arguments of the compiled
+    `reset` and `step`, so changing them does not trigger a recompilation.
+    """
 
     # Flag that prevents `gym.register` from misinterpreting the `_step` and
     # `_reset` as signs of a deprecated gym Env API.
@@ -41,8 +290,10 @@ class GymWrapper(gym.Env):
         seed: int = 0,
         backend: Optional[str] = None,
         render_mode: str = "rgb_array",
+        output_backend: str = "jax",
     ):
         self._env = env
+        self.output_backend = output_backend
         self.metadata = {
             "render.modes": ["human", "rgb_array"],
             "video.frames_per_second": 1 / self._env.dt,
@@ -58,28 +309,20 @@ class GymWrapper(gym.Env):
         action = np.ones(self._env.action_size, dtype="float32")
         self.action_space = spaces.Box(-action, action, dtype="float32")
 
-        def reset(key):
-            key1, key2 = jax.random.split(key)
-            state = self._env.reset(key2)
-            return state, state.obs, key1
-
-        self._reset = jax.jit(reset, backend=self.backend)
-
-        def step(state, action):
-            state = self._env.step(state, action)
-            info = {**state.metrics, **state.info}
-            return state, state.obs, state.reward, state.done, info
-
-        self._step = jax.jit(step, backend=self.backend)
+        self._init_system()
 
     def reset(self, seed: Optional[int] = None, options: dict = {}):
-        self._state, obs, self._key = self._reset(self._key)
+        self._state, obs, self._key = self._reset(self._system_params, self._key)
         # We return device arrays for pytorch users.
+        (obs,) = self._outputs(obs)
         return obs, {}
 
     def step(self, action):
-        self._state, obs, reward, done, info = self._step(self._state, action)
+        self._state, obs, reward, done, info = self._step(
+            self._system_params, self._state, self._action(action)
+        )
         # We return device arrays for pytorch users.
+        obs, reward, done = self._outputs(obs, reward, done)
         return obs, reward, done, False, info
 
     def seed(self, seed: int = 0):
@@ -90,13 +333,21 @@ class GymWrapper(gym.Env):
             sys, state = self._env.sys, self._state
             if state is None:
                 raise RuntimeError("must call reset or step before rendering")
+            if self._system_params:
+                sys = apply_system_params(self.base_sys, self._system_params)
             return image.render_array(sys, state.pipeline_state, 256, 256)
         else:
             return super().render()  # just raise an exception
 
 
-class VectorGymWrapper(gym.vector.VectorEnv):
-    """A wrapper that converts batched Brax Env to one that follows Gym VectorEnv API."""
+class VectorGymWrapper(_SystemParamsMixin, gym.vector.VectorEnv):
+    """A wrapper that converts batched Brax Env to one that follows Gym VectorEnv API.
+
+    If the env is batched by a `SystemVmapWrapper`, every env of the batch
+    simulates its own system parameters (see `set_system_params`). They are
+    arguments of the compiled `reset` and `step`, so changing them does not
+    trigger a recompilation.
+    """
 
     # Flag that prevents `gym.register` from misinterpreting the `_step` and
     # `_reset` as signs of a deprecated gym Env API.
@@ -108,8 +359,10 @@ class VectorGymWrapper(gym.vector.VectorEnv):
         seed: int = 0,
         backend: Optional[str] = None,
         render_mode="rgb_array",
+        output_backend: str = "jax",
     ):
         self._env = env
+        self.output_backend = output_backend
         self.metadata = {
             "render.modes": ["human", "rgb_array"],
             "video.frames_per_second": 1 / self._env.dt,
@@ -131,26 +384,43 @@ class VectorGymWrapper(gym.vector.VectorEnv):
         action_space = spaces.Box(-action, action, dtype="float32")
         self.action_space = utils.batch_space(action_space, self.num_envs)
 
-        def reset(key):
-            key1, key2 = jax.random.split(key)
-            state = self._env.reset(key2)
-            return state, state.obs, key1
+        self._init_system()
 
-        self._reset = jax.jit(reset, backend=self.backend)
+    def set_system_params(self, params: Dict[str, jax.Array]) -> None:
+        """Set the system parameters used from the next `reset` or `step` on.
 
-        def step(state, action):
-            state = self._env.step(state, action)
-            info = {**state.metrics, **state.info}
-            return state, state.obs, state.reward, state.done, info
+        Parameters
+        ----------
+        params : Dict[str, jax.Array]
+            Batched system parameters with a leading axis of size `num_envs`,
+            see `carl.envs.brax.brax_system.stack_system_params`.
 
-        self._step = jax.jit(step, backend=self.backend)
+        Raises
+        ------
+        ValueError
+            If the env is not batched by a `SystemVmapWrapper` or a parameter
+            is not batched.
+        """
+        if not isinstance(self._system_env, SystemVmapWrapper):
+            raise ValueError("The env must be batched by a `SystemVmapWrapper`.")
+        for name, value in params.items():
+            if value.shape[:1] != (self.num_envs,):
+                raise ValueError(
+                    f"System parameter `{name}` has shape {value.shape}, expected "
+                    f"a leading axis of size {self.num_envs}."
+                )
+        super().set_system_params(params)
 
-    def reset(self):
-        self._state, obs, self._key = self._reset(self._key)
+    def reset(self, seed: Optional[int] = None, options: dict = {}):
+        self._state, obs, self._key = self._reset(self._system_params, self._key)
+        (obs,) = self._outputs(obs)
         return obs, {}
 
     def step(self, action):
-        self._state, obs, reward, done, info = self._step(self._state, action)
+        self._state, obs, reward, done, info = self._step(
+            self._system_params, self._state, self._action(action)
+        )
+        obs, reward, done = self._outputs(obs, reward, done)
         return obs, reward, done, False, info
 
     def seed(self, seed: int = 0):
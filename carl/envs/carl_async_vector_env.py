@@ -0,0 +1,531 @@
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+import inspect
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import traceback
+import weakref
+from multiprocessing.connection import Connection
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv
+
+from carl.context.context_space import CategoricalContextFeature
+from carl.context.context_table import ContextTable
+from carl.context.selection import AbstractSelector, make_context_selector
+from carl.context.shared_selection import SharedSelector
+from carl.envs.carl_env import CARLEnv
+from carl.utils.types import Contexts
+
+
+def shard_context_indices(n_contexts: int, n_shards: int) -> list[np.ndarray]:
+    """Split the row indices of a context set into contiguous shards.
+
+    If there are fewer contexts than shards, the contexts are assigned round
+    robin, so every shard holds at least one context.
+
+    Parameters
+    ----------
+    n_contexts : int
+        Number of contexts.
+    n_shards : int
+        Number of shards.
+
+    Returns
+    -------
+    list[np.ndarray]
+        Row indices per shard.
+    """
+    if n_contexts < n_shards:
+        return [np.array([i % n_contexts]) for i in range(n_shards)]
+    return np.array_split(np.arange(n_contexts), n_shards)
+
+
+def _take_contexts(
+    contexts: Contexts | ContextTable, indices: np.ndarray
+) -> Contexts | ContextTable:
+    if isinstance(contexts, ContextTable):
+        return contexts.take(indices)
+    keys = list(contexts.keys())
+    return {keys[i]: contexts[keys[i]] for i in indices}
+
+
+class _SharedBuffers:
+    """Shared memory arrays written by the workers and read by the parent."""
+
+    def __init__(self, ctx: Any, num_envs: int, obs_dim: int, n_features: int):
+        self.num_envs = num_envs
+        self.obs_dim = obs_dim
+        self.n_features = n_features
+        self._obs = ctx.Array("f", num_envs * obs_dim, lock=False)
+        self._rewards = ctx.Array("d", num_envs, lock=False)
+        self._terminated = ctx.Array("b", num_envs, lock=False)
+        self._truncated = ctx.Array("b", num_envs, lock=False)
+        self._context_ids = ctx.Array("q", num_envs, lock=False)
+        self._context_values = ctx.Array("d", num_envs * n_features, lock=False)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """NumPy views of the shared memory (also valid in the workers)."""
+        n = self.num_envs
+        return {
+            "obs": np.frombuffer(self._obs, dtype=np.float32).reshape(n, -1),
+            "rewards": np.frombuffer(self._rewards, dtype=np.float64),
+            "terminated": np.frombuffer(self._terminated, dtype=np.int8),
+            "truncated": np.frombuffer(self._truncated, dtype=np.int8),
+            "context_ids": np.frombuffer(self._context_ids, dtype=np.int64),
+            "context_values": np.frombuffer(
+                self._context_values, dtype=np.float64
+            ).reshape(n, -1),
+        }
+
+
+class _ShardState:
+    """State of the context shard a worker owns."""
+
+    def __init__(self, env: CARLEnv, shard_ids: np.ndarray) -> None:
+        self.env = env
+        self.shard_ids = shard_ids
+        self.last_context_id: int | None = None
+
+    def write_context(self, index: int, arrays: dict[str, np.ndarray]) -> int:
+        context_id = int(self.shard_ids[self.env.context_id])
+        if self.env.context_id != self.last_context_id:
+            arrays["context_values"][
+                index
+            ] = self.env.get_context_space().encode_context(self.env.context)
+            self.last_context_id = self.env.context_id
+        arrays["context_ids"][index] = context_id
+        return context_id
+
+
+def _worker(
+    index: int,
+    env_class: type[CARLEnv],
+    env_kwargs: dict[str, Any],
+    shard: Contexts | ContextTable,
+    shard_ids: np.ndarray,
+    context_selector: type[AbstractSelector] | None,
+    context_selector_kwargs: dict | None,
+    pipe: Connection,
+    parent_pipe: Connection,
+    buffers: _SharedBuffers,
+) -> None:
+    parent_pipe.close()
+    env = None
+    try:
+        env = env_class(
+            contexts=shard,
+            context_selector=context_selector,
+            context_selector_kwargs=context_selector_kwargs,
+            flatten_obs="inplace",
+            **env_kwargs,
+        )
+        arrays = buffers.arrays()
+        state = _ShardState(env, shard_ids)
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                obs, info = env.reset(**data)
+                arrays["obs"][index] = obs
+                info["context_id"] = state.write_context(index, arrays)
+                pipe.send((info, True))
+            elif command == "step":
+                obs, reward, terminated, truncated, info = env.step(data)
+                arrays["rewards"][index] = reward
+                arrays["terminated"][index] = terminated
+                arrays["truncated"][index] = truncated
+                # The context only changes on reset, also after `set_contexts`
+                info["context_id"] = int(arrays["context_ids"][index])
+                if terminated or truncated:
+                    final_obs, final_info = obs.copy(), info
+                    obs, info = env.reset()
+                    info["context_id"] = state.write_context(index, arrays)
+                    info["final_observation"] = final_obs
+                    info["final_info"] = final_info
+                arrays["obs"][index] = obs
+                pipe.send((info, True))
+            elif command == "set_contexts":
+                shard, shard_ids = data
+                env.contexts = shard
+                env.context_selector = make_context_selector(
+                    contexts=env.contexts,
+                    context_selector=context_selector,
+                    context_selector_kwargs=context_selector_kwargs,
+                )
+                state.shard_ids = shard_ids
+                state.last_context_id = None
+                pipe.send((None, True))
+            elif command == "close":
+                pipe.send((None, True))
+                break
+            else:
+                raise RuntimeError(f"Received unknown command `{command}`.")
+    except (KeyboardInterrupt, Exception):
+        pipe.send((traceback.format_exc(), False))
+    finally:
+        if env is not None:
+            env.close()
+
+
+class CARLAsyncVectorEnv(VectorEnv):
+    """
+    Vectorized CARL environment running each copy in a subprocess.
+
+    The context set is split into shards: each worker owns one shard and its own
+    context selector, so contexts are selected inside the workers. Observations,
+    rewards, termination flags, context ids and context vectors are written by
+    the workers into preallocated shared memory instead of being pickled. Only
+    actions and info dictionaries are sent through pipes.
+
+    Like gymnasium's `AsyncVectorEnv`, copies are reset automatically once their
+    episode ends and the last observation is returned in `info["final_observation"]`.
+
+    Parameters
+    ----------
+    env_class : type[CARLEnv]
+        The CARL environment class to run. It must have a `Box` observation space.
+    num_envs : int
+        Number of environment copies (and worker processes).
+    contexts : Contexts | ContextTable | str | os.PathLike | None, optional
+        Context set, by default None. If None, use the default context. A path
+        of a table saved with `ContextTable.save` is memory-mapped, and the
+        workers map their shards from the same file instead of receiving copies.
+    obs_context_features : list[str] | None, optional
+        Context features which should be included in the observation, by default None.
+        If they are None, add all context features.
+    context_selector : type[AbstractSelector] | None, optional
+        The context selector class, by default None. If None, use a round robin
+        selector. Each worker creates its own selector for its shard. A
+        `SharedSelector` instead selects from the complete context set, with a
+        schedule shared by all workers. A context set passed as dictionary is
+        then saved to a temporary `ContextTable`, which the workers memory-map
+        instead of each receiving a copy.
+    context_selector_kwargs : dict | None, optional
+        Keyword arguments for the context selector.
+    env_kwargs : dict | None, optional
+        Further keyword arguments for `env_class`.
+    flatten_obs : bool, optional
+        Whether to return the observations as one float32 array of shape
+        (num_envs, state dim + context dim), by default False. If False, the
+        observation is a dictionary of "obs" and "context" arrays.
+    copy : bool, optional
+        Whether to return copies of the shared observation buffer, by default True.
+        If False, the returned arrays are overwritten by the next step.
+    context : str | None, optional
+        Multiprocessing start method, by default None (platform default).
+
+    Attributes
+    ----------
+    context_ids : np.ndarray
+        Row index in `contexts` of the current context of every copy
+        (read-only view of shared memory).
+    context_values : np.ndarray
+        Current context of every copy in the vector encoding of the context
+        space, shape (num_envs, n_features) (read-only view of shared memory).
+    shards : list[np.ndarray]
+        Row indices of the contexts owned by each worker.
+
+    Raises
+    ------
+    ValueError
+        If `context_selector` is a selector instance. Pass the class instead, as every
+        worker needs its own selector. Also if a context feature in the observation
+        is categorical, as the workers write flat float observations.
+    """
+
+    def __init__(
+        self,
+        env_class: type[CARLEnv],
+        num_envs: int,
+        contexts: Contexts | ContextTable | str | os.PathLike | None = None,
+        obs_context_features: list[str] | None = None,
+        context_selector: type[AbstractSelector] | None = None,
+        context_selector_kwargs: dict | None = None,
+        env_kwargs: dict | None = None,
+        flatten_obs: bool = False,
+        copy: bool = True,
+        context: str | None = None,
+    ) -> None:
+        if context_selector is not None and not inspect.isclass(context_selector):
+            raise ValueError(
+                "Pass the context selector as a class, every worker creates its own "
+                f"selector. Got {type(context_selector)}."
+            )
+        self.env_class = env_class
+        context_space = env_class.get_context_space()
+        categorical = [
+            name
+            for name in obs_context_features or context_space.context_feature_names
+            if isinstance(
+                context_space.context_space.get(name), CategoricalContextFeature
+            )
+        ]
+        if categorical:
+            raise ValueError(
+                f"{type(self).__name__} only supports numerical context features in "
+                f"the observation, got the categorical features {categorical}. "
+                "Leave them out of `obs_context_features`."
+            )
+        self._context_selector = context_selector
+        self._context_selector_kwargs = context_selector_kwargs
+        self._tmpdirs: list[weakref.finalize] = []
+        if contexts is None:
+            contexts = {0: env_class.get_default_context()}
+        contexts = self._share_contexts(contexts)
+        self.contexts = contexts
+        self.flatten_obs = flatten_obs
+        self.copy = copy
+        env_kwargs = dict(env_kwargs or {}, obs_context_features=obs_context_features)
+
+        # Dummy environment to get the spaces
+        dummy_env = env_class(contexts=contexts, flatten_obs=True, **env_kwargs)
+        base_observation_space = dummy_env.base_observation_space
+        self.obs_context_features: list[str] = dummy_env.obs_context_features
+        single_flat_space = dummy_env.observation_space
+        single_action_space = dummy_env.action_space
+        dummy_env.close()
+        del dummy_env
+
+        self._n_state = int(np.prod(base_observation_space.shape))
+        self._base_shape = base_observation_space.shape
+        single_observation_space: spaces.Space
+        if flatten_obs:
+            single_observation_space = single_flat_space
+        else:
+            single_observation_space = spaces.Dict(
+                {
+                    "obs": base_observation_space,
+                    "context": context_space.to_gymnasium_space(
+                        context_feature_names=self.obs_context_features
+                    ),
+                }
+            )
+        super().__init__(
+            num_envs=num_envs,
+            observation_space=single_observation_space,
+            action_space=single_action_space,
+        )
+
+        ctx = mp.get_context(context)
+        self._buffers = _SharedBuffers(
+            ctx, num_envs, single_flat_space.shape[0], context_space.n_features
+        )
+        arrays = self._buffers.arrays()
+        self._obs = arrays["obs"]
+        self._rewards = arrays["rewards"]
+        self._terminated = arrays["terminated"]
+        self._truncated = arrays["truncated"]
+        self.context_ids = arrays["context_ids"]
+        self.context_values = arrays["context_values"]
+        self.context_ids.fill(-1)
+        for array in (self.context_ids, self.context_values):
+            # The parent only reads the context buffers
+            array.flags.writeable = False
+
+        self.shards = self._make_shards(len(contexts))
+        self.parent_pipes: list[Connection] = []
+        self.processes: list[mp.process.BaseProcess] = []
+        for index, shard_ids in enumerate(self.shards):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(  # type: ignore [attr-defined]
+                target=_worker,
+                name=f"Worker<{type(self).__name__}>-{index}",
+                args=(
+                    index,
+                    env_class,
+                    env_kwargs,
+                    _take_contexts(contexts, shard_ids),
+                    shard_ids,
+                    context_selector,
+                    context_selector_kwargs,
+                    child_pipe,
+                    parent_pipe,
+                    self._buffers,
+                ),
+                daemon=True,
+            )
+            self.parent_pipes.append(parent_pipe)
+            self.processes.append(process)
+            process.start()
+            child_pipe.close()
+        self.closed = False
+
+    def _shares_contexts(self) -> bool:
+        return inspect.isclass(self._context_selector) and issubclass(
+            self._context_selector, SharedSelector
+        )
+
+    def _share_contexts(
+        self, contexts: Contexts | ContextTable | str | os.PathLike
+    ) -> Contexts | ContextTable:
+        context_space = self.env_class.get_context_space()
+        if isinstance(contexts, (str, os.PathLike)):
+            return ContextTable.load(contexts, context_space=context_space)
+        if isinstance(contexts, ContextTable) or not self._shares_contexts():
+            return contexts
+        # Every worker gets the complete set, so save it once and let the
+        # workers memory-map it instead of pickling a copy for each of them
+        table = ContextTable.from_contexts(
+            {k: context_space.insert_defaults(v) for k, v in contexts.items()}
+        )
+        tmpdir = tempfile.mkdtemp(prefix="carl_contexts_")
+        # Removed on `close`, or when the env is garbage collected
+        finalizer = weakref.finalize(self, shutil.rmtree, tmpdir, ignore_errors=True)
+        try:
+            table.save(tmpdir, context_space)
+        except (TypeError, ValueError):
+            # E.g. keys which cannot be saved, a columnar copy is still smaller
+            finalizer()
+            return table
+        self._tmpdirs.append(finalizer)
+        return ContextTable.load(tmpdir, context_space=context_space)
+
+    def _remove_tmpdirs(self, keep: int = 0) -> None:
+        while len(self._tmpdirs) > keep:
+            self._tmpdirs.pop(0)()
+
+    def _make_shards(self, n_contexts: int) -> list[np.ndarray]:
+        if self._shares_contexts():
+            # Workers select from a shared schedule over the complete set, so
+            # each gets all of it (memory-mapped tables are only reopened)
+            return [np.arange(n_contexts)] * self.num_envs
+        return shard_context_indices(n_contexts, self.num_envs)
+
+    def _receive(self) -> list[Any]:
+        results, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
+        if not all(successes):
+            errors = [r for r, success in zip(results, successes) if not success]
+            self.close(terminate=True)
+            raise RuntimeError(f"Worker raised an exception:\n{errors[0]}")
+        return list(results)
+
+    def _observation(self) -> np.ndarray | dict[str, np.ndarray]:
+        if self.flatten_obs:
+            return self._obs.copy() if self.copy else self._obs
+        obs = self._obs[:, : self._n_state].reshape(self.num_envs, *self._base_shape)
+        context = self._obs[:, self._n_state :]
+        if self.copy:
+            obs, context = obs.copy(), context.copy()
+        return {"obs": obs, "context": context}
+
+    def _infos(self, infos: list[dict]) -> dict[str, Any]:
+        vector_info: dict[str, Any] = {}
+        for i, info in enumerate(infos):
+            vector_info = self._add_info(vector_info, info, i)
+        return vector_info
+
+    def reset_async(
+        self, seed: int | list[int] | None = None, options: dict | None = None
+    ) -> None:
+        if seed is None or isinstance(seed, int):
+            seeds: Sequence[int | None] = [
+                None if seed is None else seed + i for i in range(self.num_envs)
+            ]
+        else:
+            seeds = seed
+        for pipe, single_seed in zip(self.parent_pipes, seeds):
+            pipe.send(("reset", {"seed": single_seed, "options": options}))
+
+    def reset_wait(
+        self, seed: int | list[int] | None = None, options: dict | None = None
+    ) -> tuple[Any, dict[str, Any]]:
+        """Wait for the workers to reset.
+
+        Returns
+        -------
+        tuple[Any, dict[str, Any]]
+            Batched observation and info.
+        """
+        infos = self._receive()
+        return self._observation(), self._infos(infos)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        for pipe, action in zip(self.parent_pipes, actions):
+            pipe.send(("step", action))
+
+    def step_wait(
+        self,
+    ) -> tuple[Any, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Wait for the workers to step.
+
+        Returns
+        -------
+        tuple[Any, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]
+            Batched observation, reward, terminated, truncated and info.
+        """
+        infos = self._receive()
+        return (
+            self._observation(),
+            self._rewards.copy(),
+            self._terminated.astype(bool),
+            self._truncated.astype(bool),
+            self._infos(infos),
+        )
+
+    def set_contexts(
+        self,
+        contexts: Contexts | ContextTable | str | os.PathLike | None = None,
+        shards: Sequence[Sequence[int] | np.ndarray] | None = None,
+    ) -> None:
+        """Reassign the context shards without restarting the workers.
+
+        The running episodes are not interrupted, the new contexts are used from
+        the next reset of each copy on.
+
+        Parameters
+        ----------
+        contexts : Contexts | ContextTable | str | os.PathLike | None, optional
+            New context set or path of a saved table, by default None. If None,
+            keep the current set.
+        shards : Sequence[Sequence[int] | np.ndarray] | None, optional
+            Row indices of the contexts for each worker, by default None.
+            If None, split the context set evenly, or give every worker the
+            complete set for a `SharedSelector`.
+
+        Raises
+        ------
+        ValueError
+            If the number of shards does not match `num_envs` or a shard is empty.
+        """
+        n_tmpdirs = len(self._tmpdirs)
+        if contexts is not None:
+            self.contexts = self._share_contexts(contexts)
+        if shards is None:
+            shards = self._make_shards(len(self.contexts))
+        if len(shards) != self.num_envs:
+            raise ValueError(f"Got {len(shards)} shards for {self.num_envs} workers.")
+        shards = [np.asarray(shard, dtype=np.int64) for shard in shards]
+        if any(len(shard) == 0 for shard in shards):
+            raise ValueError("Every worker needs at least one context.")
+        for pipe, shard_ids in zip(self.parent_pipes, shards):
+            pipe.send(
+                ("set_contexts", (_take_contexts(self.contexts, shard_ids), shard_ids))
+            )
+        self._receive()
+        self.shards = shards
+        if len(self._tmpdirs) > n_tmpdirs:
+            # The workers switched to the new table, the old one is unused
+            self._remove_tmpdirs(keep=1)
+
+    def close_extras(self, timeout: float | None = None, terminate: bool = False):
+        """Close the workers."""
+        if not terminate:
+            for pipe in self.parent_pipes:
+                if not pipe.closed:
+                    try:
+                        pipe.send(("close", None))
+                        pipe.recv()
+                    except (BrokenPipeError, EOFError):
+                        pass
+        for process in self.processes:
+            if terminate and process.is_alive():
+                process.terminate()
+            process.join(timeout)
+        for pipe in self.parent_pipes:
+            pipe.close()
+        self._remove_tmpdirs()
@@ -1,38 +1,50 @@
 from __future__ import annotations
 
 import abc
-from typing import Any, SupportsFloat, TypeVar
-
-import inspect
+import os
+from typing import Any, ClassVar, SupportsFloat, TypeVar
 
 import gymnasium
+import numpy as np
 from gymnasium import Wrapper, spaces
 from gymnasium.core import Env
 
-from carl.context.context_space import ContextFeature, ContextSpace
-from carl.context.selection import AbstractSelector, RoundRobinSelector
+from carl.context.context_space import (
+    ContextConstraint,
+    ContextFeature,
+    ContextSpace,
+)
+from carl.context.context_stream import ContextStream
+from carl.context.context_table import ContextTable
+from carl.context.selection import AbstractSelector, make_context_selector
+from carl.utils.timing import TIMED_SECTIONS, TimingRecorder
 from carl.utils.types import Context, Contexts
 
 ObsType = TypeVar("ObsType")
 
 
 class CARLEnv(Wrapper, abc.ABC):
+    _context_space: ClassVar[ContextSpace]
+
     def __init__(
         self,
         env: Env,
-        contexts: Contexts | None = None,
+        contexts: (
+            Contexts | ContextTable | ContextStream | str | os.PathLike | None
+        ) = None,
         obs_context_features: list[str] | None = None,
         obs_context_as_dict: bool = True,
         context_selector: AbstractSelector | type[AbstractSelector] | None = None,
         context_selector_kwargs: dict | None = None,
+        flatten_obs: bool | str = False,
         **kwargs,
     ):
         """Base CARL wrapper.
 
         Good to know:
 
-        - The observation always is a dictionary of {"state": ..., "context": ...}. Use
-            an observation flattening wrapper if you need a different format.
+        - The observation is a dictionary of {"obs": ..., "context": ...}. Set
+            `flatten_obs` if you need a single vector instead.
         - After each env reset, a new context is selected by the context selector.
         - The context set is always filled with defaults if missing.
 
@@ -40,8 +52,11 @@ class CARLEnv(Wrapper, abc.ABC):
         ----------
         env : Env
             Environment adhering to gymnasium API.
-        contexts : Contexts, optional
-            The context set, by default None.
+        contexts : Contexts | ContextTable | ContextStream, optional
+            The context set, by default None. Large context sets can be passed
+            as a columnar `ContextTable` or as the path of a table saved with
+            `ContextTable.save`, which is memory-mapped. A `ContextStream` draws
+            a new context on demand instead (by default on every reset).
         obs_context_features : list[str], optional
             The context features which should be added to the state, by default None. If None,
             add all available context features.
@@ -54,7 +69,14 @@ class CARLEnv(Wrapper, abc.ABC):
             you can pass kwargs.
         context_selector_kwargs : dict, optional
             Keyword arguments for the context selector if it is passed as a class.
-
+        flatten_obs : bool | str, optional
+            Whether to return the observation as one float32 vector of the state followed
+            by the context features, by default False. The vector is assembled in a
+            preallocated buffer whose context part is only rewritten when the context
+            values change. Each observation is a copy of the buffer, unless
+            `flatten_obs="inplace"`, which returns the buffer itself (copy it if you
+            want to keep an observation). Requires a `Box` observation space of the
+            wrapped environment and numerical context features.
 
         Attributes
         ----------
@@ -63,19 +85,33 @@ class CARLEnv(Wrapper, abc.ABC):
         obs_context_as_dict: bool, optional
             Whether to pass the context as a vector or a dict in the observations.
             The default is True.
-        observation_space: gymnasium.spaces.Dict
+        flatten_obs: bool | str
+            Whether the observation is a flat vector of state and context, "inplace"
+            if it is the reused buffer.
+        observation_space: gymnasium.spaces.Dict | gymnasium.spaces.Box
             The observation space of the CARL environment which is a dictionary of
-            "state" and "context".
-        contexts: Contexts
-            The context set.
+            "obs" and "context" or a box if `flatten_obs` is set.
+        contexts: Contexts | ContextTable | ContextStream
+            The context set or stream.
         context_selector: ContextSelector.
             The context selector selecting a new context after each env reset.
+        timing_recorder: TimingRecorder | None
+            Records the wall time of the hot path if timing is enabled
+            (see `enable_timing`), else None.
 
         """
         super().__init__(env)
+        self.timing_recorder: TimingRecorder | None = None
 
         self.base_observation_space: gymnasium.spaces.Space = env.observation_space
         self.obs_context_as_dict = obs_context_as_dict
+        if flatten_obs not in (False, True, "inplace"):
+            raise ValueError(
+                f"flatten_obs must be a bool or 'inplace', got {flatten_obs!r}."
+            )
+        self.flatten_obs = flatten_obs
+        self._obs_buffer: np.ndarray | None = None
+        self._encoded_context: list[Any] | None = None
 
         if contexts is None:
             contexts = {
@@ -84,35 +120,25 @@ class CARLEnv(Wrapper, abc.ABC):
         self.contexts = contexts
         self.context: Context | None = None  # Set by `_progress_instance`
         if obs_context_features is None:
-            obs_context_features = list(list(self.contexts.values())[0].keys())
+            obs_context_features = list(next(iter(self.contexts.values())).keys())
         self.obs_context_features = obs_context_features
 
         # Context Selector
-        self.context_selector: type[AbstractSelector]
-        if context_selector is None:
-            self.context_selector = RoundRobinSelector(contexts=contexts)  # type: ignore [assignment]
-        elif isinstance(context_selector, AbstractSelector):
-            self.context_selector = context_selector  # type: ignore [assignment]
-        elif inspect.isclass(context_selector) and issubclass(
-            context_selector, AbstractSelector
-        ):
-            if context_selector_kwargs is None:
-                context_selector_kwargs = {}
-            _context_selector_kwargs = {"contexts": contexts}
-            context_selector_kwargs.update(_context_selector_kwargs)
-            self.context_selector = context_selector(**context_selector_kwargs)  # type: ignore [assignment]
-        else:
-            raise ValueError(
-                f"Context selector must be None or an AbstractSelector class or instance. "
-                f"Got type {type(context_selector)}."
-            )
+        self.context_selector: AbstractSelector = make_context_selector(
+            contexts=self.contexts,
+            context_selector=context_selector,
+            context_selector_kwargs=context_selector_kwargs,
+        )
 
-        self.observation_space: gymnasium.spaces.Dict = self.get_observation_space(
+        self.observation_space: gymnasium.spaces.Space = self.get_observation_space(
             obs_context_feature_names=self.obs_context_features
         )
+        if self.flatten_obs:
+            self._n_state = int(np.prod(self.base_observation_space.shape))
+            self._obs_buffer = np.zeros(self.observation_space.shape, dtype=np.float32)
 
     @property
-    def contexts(self) -> Contexts:
+    def contexts(self) -> Contexts | ContextTable | ContextStream:
         return self._contexts
 
     @property
@@ -120,20 +146,56 @@ class CARLEnv(Wrapper, abc.ABC):
         return self.context_selector.context_id
 
     @contexts.setter
-    def contexts(self, contexts: Contexts) -> None:
+    def contexts(
+        self, contexts: Contexts | ContextTable | ContextStream | str | os.PathLike
+    ) -> None:
         """Set `contexts` property
 
         For each context maybe fill with default context values.
         This is only necessary whenever we update the contexts,
-        so here is the right place.
+        so here is the right place. For a `ContextTable`, missing
+        context features are added as constant columns. A `ContextStream`
+        fills every context it draws. A path is loaded as a memory-mapped
+        `ContextTable` and checked against the context space. Contexts
+        violating the constraints of the context space are rejected, see
+        `ContextTable.validate`, and a `ContextStream` skips them when drawing
+        (see `ContextStream.validate`).
 
         Parameters
         ----------
-        contexts : Contexts
+        contexts : Contexts | ContextTable | ContextStream | str | os.PathLike
             Contexts to set
+
+        Raises
+        ------
+        ValueError
+            If contexts violate the constraints of the context space.
         """
         context_space = self.get_context_space()
-        contexts = {k: context_space.insert_defaults(v) for k, v in contexts.items()}
+        if isinstance(contexts, (str, os.PathLike)):
+            contexts = ContextTable.load(contexts, context_space=context_space)
+        if isinstance(contexts, ContextTable):
+            contexts.validate(context_space)
+            contexts = contexts.with_defaults(context_space)
+        elif isinstance(contexts, ContextStream):
+            contexts = contexts.with_defaults(context_space)
+            contexts.validate(context_space)
+        else:
+            contexts = {
+                k: context_space.insert_defaults(v) for k, v in contexts.items()
+            }
+        if isinstance(contexts, dict) and context_space.constraints:
+            valid = context_space.check_constraints(
+                context_space.encode_contexts(contexts)
+            )
+            if not valid.all():
+                invalid_keys = [
+                    key for key, is_valid in zip(contexts.keys(), valid) if not is_valid
+                ]
+                raise ValueError(
+                    f"Contexts {invalid_keys[:10]} violate the constraints of "
+                    f"{type(self).__name__}."
+                )
         self._contexts = contexts
 
     @context_id.setter
@@ -158,7 +220,7 @@ class CARLEnv(Wrapper, abc.ABC):
 
     def get_observation_space(
         self, obs_context_feature_names: list[str] | None = None
-    ) -> gymnasium.spaces.Dict:
+    ) -> gymnasium.spaces.Space:
         """Get the observation space for the context.
 
         Parameters
@@ -169,16 +231,38 @@ class CARLEnv(Wrapper, abc.ABC):
 
         Returns
         -------
-        gymnasium.spaces.Dict
+        gymnasium.spaces.Space
             Gymnasium observation space which contains the observation space of the
-            underlying environment ("state") and for the context ("context").
+            underlying environment ("obs") and for the context ("context"). If
+            `flatten_obs` is set, this is a box of the flattened state followed by
+            the context features.
+
+        Raises
+        ------
+        ValueError
+            If `flatten_obs` is set and the observation space of the wrapped
+            environment is not a box.
         """
         context_space = self.get_context_space()
         obs_space_context = context_space.to_gymnasium_space(
             context_feature_names=obs_context_feature_names,
-            as_dict=self.obs_context_as_dict,
+            as_dict=self.obs_context_as_dict and not self.flatten_obs,
         )
 
+        if self.flatten_obs:
+            if not isinstance(self.base_observation_space, spaces.Box):
+                raise ValueError(
+                    "Flat observations require a Box observation space, got "
+                    f"{type(self.base_observation_space)}."
+                )
+            low = np.concatenate(
+                [self.base_observation_space.low.ravel(), obs_space_context.low]
+            )
+            high = np.concatenate(
+                [self.base_observation_space.high.ravel(), obs_space_context.high]
+            )
+            return spaces.Box(low=low, high=high, dtype=np.float32)
+
         obs_space = spaces.Dict(
             {
                 "obs": self.base_observation_space,
@@ -201,17 +285,43 @@ class CARLEnv(Wrapper, abc.ABC):
         """
         ...
 
+    @staticmethod
+    def get_context_constraints() -> list[ContextConstraint]:
+        """Get the constraints between context features
+
+        Defined per environment if some combinations of context feature
+        values are invalid, e.g. because the simulator cannot be built.
+        See `ContextSpace` for the format.
+
+        Returns
+        -------
+        list[ContextConstraint]
+            Vectorized predicates, by default none.
+        """
+        return []
+
     @classmethod
     def get_context_space(cls) -> ContextSpace:
         """Get context space
 
+        The context space is built once per class and cached afterwards.
+        It is immutable, so it is safe to share between instances.
+
         Returns
         -------
         ContextSpace
             Context space with utility methods holding
             information about defaults, types, bounds, etc.
         """
-        return ContextSpace(cls.get_context_features())
+        # Look up in the class' own namespace so that subclasses do not
+        # inherit the context space of their parent
+        context_space = cls.__dict__.get("_context_space")
+        if context_space is None:
+            context_space = ContextSpace(
+                cls.get_context_features(), cls.get_context_constraints()
+            )
+            cls._context_space = context_space
+        return context_space
 
     @classmethod
     def get_default_context(cls) -> Context:
@@ -255,7 +365,8 @@ class CARLEnv(Wrapper, abc.ABC):
         Parameters
         ----------
         seed : int | None, optional
-            Seed, by default None
+            Seed, by default None. Also reseeds the context selector, so
+            the selected contexts are reproducible.
         options : dict[str, Any] | None, optional
             Options, by default None
 
@@ -264,22 +375,87 @@ class CARLEnv(Wrapper, abc.ABC):
         tuple[Any, dict[str, Any]]
             Observation, info.
         """
+        if seed is not None:
+            self.context_selector.seed(seed)
         last_context_id = self.context_id
         self._progress_instance()
         if self.context_id != last_context_id:
             self._update_context()
-        state, info = super().reset(seed=seed, options=options)
+        state, info = self._env_reset(seed=seed, options=options)
         state = self._add_context_to_state(state)
         info["context_id"] = self.context_id
         return state, info
 
-    def _add_context_to_state(self, state: Any) -> dict[str, Any]:
+    def _env_reset(
+        self, *, seed: int | None = None, options: dict[str, Any] | None = None
+    ) -> tuple[Any, dict[str, Any]]:
+        """Reset the wrapped environment."""
+        return self.env.reset(seed=seed, options=options)
+
+    def _env_step(self, action: Any) -> tuple[Any, SupportsFloat, bool, bool, dict]:
+        """Step the wrapped environment."""
+        return self.env.step(action)
+
+    def enable_timing(self, recorder: TimingRecorder | None = None) -> TimingRecorder:
+        """Record the wall time of the hot path per context.
+
+        Times `_progress_instance`, `_update_context`, the reset and step of the
+        wrapped environment and `_add_context_to_state`. The methods are only
+        wrapped while timing is enabled, so there is no overhead otherwise.
+
+        Parameters
+        ----------
+        recorder : TimingRecorder | None, optional
+            Recorder to use, by default None. If None, create a new one. A recorder
+            can be shared between environments.
+
+        Returns
+        -------
+        TimingRecorder
+            The recorder holding the timings.
+        """
+        self.disable_timing()
+        if recorder is None:
+            recorder = TimingRecorder()
+        for method_name, section in TIMED_SECTIONS.items():
+            setattr(
+                self,
+                method_name,
+                recorder.timed(
+                    section, getattr(self, method_name), lambda: self.context_id
+                ),
+            )
+        self.timing_recorder = recorder
+        return recorder
+
+    def disable_timing(self) -> None:
+        """Stop recording timings, the recorder keeps the recorded ones."""
+        for method_name in TIMED_SECTIONS:
+            self.__dict__.pop(method_name, None)
+        self.timing_recorder = None
+
+    def _encode_context(self) -> None:
+        """Write the current context into the flat observation buffer.
+
+        The buffer is only written if the context values changed, which also
+        catches contexts modified in place.
+        """
+        values = [
+            self.context[k] for k in self.obs_context_features  # type: ignore [index]
+        ]
+        if values != self._encoded_context:
+            self._obs_buffer[self._n_state :] = values  # type: ignore [index]
+            self._encoded_context = values
+
+    def _add_context_to_state(self, state: Any) -> dict[str, Any] | np.ndarray:
         """Add context observation to the state
 
         The state is the observation from the underlying environment
         and we add the context information to it. We return a dictionary
         of the state and context, and the context is maybe represented
         as a dictionary itself (controlled via `self.obs_context_as_dict`).
+        If `self.flatten_obs` is set, the state is copied into the preallocated
+        observation vector which holds the context.
 
         Parameters
         ----------
@@ -288,9 +464,15 @@ class CARLEnv(Wrapper, abc.ABC):
 
         Returns
         -------
-        dict[str, Any]
-            State context observation dict
+        dict[str, Any] | np.ndarray
+            State context observation dict or flat observation vector
         """
+        if self._obs_buffer is not None:
+            self._encode_context()
+            self._obs_buffer[: self._n_state] = np.ravel(state)
+            if self.flatten_obs == "inplace":
+                return self._obs_buffer
+            return self._obs_buffer.copy()
 
         if not self.obs_context_as_dict:
             context = [self.context[k] for k in self.obs_context_features]
@@ -336,7 +518,7 @@ class CARLEnv(Wrapper, abc.ABC):
         tuple[Any, SupportsFloat, bool, bool, dict[str, Any]]
             Observation, rewar, terminated, truncated, info.
         """
-        state, reward, terminated, truncated, info = super().step(action)
+        state, reward, terminated, truncated, info = self._env_step(action)
         state = self._add_context_to_state(state)
         info["context_id"] = self.context_id
         return state, reward, terminated, truncated, info
@@ -1,7 +1,25 @@
+from __future__ import annotations
+
+from typing import Mapping
+
 import numpy as np
 
-from carl.context.context_space import ContextFeature, UniformFloatContextFeature
+from carl.context.context_space import (
+    ContextConstraint,
+    ContextFeature,
+    UniformFloatContextFeature,
+)
 from carl.envs.dmc.carl_dmcontrol import CARLDmcEnv
+from carl.envs.dmc.dmc_tasks.finger import check_constraints
+
+
+def finger_constraints(context: Mapping[str, np.ndarray]) -> np.ndarray:
+    # The checks of the task, applied to every context
+    return np.vectorize(check_constraints, otypes=[bool])(
+        spinner_length=context["spinner_length"],
+        limb_length_0=context["limb_length_0"],
+        limb_length_1=context["limb_length_1"],
+    )
 
 
 class CARLDmcFingerEnv(CARLDmcEnv):
@@ -67,3 +85,7 @@ class CARLDmcFingerEnv(CARLDmcEnv):
                 "spinner_length", lower=0.01, upper=0.4, default_value=0.18
             ),
         }
+
+    @staticmethod
+    def get_context_constraints() -> list[ContextConstraint]:
+        return [finger_constraints]
@@ -1,12 +1,42 @@
+from __future__ import annotations
+
+from typing import Mapping
+
 import numpy as np
 
-from carl.context.context_space import ContextFeature, UniformFloatContextFeature
+from carl.context.context_space import (
+    ContextConstraint,
+    ContextFeature,
+    UniformFloatContextFeature,
+)
 from carl.envs.dmc.carl_dmcontrol import CARLDmcEnv
+from carl.envs.dmc.dmc_tasks.pointmass import check_constraints
+
+
+def _satisfies_task_constraints(**context: float) -> bool:
+    try:
+        check_constraints(**context)
+    except ValueError:
+        return False
+    return True
+
+
+def inside_area(context: Mapping[str, np.ndarray]) -> np.ndarray:
+    # The checks of the task, applied to every context
+    return np.vectorize(_satisfies_task_constraints, otypes=[bool])(
+        mass=context["mass"],
+        starting_x=context["starting_x"],
+        starting_y=context["starting_y"],
+        target_x=context["target_x"],
+        target_y=context["target_y"],
+        area_size=context["area_size"],
+    )
 
 
 class CARLDmcPointMassEnv(CARLDmcEnv):
     domain = "pointmass"
     task = "easy_pointmass"
+    metadata = {"render_modes": []}
 
     @staticmethod
     def get_context_features() -> dict[str, ContextFeature]:
@@ -72,3 +102,7 @@ class CARLDmcPointMassEnv(CARLDmcEnv):
                 "area_size", lower=-np.inf, upper=np.inf, default_value=0.6
             ),
         }
+
+    @staticmethod
+    def get_context_constraints() -> list[ContextConstraint]:
+        return [inside_area]
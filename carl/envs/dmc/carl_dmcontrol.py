@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+from typing import Any
+
 from gymnasium import spaces
 
 from carl.context.selection import AbstractSelector
 from carl.envs.carl_env import CARLEnv
 from carl.envs.dmc.loader import load_dmc_env
 from carl.envs.dmc.wrappers import MujocoToGymWrapper
+from carl.utils.cache import LRUCache, context_hash
 from carl.utils.types import Contexts
 
 
+def _physics_nbytes(env: Any) -> int:
+    physics = env.physics
+    return physics.model.ptr.nbuffer + physics.data.ptr.nbuffer
+
+
 class CARLDmcEnv(CARLEnv):
     """
     General class for the dm-control environments.
@@ -21,6 +29,11 @@ class CARLDmcEnv(CARLEnv):
         Dm-control domain that should be loaded.
     task : str
         Task within the specified domain.
+    simulator_cache : LRUCache | None, optional
+        Cache of the dm-control environments built per context, by default None.
+        If None, keep the 32 most recently used environments of this instance.
+        The cached environments are stateful, so do not share a cache between
+        environments which are used at the same time.
 
     For descriptions of the other parameters see the parent class CARLEnv.
 
@@ -37,8 +50,13 @@ class CARLDmcEnv(CARLEnv):
         obs_context_as_dict: bool = True,
         context_selector: AbstractSelector | type[AbstractSelector] | None = None,
         context_selector_kwargs: dict = None,
+        simulator_cache: LRUCache | None = None,
         **kwargs,
     ):
+        if simulator_cache is None:
+            simulator_cache = LRUCache(max_entries=32, sizeof=_physics_nbytes)
+        self.simulator_cache = simulator_cache
+
         # TODO can we have more than 1 env?
         env = load_dmc_env(
             domain_name=self.domain,
@@ -68,11 +86,15 @@ class CARLDmcEnv(CARLEnv):
         )  # allow to augment all values
 
     def _update_context(self) -> None:
-        env = load_dmc_env(
-            domain_name=self.domain,
-            task_name=self.task,
-            context=self.context,
-            environment_kwargs={"flat_observation": True},
+        context = self.context
+        env = self.simulator_cache.get_or_build(
+            (self.domain, self.task, context_hash(context, env=type(self))),
+            lambda: load_dmc_env(
+                domain_name=self.domain,
+                task_name=self.task,
+                context=context,
+                environment_kwargs={"flat_observation": True},
+            ),
         )
         self.env = MujocoToGymWrapper(env)
 
@@ -1,52 +1,35 @@
 # flake8: noqa: F401
-# Modular imports
-import importlib.util as iutil
-import warnings
-
-from carl.envs.gymnasium.classic_control import (
-    CARLAcrobot,
-    CARLCartPole,
-    CARLMountainCar,
-    CARLMountainCarContinuous,
-    CARLPendulum,
-)
-
-__all__ = [
-    "CARLAcrobot",
-    "CARLCartPole",
-    "CARLMountainCar",
-    "CARLMountainCarContinuous",
-    "CARLPendulum",
-]
-
-
-def check_spec(spec_name: str) -> bool:
-    """Check if the spec is installed
-
-    Parameters
-    ----------
-    spec_name : str
-        Name of package that is necessary for the environment suite.
-
-    Returns
-    -------
-    bool
-        Whether the spec was found.
-    """
-    spec = iutil.find_spec(spec_name)
-    found = spec is not None
-    if not found:
-        with warnings.catch_warnings():
-            warnings.simplefilter("once")
-            warnings.warn(
-                f"Module {spec_name} not found. If you want to use these environments, please follow the installation guide."
-            )
-    return found
-
-
-# Environment loading
-found = check_spec("Box2D")
-if found:
-    from carl.envs.gymnasium.box2d import *
-
-    __all__ += ["CARLBipedalWalker", "CARLLunarLander", "CARLVehicleRacing"]
+# Modular, lazy imports (see `carl.envs`)
+from __future__ import annotations
+
+from typing import Any
+
+import importlib
+
+from carl.envs import ENV_FAMILIES, check_spec
+
+_ENV_MODULES: dict[str, str] = {}
+for _family in ("classic_control", "box2d"):
+    _required, _module, _names = ENV_FAMILIES[_family]
+    if _required is None or check_spec(_required):
+        _ENV_MODULES.update(dict.fromkeys(_names, _module))
+del _family, _required, _module, _names
+
+_SUBMODULES = ("box2d", "classic_control", "vector")
+
+__all__ = list(_ENV_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    module = _ENV_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    env_class = getattr(importlib.import_module(module), name)
+    globals()[name] = env_class
+    return env_class
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -80,10 +80,10 @@ class CARLLunarLander(CARLGymnasiumEnv):
                 setattr(lunar_lander, key, value)
 
         gravity_x = self.context.get(
-            "GRAVITY_X", self.get_context_features()["GRAVITY_X"].default_value
+            "GRAVITY_X", self.get_context_space().default_context["GRAVITY_X"]
         )
         gravity_y = self.context.get(
-            "GRAVITY_Y", self.get_context_features()["GRAVITY_Y"].default_value
+            "GRAVITY_Y", self.get_context_space().default_context["GRAVITY_Y"]
         )
 
         gravity = vec2(float(gravity_x), float(gravity_y))
@@ -1,19 +1,32 @@
 from __future__ import annotations
 
+import os
+
 import gymnasium
-import pygame
 from gymnasium.core import Env
 
 from carl.context.selection import AbstractSelector
 from carl.envs.carl_env import CARLEnv
 from carl.utils.types import Contexts
 
-try:
-    pygame.display.init()
-except:  # pragma: no cover
-    import os  # pragma: no cover
+_display_initialized = False
+
+
+def _init_display() -> None:
+    """Initialize the pygame display once, on the first env creation.
+
+    Deferred from import time because importing pygame is slow.
+    """
+    global _display_initialized
+    if _display_initialized:
+        return
+    _display_initialized = True
+    import pygame
 
-    os.environ["SDL_VIDEODRIVER"] = "dummy"  # pragma: no cover
+    try:
+        pygame.display.init()
+    except:  # pragma: no cover
+        os.environ["SDL_VIDEODRIVER"] = "dummy"  # pragma: no cover
 
 
 class CARLGymnasiumEnv(CARLEnv):
@@ -24,8 +37,9 @@ class CARLGymnasiumEnv(CARLEnv):
         self,
         env: Env | None = None,
         contexts: Contexts | None = None,
-        obs_context_features: list[str]
-        | None = None,  # list the context features which should be added to the state
+        obs_context_features: (
+            list[str] | None
+        ) = None,  # list the context features which should be added to the state
         obs_context_as_dict: bool = True,
         context_selector: AbstractSelector | type[AbstractSelector] | None = None,
         context_selector_kwargs: dict = None,
@@ -59,6 +73,7 @@ class CARLGymnasiumEnv(CARLEnv):
         env_name: str
             The registered gymnasium environment name.
         """
+        _init_display()
         if env is None:
             env = gymnasium.make(id=self.env_name, render_mode=self.render_mode)
         super().__init__(
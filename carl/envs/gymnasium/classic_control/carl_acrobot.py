@@ -78,22 +78,22 @@ class CARLAcrobot(CARLGymnasiumEnv):
         angles = self.env.np_random.uniform(
             low=self.context.get(
                 "INITIAL_ANGLE_LOWER",
-                self.get_context_features()["INITIAL_ANGLE_LOWER"].default_value,
+                self.get_context_space().default_context["INITIAL_ANGLE_LOWER"],
             ),
             high=self.context.get(
                 "INITIAL_ANGLE_UPPER",
-                self.get_context_features()["INITIAL_ANGLE_UPPER"].default_value,
+                self.get_context_space().default_context["INITIAL_ANGLE_UPPER"],
             ),
             size=(2,),
         )
         velocities = self.env.np_random.uniform(
             low=self.context.get(
                 "INITIAL_VELOCITY_LOWER",
-                self.get_context_features()["INITIAL_VELOCITY_LOWER"].default_value,
+                self.get_context_space().default_context["INITIAL_VELOCITY_LOWER"],
             ),
             high=self.context.get(
                 "INITIAL_VELOCITY_UPPER",
-                self.get_context_features()["INITIAL_VELOCITY_UPPER"].default_value,
+                self.get_context_space().default_context["INITIAL_VELOCITY_UPPER"],
             ),
             size=(2,),
         )
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Mapping, Optional
 
 import numpy as np
 
-from carl.context.context_space import ContextFeature, UniformFloatContextFeature
+from carl.context.context_space import (
+    ContextConstraint,
+    ContextFeature,
+    UniformFloatContextFeature,
+)
 from carl.envs.gymnasium.carl_gymnasium_env import CARLGymnasiumEnv
 
 
+def initial_state_bounds_ordered(context: Mapping[str, np.ndarray]) -> np.ndarray:
+    return context["initial_state_lower"] <= context["initial_state_upper"]
+
+
 class CARLCartPole(CARLGymnasiumEnv):
     env_name: str = "CartPole-v1"
     metadata = {"render.modes": ["human", "rgb_array"]}
@@ -41,6 +49,10 @@ class CARLCartPole(CARLGymnasiumEnv):
             ),
         }
 
+    @staticmethod
+    def get_context_constraints() -> list[ContextConstraint]:
+        return [initial_state_bounds_ordered]
+
     def reset(
         self,
         *,
@@ -51,11 +63,11 @@ class CARLCartPole(CARLGymnasiumEnv):
         self.env.unwrapped.state = self.env.np_random.uniform(
             low=self.context.get(
                 "initial_state_lower",
-                self.get_context_features()["initial_state_lower"].default_value,
+                self.get_context_space().default_context["initial_state_lower"],
             ),
             high=self.context.get(
                 "initial_state_upper",
-                self.get_context_features()["initial_state_upper"].default_value,
+                self.get_context_space().default_context["initial_state_upper"],
             ),
             size=(4,),
         )
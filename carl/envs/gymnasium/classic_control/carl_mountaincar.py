@@ -1,13 +1,29 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Mapping, Optional
 
 import numpy as np
 
-from carl.context.context_space import ContextFeature, UniformFloatContextFeature
+from carl.context.context_space import (
+    ContextConstraint,
+    ContextFeature,
+    UniformFloatContextFeature,
+)
 from carl.envs.gymnasium.carl_gymnasium_env import CARLGymnasiumEnv
 
 
+def position_bounds_ordered(context: Mapping[str, np.ndarray]) -> np.ndarray:
+    return context["min_position"] < context["max_position"]
+
+
+def start_position_bounds_ordered(context: Mapping[str, np.ndarray]) -> np.ndarray:
+    return context["min_position_start"] <= context["max_position_start"]
+
+
+def start_velocity_bounds_ordered(context: Mapping[str, np.ndarray]) -> np.ndarray:
+    return context["min_velocity_start"] <= context["max_velocity_start"]
+
+
 class CARLMountainCar(CARLGymnasiumEnv):
     env_name: str = "MountainCar-v0"
     metadata = {"render.modes": ["human", "rgb_array"]}
@@ -50,6 +66,14 @@ class CARLMountainCar(CARLGymnasiumEnv):
             ),
         }
 
+    @staticmethod
+    def get_context_constraints() -> list[ContextConstraint]:
+        return [
+            position_bounds_ordered,
+            start_position_bounds_ordered,
+            start_velocity_bounds_ordered,
+        ]
+
     def reset(
         self,
         *,
@@ -60,21 +84,21 @@ class CARLMountainCar(CARLGymnasiumEnv):
         position = self.env.np_random.uniform(
             low=self.context.get(
                 "min_position_start",
-                self.get_context_features()["min_position_start"].default_value,
+                self.get_context_space().default_context["min_position_start"],
             ),
             high=self.context.get(
                 "max_position_start",
-                self.get_context_features()["max_position_start"].default_value,
+                self.get_context_space().default_context["max_position_start"],
             ),
         )
         velocity = self.env.np_random.uniform(
             low=self.context.get(
                 "min_velocity_start",
-                self.get_context_features()["min_velocity_start"].default_value,
+                self.get_context_space().default_context["min_velocity_start"],
             ),
             high=self.context.get(
                 "max_velocity_start",
-                self.get_context_features()["max_velocity_start"].default_value,
+                self.get_context_space().default_context["max_velocity_start"],
             ),
         )
         self.env.unwrapped.state = np.array([position, velocity])
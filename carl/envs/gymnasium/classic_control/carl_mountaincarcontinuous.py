@@ -4,8 +4,17 @@ from typing import Optional
 
 import numpy as np
 
-from carl.context.context_space import ContextFeature, UniformFloatContextFeature
+from carl.context.context_space import (
+    ContextConstraint,
+    ContextFeature,
+    UniformFloatContextFeature,
+)
 from carl.envs.gymnasium.carl_gymnasium_env import CARLGymnasiumEnv
+from carl.envs.gymnasium.classic_control.carl_mountaincar import (
+    position_bounds_ordered,
+    start_position_bounds_ordered,
+    start_velocity_bounds_ordered,
+)
 
 
 class CARLMountainCarContinuous(CARLGymnasiumEnv):
@@ -47,6 +56,14 @@ class CARLMountainCarContinuous(CARLGymnasiumEnv):
             ),
         }
 
+    @staticmethod
+    def get_context_constraints() -> list[ContextConstraint]:
+        return [
+            position_bounds_ordered,
+            start_position_bounds_ordered,
+            start_velocity_bounds_ordered,
+        ]
+
     def reset(
         self,
         *,
@@ -57,21 +74,21 @@ class CARLMountainCarContinuous(CARLGymnasiumEnv):
         position = self.env.np_random.uniform(
             low=self.context.get(
                 "min_position_start",
-                self.get_context_features()["min_position_start"].default_value,
+                self.get_context_space().default_context["min_position_start"],
             ),
             high=self.context.get(
                 "max_position_start",
-                self.get_context_features()["max_position_start"].default_value,
+                self.get_context_space().default_context["max_position_start"],
             ),
         )
         velocity = self.env.np_random.uniform(
             low=self.context.get(
                 "min_velocity_start",
-                self.get_context_features()["min_velocity_start"].default_value,
+                self.get_context_space().default_context["min_velocity_start"],
             ),
             high=self.context.get(
                 "max_velocity_start",
-                self.get_context_features()["max_velocity_start"].default_value,
+                self.get_context_space().default_context["max_velocity_start"],
             ),
         )
         self.env.unwrapped.state = np.array([position, velocity])
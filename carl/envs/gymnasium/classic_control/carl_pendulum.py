@@ -48,13 +48,13 @@ class CARLPendulum(CARLGymnasiumEnv):
         theta = self.env.np_random.uniform(
             high=self.context.get(
                 "initial_angle_max",
-                self.get_context_features()["initial_angle_max"].default_value,
+                self.get_context_space().default_context["initial_angle_max"],
             )
         )
         thetadot = self.env.np_random.uniform(
             high=self.context.get(
                 "initial_velocity_max",
-                self.get_context_features()["initial_velocity_max"].default_value,
+                self.get_context_space().default_context["initial_velocity_max"],
             )
         )
         self.env.unwrapped.state = np.array([theta, thetadot], dtype=np.float32)
@@ -0,0 +1,18 @@
+# flake8: noqa: F401
+from carl.envs.gymnasium.vector.carl_vector_classic_control import (
+    CARLVectorAcrobot,
+    CARLVectorCartPole,
+    CARLVectorMountainCar,
+    CARLVectorMountainCarContinuous,
+    CARLVectorPendulum,
+)
+from carl.envs.gymnasium.vector.carl_vector_env import CARLVectorEnv
+
+__all__ = [
+    "CARLVectorAcrobot",
+    "CARLVectorCartPole",
+    "CARLVectorEnv",
+    "CARLVectorMountainCar",
+    "CARLVectorMountainCarContinuous",
+    "CARLVectorPendulum",
+]
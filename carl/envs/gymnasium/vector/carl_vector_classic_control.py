@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+from carl.envs.gymnasium.classic_control import (
+    CARLAcrobot,
+    CARLCartPole,
+    CARLMountainCar,
+    CARLMountainCarContinuous,
+    CARLPendulum,
+)
+from carl.envs.gymnasium.vector.carl_vector_env import CARLVectorEnv
+
+
+def _uniform(
+    rng: np.random.Generator, low: np.ndarray, high: np.ndarray, size: int
+) -> np.ndarray:
+    """Sample `size` values per row from U(low, high) with per-row bounds."""
+    return rng.uniform(low[:, None], high[:, None], size=(len(low), size))
+
+
+class CARLVectorCartPole(CARLVectorEnv):
+    """
+    Batched `CARLCartPole`.
+
+    Simulates the same dynamics as the single environment: gymnasium's
+    CartPole computes the total mass and the pole mass length once from its
+    default masses and pole length, so contexts do not change them.
+    """
+
+    carl_env_class = CARLCartPole
+    state_dim = 4
+    theta_threshold_radians = 12 * 2 * np.pi / 360
+    x_threshold = 2.4
+
+    def _reset_state(self, mask: np.ndarray) -> None:
+        cv = self.context_values[mask]
+        idx = self.get_context_space().feature_index
+        self.state[mask] = _uniform(
+            self._np_random,
+            cv[:, idx["initial_state_lower"]],
+            cv[:, idx["initial_state_upper"]],
+            size=4,
+        )
+
+    def _step_dynamics(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        gravity = self.context_feature("gravity")
+        masscart = self.context_feature("masscart")
+        masspole = self.context_feature("masspole")
+        length = self.context_feature("length")
+        force_mag = self.context_feature("force_mag")
+        tau = self.context_feature("tau")
+        default = self.get_context_space().default_context
+        total_mass = default["masspole"] + default["masscart"]
+        polemass_length = default["masspole"] * default["length"]
+
+        x, x_dot, theta, theta_dot = self.state.T
+        force = np.where(actions == 1, force_mag, -force_mag)
+        costheta = np.cos(theta)
+        sintheta = np.sin(theta)
+
+        temp = (force + polemass_length * theta_dot**2 * sintheta) / total_mass
+        thetaacc = (gravity * sintheta - costheta * temp) / (
+            length * (4.0 / 3.0 - masspole * costheta**2 / total_mass)
+        )
+        xacc = temp - polemass_length * thetaacc * costheta / total_mass
+
+        # Euler integration like the default of gymnasium's CartPole
+        self.state = np.stack(
+            [
+                x + tau * x_dot,
+                x_dot + tau * xacc,
+                theta + tau * theta_dot,
+                theta_dot + tau * thetaacc,
+            ],
+            axis=1,
+        )
+        x, theta = self.state[:, 0], self.state[:, 2]
+        terminated = (
+            (x < -self.x_threshold)
+            | (x > self.x_threshold)
+            | (theta < -self.theta_threshold_radians)
+            | (theta > self.theta_threshold_radians)
+        )
+        rewards = np.ones(self.num_envs, dtype=np.float64)
+        return rewards, terminated
+
+    def _get_obs(self) -> np.ndarray:
+        return self.state
+
+
+class CARLVectorPendulum(CARLVectorEnv):
+    """Batched `CARLPendulum`."""
+
+    carl_env_class = CARLPendulum
+    state_dim = 2
+    max_speed = 8
+    max_torque = 2.0
+
+    def _reset_state(self, mask: np.ndarray) -> None:
+        cv = self.context_values[mask]
+        idx = self.get_context_space().feature_index
+        zeros = np.zeros(len(cv))
+        theta = _uniform(self._np_random, zeros, cv[:, idx["initial_angle_max"]], 1)
+        thetadot = _uniform(
+            self._np_random, zeros, cv[:, idx["initial_velocity_max"]], 1
+        )
+        self.state[mask] = np.concatenate([theta, thetadot], axis=1)
+
+    def _step_dynamics(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        g = self.context_feature("g")
+        m = self.context_feature("m")
+        l = self.context_feature("l")  # noqa: E741
+        dt = self.context_feature("dt")
+        th, thdot = self.state.T
+
+        u = np.clip(
+            np.asarray(actions, dtype=np.float64).reshape(self.num_envs, -1),
+            -self.max_torque,
+            self.max_torque,
+        )[:, 0]
+        angle = ((th + np.pi) % (2 * np.pi)) - np.pi
+        costs = angle**2 + 0.1 * thdot**2 + 0.001 * (u**2)
+
+        newthdot = thdot + (3 * g / (2 * l) * np.sin(th) + 3.0 / (m * l**2) * u) * dt
+        newthdot = np.clip(newthdot, -self.max_speed, self.max_speed)
+        newth = th + newthdot * dt
+        self.state = np.stack([newth, newthdot], axis=1)
+        return -costs, np.zeros(self.num_envs, dtype=bool)
+
+    def _get_obs(self) -> np.ndarray:
+        theta, thetadot = self.state.T
+        return np.stack([np.cos(theta), np.sin(theta), thetadot], axis=1)
+
+
+class _CARLVectorMountainCarBase(CARLVectorEnv):
+    state_dim = 2
+
+    def _reset_state(self, mask: np.ndarray) -> None:
+        cv = self.context_values[mask]
+        idx = self.get_context_space().feature_index
+        position = _uniform(
+            self._np_random,
+            cv[:, idx["min_position_start"]],
+            cv[:, idx["max_position_start"]],
+            1,
+        )
+        velocity = _uniform(
+            self._np_random,
+            cv[:, idx["min_velocity_start"]],
+            cv[:, idx["max_velocity_start"]],
+            1,
+        )
+        self.state[mask] = np.concatenate([position, velocity], axis=1)
+
+    def _integrate(self, velocity: np.ndarray) -> np.ndarray:
+        """Integrate the position and clip to the bounds, returns terminated."""
+        min_position = self.context_feature("min_position")
+        max_speed = self.context_feature("max_speed")
+        position = self.state[:, 0]
+        velocity = np.clip(velocity, -max_speed, max_speed)
+        position = np.clip(
+            position + velocity, min_position, self.context_feature("max_position")
+        )
+        velocity = np.where((position == min_position) & (velocity < 0), 0.0, velocity)
+        self.state = np.stack([position, velocity], axis=1)
+        terminated = (position >= self.context_feature("goal_position")) & (
+            velocity >= self.context_feature("goal_velocity")
+        )
+        return terminated
+
+    def _get_obs(self) -> np.ndarray:
+        return self.state
+
+
+class CARLVectorMountainCar(_CARLVectorMountainCarBase):
+    """Batched `CARLMountainCar`."""
+
+    carl_env_class = CARLMountainCar
+
+    def _step_dynamics(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        position, velocity = self.state.T
+        velocity = (
+            velocity
+            + (np.asarray(actions) - 1) * self.context_feature("force")
+            + np.cos(3 * position) * (-self.context_feature("gravity"))
+        )
+        terminated = self._integrate(velocity)
+        return np.full(self.num_envs, -1.0), terminated
+
+
+class CARLVectorMountainCarContinuous(_CARLVectorMountainCarBase):
+    """Batched `CARLMountainCarContinuous`."""
+
+    carl_env_class = CARLMountainCarContinuous
+    min_action = -1.0
+    max_action = 1.0
+
+    def _step_dynamics(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        action = np.asarray(actions, dtype=np.float64).reshape(self.num_envs, -1)[:, 0]
+        position, velocity = self.state.T
+        force = np.clip(action, self.min_action, self.max_action)
+        velocity = (
+            velocity
+            + force * self.context_feature("power")
+            - 0.0025 * np.cos(3 * position)
+        )
+        terminated = self._integrate(velocity)
+        rewards = np.where(terminated, 100.0, 0.0) - action**2 * 0.1
+        return rewards, terminated
+
+
+def _wrap(x: np.ndarray, m: float, M: float) -> np.ndarray:
+    """Vectorized version of gymnasium's `acrobot.wrap`."""
+    diff = M - m
+    x = np.where(x > M, x - np.ceil((x - M) / diff) * diff, x)
+    x = np.where(x < m, x + np.ceil((m - x) / diff) * diff, x)
+    return x
+
+
+def _rk4(
+    derivs: Callable[[np.ndarray], np.ndarray], y0: np.ndarray, dt: float
+) -> np.ndarray:
+    """Single batched 4th order Runge-Kutta step like gymnasium's `acrobot.rk4`."""
+    dt2 = dt / 2.0
+    k1 = derivs(y0)
+    k2 = derivs(y0 + dt2 * k1)
+    k3 = derivs(y0 + dt2 * k2)
+    k4 = derivs(y0 + dt * k3)
+    return y0 + dt / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+class CARLVectorAcrobot(CARLVectorEnv):
+    """Batched `CARLAcrobot` (with the "book" dynamics of gymnasium's Acrobot)."""
+
+    carl_env_class = CARLAcrobot
+    state_dim = 4
+    dt = 0.2
+    AVAIL_TORQUE = np.array([-1.0, 0.0, +1])
+
+    def _reset_state(self, mask: np.ndarray) -> None:
+        cv = self.context_values[mask]
+        idx = self.get_context_space().feature_index
+        angles = _uniform(
+            self._np_random,
+            cv[:, idx["INITIAL_ANGLE_LOWER"]],
+            cv[:, idx["INITIAL_ANGLE_UPPER"]],
+            2,
+        )
+        velocities = _uniform(
+            self._np_random,
+            cv[:, idx["INITIAL_VELOCITY_LOWER"]],
+            cv[:, idx["INITIAL_VELOCITY_UPPER"]],
+            2,
+        )
+        self.state[mask] = np.concatenate([angles, velocities], axis=1)
+
+    def _dsdt(self, s_augmented: np.ndarray) -> np.ndarray:
+        m1 = self.context_feature("LINK_MASS_1")
+        m2 = self.context_feature("LINK_MASS_2")
+        l1 = self.context_feature("LINK_LENGTH_1")
+        lc1 = self.context_feature("LINK_COM_POS_1")
+        lc2 = self.context_feature("LINK_COM_POS_2")
+        I1 = self.context_feature("LINK_MOI")
+        I2 = I1
+        g = 9.8
+        theta1, theta2, dtheta1, dtheta2, a = s_augmented.T
+        d1 = (
+            m1 * lc1**2
+            + m2 * (l1**2 + lc2**2 + 2 * l1 * lc2 * np.cos(theta2))
+            + I1
+            + I2
+        )
+        d2 = m2 * (lc2**2 + l1 * lc2 * np.cos(theta2)) + I2
+        phi2 = m2 * lc2 * g * np.cos(theta1 + theta2 - np.pi / 2.0)
+        phi1 = (
+            -m2 * l1 * lc2 * dtheta2**2 * np.sin(theta2)
+            - 2 * m2 * l1 * lc2 * dtheta2 * dtheta1 * np.sin(theta2)
+            + (m1 * lc1 + m2 * l1) * g * np.cos(theta1 - np.pi / 2)
+            + phi2
+        )
+        ddtheta2 = (
+            a + d2 / d1 * phi1 - m2 * l1 * lc2 * dtheta1**2 * np.sin(theta2) - phi2
+        ) / (m2 * lc2**2 + I2 - d2**2 / d1)
+        ddtheta1 = -(d2 * ddtheta2 + phi1) / d1
+        return np.stack(
+            [dtheta1, dtheta2, ddtheta1, ddtheta2, np.zeros_like(a)], axis=1
+        )
+
+    def _step_dynamics(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        torque = self.AVAIL_TORQUE[np.asarray(actions, dtype=np.int64)]
+        torque_noise_max = self.context_feature("torque_noise_max")
+        noisy = torque_noise_max > 0
+        if noisy.any():
+            torque = torque + np.where(
+                noisy,
+                self._np_random.uniform(-1, 1, size=self.num_envs) * torque_noise_max,
+                0.0,
+            )
+        s_augmented = np.concatenate([self.state, torque[:, None]], axis=1)
+        ns = _rk4(self._dsdt, s_augmented, self.dt)[:, :4]
+        ns[:, 0] = _wrap(ns[:, 0], -np.pi, np.pi)
+        ns[:, 1] = _wrap(ns[:, 1], -np.pi, np.pi)
+        max_vel_1 = self.context_feature("MAX_VEL_1")
+        max_vel_2 = self.context_feature("MAX_VEL_2")
+        ns[:, 2] = np.clip(ns[:, 2], -max_vel_1, max_vel_1)
+        ns[:, 3] = np.clip(ns[:, 3], -max_vel_2, max_vel_2)
+        self.state = ns
+        terminated = -np.cos(ns[:, 0]) - np.cos(ns[:, 1] + ns[:, 0]) > 1.0
+        rewards = np.where(terminated, 0.0, -1.0)
+        return rewards, terminated
+
+    def _get_obs(self) -> np.ndarray:
+        s = self.state
+        return np.stack(
+            [
+                np.cos(s[:, 0]),
+                np.sin(s[:, 0]),
+                np.cos(s[:, 1]),
+                np.sin(s[:, 1]),
+                s[:, 2],
+                s[:, 3],
+            ],
+            axis=1,
+        )
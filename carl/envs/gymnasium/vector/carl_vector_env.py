@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+from typing import Any
+
+import abc
+
+import gymnasium
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import VectorEnv
+
+from carl.context.context_space import ContextSpace
+from carl.context.context_table import ContextTable
+from carl.context.selection import AbstractSelector, make_context_selector
+from carl.envs.carl_env import CARLEnv
+from carl.utils.types import Context, Contexts
+
+
+class CARLVectorEnv(VectorEnv, abc.ABC):
+    """
+    Base class for natively batched CARL environments.
+
+    Steps `num_envs` copies of an environment with one vectorized NumPy
+    operation. Every copy has its own context: after each (auto-)reset of a copy,
+    the context selector selects a new context for it. The context features
+    are read from an array holding one row per copy, so the dynamics can use
+    per-copy gravities, masses, lengths, etc.
+
+    Like gymnasium's vector environments, copies are reset automatically once
+    their episode ends. The last observation of the episode is then returned in
+    `info["final_observation"]` and the context id of the episode in
+    `info["final_info"]`.
+
+    Parameters
+    ----------
+    num_envs : int
+        Number of environment copies.
+    contexts : Contexts | ContextTable | None, optional
+        Context set, by default None. If None, use the default context.
+    obs_context_features : list[str] | None, optional
+        Context features which should be included in the observation, by default None.
+        If they are None, add all context features.
+    context_selector : AbstractSelector | type[AbstractSelector] | None, optional
+        The context selector (class), by default None. If None, use a round robin
+        selector. The selector is shared by all copies. Copies which are reset
+        together get their contexts from one `select_batch` call.
+    context_selector_kwargs : dict | None, optional
+        Keyword arguments for the context selector if it is passed as a class.
+    flatten_obs : bool | str, optional
+        Whether to return the observations as one float32 array of shape
+        (num_envs, state dim + context dim), by default False. If False, the
+        observation is a dictionary of "obs" and "context" arrays. The array is a
+        copy of a preallocated buffer, unless `flatten_obs="inplace"`, which
+        returns the buffer itself.
+    seed : int | None, optional
+        Seed for the initial states, noise and the context selector, by default None.
+
+    Attributes
+    ----------
+    carl_env_class : type[CARLEnv]
+        The single CARL environment whose context space and dynamics are batched.
+    context_values : np.ndarray
+        Current context of every copy in the vector encoding of the context space,
+        shape (num_envs, n_features).
+    context_ids : np.ndarray
+        Id of the current context of every copy, -1 before the first reset.
+    """
+
+    carl_env_class: type[CARLEnv]
+
+    def __init__(
+        self,
+        num_envs: int,
+        contexts: Contexts | ContextTable | None = None,
+        obs_context_features: list[str] | None = None,
+        context_selector: AbstractSelector | type[AbstractSelector] | None = None,
+        context_selector_kwargs: dict | None = None,
+        flatten_obs: bool | str = False,
+        seed: int | None = None,
+    ) -> None:
+        context_space = self.get_context_space()
+        if contexts is None:
+            contexts = {0: self.get_default_context()}
+        if isinstance(contexts, ContextTable):
+            contexts = contexts.with_defaults(context_space)
+        else:
+            contexts = {
+                k: context_space.insert_defaults(v) for k, v in contexts.items()
+            }
+        self.contexts = contexts
+        self.context_array = context_space.encode_contexts(contexts)
+        if not context_space.check_constraints(self.context_array).all():
+            raise ValueError(
+                f"Contexts violate the constraints of {self.carl_env_class.__name__}."
+            )
+        self.context_selector = make_context_selector(
+            contexts=self.contexts,
+            context_selector=context_selector,
+            context_selector_kwargs=context_selector_kwargs,
+        )
+        if obs_context_features is None:
+            obs_context_features = context_space.context_feature_names
+        self.obs_context_features = obs_context_features
+        self._obs_context_idx = context_space.get_feature_indices(obs_context_features)
+        if flatten_obs not in (False, True, "inplace"):
+            raise ValueError(
+                f"flatten_obs must be a bool or 'inplace', got {flatten_obs!r}."
+            )
+        self.flatten_obs = flatten_obs
+
+        # Spaces and episode length are taken from the single environment
+        env = gymnasium.make(self.carl_env_class.env_name)  # type: ignore [attr-defined]
+        self.base_observation_space: spaces.Box = env.observation_space
+        self.max_episode_steps: int = env.spec.max_episode_steps  # type: ignore [union-attr]
+        single_action_space = env.action_space
+        env.close()
+
+        context_obs_space = context_space.to_gymnasium_space(
+            context_feature_names=obs_context_features
+        )
+        single_observation_space: spaces.Space
+        if flatten_obs:
+            single_observation_space = spaces.Box(
+                low=np.concatenate(
+                    [self.base_observation_space.low, context_obs_space.low]
+                ),
+                high=np.concatenate(
+                    [self.base_observation_space.high, context_obs_space.high]
+                ),
+                dtype=np.float32,
+            )
+        else:
+            single_observation_space = spaces.Dict(
+                {"obs": self.base_observation_space, "context": context_obs_space}
+            )
+        super().__init__(
+            num_envs=num_envs,
+            observation_space=single_observation_space,
+            action_space=single_action_space,
+        )
+
+        self._n_state = self.base_observation_space.shape[0]
+        self._obs_buffer = np.zeros(
+            (num_envs, self._n_state + len(self._obs_context_idx)), dtype=np.float32
+        )
+        self.context_values = np.tile(context_space.default_vector, (num_envs, 1))
+        self.context_ids = np.full(num_envs, -1, dtype=np.int64)
+        self.state = np.zeros((num_envs, self.state_dim), dtype=np.float64)
+        self._elapsed_steps = np.zeros(num_envs, dtype=np.int64)
+        self._actions: np.ndarray | None = None
+        self._np_random, _ = seeding.np_random(seed)
+        if seed is not None:
+            self.context_selector.seed(seed)
+
+    @property
+    @abc.abstractmethod
+    def state_dim(self) -> int:
+        """Dimension of the internal state of one copy."""
+        ...
+
+    @classmethod
+    def get_context_space(cls) -> ContextSpace:
+        """Get the context space of the single CARL environment.
+
+        Returns
+        -------
+        ContextSpace
+            Context space.
+        """
+        return cls.carl_env_class.get_context_space()
+
+    @classmethod
+    def get_default_context(cls) -> Context:
+        """Get the default context of the single CARL environment.
+
+        Returns
+        -------
+        Context
+            Default context.
+        """
+        return cls.carl_env_class.get_default_context()
+
+    def context_feature(self, name: str) -> np.ndarray:
+        """Get the current values of a context feature for all copies.
+
+        Parameters
+        ----------
+        name : str
+            Context feature name.
+
+        Returns
+        -------
+        np.ndarray
+            View of shape (num_envs,).
+        """
+        return self.context_values[:, self.get_context_space().feature_index[name]]
+
+    def _progress_instances(self, mask: np.ndarray) -> None:
+        """Select new contexts for the copies in `mask`.
+
+        Parameters
+        ----------
+        mask : np.ndarray
+            Boolean mask of the copies to update.
+        """
+        env_ids = np.flatnonzero(mask)
+        new_ids = self.context_selector.select_batch(len(env_ids))
+        self.context_ids[env_ids] = new_ids
+        self.context_values[env_ids] = self.context_array[new_ids]
+        self._obs_buffer[env_ids, self._n_state :] = self.context_array[
+            new_ids[:, None], self._obs_context_idx
+        ]
+
+    def _reset_envs(self, mask: np.ndarray) -> None:
+        """Select new contexts and sample initial states for the copies in `mask`.
+
+        Parameters
+        ----------
+        mask : np.ndarray
+            Boolean mask of the copies to reset.
+        """
+        self._progress_instances(mask)
+        self._elapsed_steps[mask] = 0
+        self._reset_state(mask)
+
+    @abc.abstractmethod
+    def _reset_state(self, mask: np.ndarray) -> None:
+        """Sample initial states for the copies in `mask` from their contexts.
+
+        Parameters
+        ----------
+        mask : np.ndarray
+            Boolean mask of the copies to reset.
+        """
+        ...
+
+    @abc.abstractmethod
+    def _step_dynamics(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Advance the state of all copies by one step.
+
+        Parameters
+        ----------
+        actions : np.ndarray
+            Batched actions.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Rewards and terminated flags of shape (num_envs,).
+        """
+        ...
+
+    @abc.abstractmethod
+    def _get_obs(self) -> np.ndarray:
+        """Observation of all copies computed from the state.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (num_envs, observation dim).
+        """
+        ...
+
+    def _observation(self) -> np.ndarray | dict[str, np.ndarray]:
+        self._obs_buffer[:, : self._n_state] = self._get_obs()
+        if self.flatten_obs == "inplace":
+            return self._obs_buffer
+        if self.flatten_obs:
+            return self._obs_buffer.copy()
+        return {
+            "obs": self._obs_buffer[:, : self._n_state].copy(),
+            "context": self._obs_buffer[:, self._n_state :].copy(),
+        }
+
+    def reset_wait(
+        self, seed: int | list[int] | None = None, options: dict | None = None
+    ) -> tuple[Any, dict[str, Any]]:
+        """Reset all copies.
+
+        Every copy gets a new context from the context selector.
+
+        Parameters
+        ----------
+        seed : int | list[int] | None, optional
+            Seed, by default None. Only a single seed is supported because all
+            copies share one random generator. Also reseeds the context selector.
+        options : dict | None, optional
+            Unused.
+
+        Returns
+        -------
+        tuple[Any, dict[str, Any]]
+            Batched observation and info.
+        """
+        if isinstance(seed, (list, tuple)):
+            seed = seed[0]
+        if seed is not None:
+            self._np_random, _ = seeding.np_random(seed)
+            self.context_selector.seed(seed)
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._observation(), {"context_id": self.context_ids.copy()}
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions)
+
+    def step_wait(
+        self,
+    ) -> tuple[Any, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Step all copies with the actions passed to `step_async`.
+
+        Returns
+        -------
+        tuple[Any, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]
+            Batched observation, reward, terminated, truncated and info.
+        """
+        assert self._actions is not None, "Call step_async before step_wait."
+        rewards, terminated = self._step_dynamics(self._actions)
+        self._actions = None
+        self._elapsed_steps += 1
+        truncated = self._elapsed_steps >= self.max_episode_steps
+        done = terminated | truncated
+
+        info: dict[str, Any] = {}
+        if done.any():
+            obs = self._observation()
+            final_observation = np.full(self.num_envs, None, dtype=object)
+            final_info = np.full(self.num_envs, None, dtype=object)
+            for i in np.flatnonzero(done):
+                if self.flatten_obs:
+                    final_observation[i] = obs[i].copy()
+                else:
+                    final_observation[i] = {k: v[i] for k, v in obs.items()}
+                final_info[i] = {"context_id": int(self.context_ids[i])}
+            info["final_observation"] = final_observation
+            info["_final_observation"] = done.copy()
+            info["final_info"] = final_info
+            info["_final_info"] = done.copy()
+            self._reset_envs(done)
+        info["context_id"] = self.context_ids.copy()
+        return self._observation(), rewards, terminated, truncated, info
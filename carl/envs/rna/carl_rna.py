@@ -10,6 +10,7 @@ from carl.envs.rna.rna_environment import (
     RnaDesignEnvironment,
     RnaDesignEnvironmentConfig,
 )
+from carl.utils.cache import LRUCache, context_hash
 from carl.utils.types import Contexts
 from carl.context.context_space import (
     ContextFeature,
@@ -27,14 +28,16 @@ class CARLRnaDesignEnv(CARLEnv):
         self,
         env: RnaDesignEnvironment | None = None,
         contexts: Contexts | None = None,
-        obs_context_features: list[str]
-        | None = None,  # list the context features which should be added to the state
+        obs_context_features: (
+            list[str] | None
+        ) = None,  # list the context features which should be added to the state
         obs_context_as_dict: bool = True,
         context_selector: AbstractSelector | type[AbstractSelector] | None = None,
         context_selector_kwargs: dict = None,
         obs_low: Optional[int] = 11,
         obs_high: Optional[int] = 11,
         data_location: str = "carl/envs/rna/learna/data",
+        simulator_cache: LRUCache | None = None,
         **kwargs,
     ):
         """
@@ -45,18 +48,24 @@ class CARLRnaDesignEnv(CARLEnv):
         contexts: List[Dict], optional
             Different contexts / different environment parameter settings.
         instance_mode: str, optional
+        simulator_cache: LRUCache, optional
+            Cache of the parsed target structures per dataset, by default None.
+            If None, keep the 32 most recently used ones of this instance.
         """
+        if simulator_cache is None:
+            simulator_cache = LRUCache(max_entries=32)
+        self.simulator_cache = simulator_cache
         if env is None:
-            context_space = self.get_context_features()
+            default_context = self.get_context_space().default_context
             env_config = RnaDesignEnvironmentConfig(
-                mutation_threshold=context_space["mutation_threshold"].default_value,
-                reward_exponent=context_space["reward_exponent"].default_value,
-                state_radius=context_space["state_radius"].default_value,
+                mutation_threshold=default_context["mutation_threshold"],
+                reward_exponent=default_context["reward_exponent"],
+                state_radius=default_context["state_radius"],
             )
             dot_brackets = parse_dot_brackets(
-                dataset=context_space["dataset"].default_value,  # type: ignore[arg-type]  # type: ignore[arg-type]
+                dataset=default_context["dataset"],  # type: ignore[arg-type]
                 data_dir=data_location,
-                target_structure_ids=context_space["target_structure_ids"].default_value,  # type: ignore[arg-type]
+                target_structure_ids=default_context["target_structure_ids"],  # type: ignore[arg-type]
             )
             env = RnaDesignEnvironment(dot_brackets, env_config)
 
@@ -81,16 +90,31 @@ class CARLRnaDesignEnv(CARLEnv):
         self.obs_high = obs_high
 
     def step(self, action: np.ndarray) -> Tuple[List[int], float, Any, Any, Any]:
+        state, reward, terminated, truncated, info = self._env_step(action)
+        self.step_counter += 1
+        return state, reward, terminated, truncated, info
+
+    def _env_step(self, action: np.ndarray) -> Tuple[List[int], float, Any, Any, Any]:
         # Step function has a different name in this env
         state, reward, terminated, truncated = self.env.execute(action)  # type: ignore[has-type]
-        self.step_counter += 1
         return state, reward, terminated, truncated, {}
 
     def _update_context(self) -> None:
-        dot_brackets = parse_dot_brackets(
-            dataset=self.context["dataset"],
-            data_dir=self.env.data_location,  # type: ignore[has-type]
-            target_structure_ids=self.context["target_structure_ids"],
+        dataset = self.context["dataset"]
+        data_dir = self.env.data_location  # type: ignore[has-type]
+        target_structure_ids = self.context["target_structure_ids"]
+        dot_brackets = self.simulator_cache.get_or_build(
+            (
+                data_dir,
+                context_hash(
+                    {"dataset": dataset, "target_structure_ids": target_structure_ids}
+                ),
+            ),
+            lambda: parse_dot_brackets(
+                dataset=dataset,
+                data_dir=data_dir,
+                target_structure_ids=target_structure_ids,
+            ),
         )
         env_config = RnaDesignEnvironmentConfig(
             mutation_threshold=self.context["mutation_threshold"],
@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterator, Mapping
+
+import dataclasses
+import hashlib
+import struct
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from carl.context.context_space import ContextSpace
+
+
+def quantize(values: Any, precision: int) -> Any:
+    """Round floats to a number of significant digits.
+
+    Parameters
+    ----------
+    values : float | np.ndarray
+        Float or float array.
+    precision : int
+        Number of significant digits.
+
+    Returns
+    -------
+    float | np.ndarray
+        Rounded value(s). Negative zero becomes zero.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values) & (values != 0)
+    magnitude = np.floor(
+        np.log10(np.abs(values, where=finite, out=np.ones_like(values)))
+    )
+    exponent = precision - 1 - magnitude
+    # Divide by (not multiply with) negative powers of 10, which are exact
+    up, down = 10.0 ** np.maximum(exponent, 0), 10.0 ** np.maximum(-exponent, 0)
+    rounded = np.where(finite, np.round(values * up / down) * down / up, values) + 0.0
+    return rounded if rounded.ndim else float(rounded)
+
+
+def _update_hash(hasher: Any, value: Any, precision: int | None) -> None:
+    """Feed the canonical encoding of a context feature value to a hasher."""
+    if value is None:
+        hasher.update(b"N")
+    elif isinstance(value, (bool, np.bool_)):
+        hasher.update(b"B1" if value else b"B0")
+    elif isinstance(value, (int, float, np.integer, np.floating)):
+        # Integers and floats of equal value are the same context
+        value = float(value)
+        if precision is not None:
+            value = quantize(value, precision)
+        hasher.update(b"F" + struct.pack("<d", value + 0.0))
+    elif isinstance(value, str):
+        encoded = value.encode()
+        hasher.update(b"S" + struct.pack("<q", len(encoded)) + encoded)
+    elif isinstance(value, bytes):
+        hasher.update(b"Y" + struct.pack("<q", len(value)) + value)
+    elif isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            value = value.astype(np.float64)
+            if precision is not None:
+                value = quantize(value, precision)
+            value = value + 0.0
+        elif value.dtype.kind == "O":
+            _update_hash(hasher, value.tolist(), precision)
+            return
+        value = np.ascontiguousarray(value)
+        hasher.update(
+            b"A"
+            + value.dtype.str.encode()
+            + struct.pack(f"<{value.ndim + 1}q", value.ndim, *value.shape)
+            + value.tobytes()
+        )
+    elif isinstance(value, Mapping):
+        hasher.update(b"M" + struct.pack("<q", len(value)))
+        for k in sorted(value):
+            _update_hash(hasher, str(k), None)
+            _update_hash(hasher, value[k], precision)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"L" + struct.pack("<q", len(value)))
+        for v in value:
+            _update_hash(hasher, v, precision)
+    else:
+        raise TypeError(
+            f"Cannot hash context feature value {value!r} of type {type(value).__name__}."
+        )
+
+
+def context_hash(
+    context: Mapping[str, Any],
+    env: type | str | None = None,
+    context_space: ContextSpace | None = None,
+    precision: int | None = None,
+) -> int:
+    """Canonical 64 bit hash of a context.
+
+    Unlike Python's `hash`, the hash is stable across processes and runs, so it
+    can key caches on disk or shared between workers. It does not depend on the
+    order of the context features, treats NumPy and Python numbers of equal
+    value alike and lists like tuples.
+
+    Parameters
+    ----------
+    context : Mapping[str, Any]
+        The context.
+    env : type | str | None, optional
+        Env class (or name) the context belongs to, by default None. Equal
+        contexts of different envs get different hashes.
+    context_space : ContextSpace | None, optional
+        Context space of the env, by default None. If given, missing features
+        are set to their defaults and categorical features are hashed by the
+        index of their choice.
+    precision : int | None, optional
+        Number of significant digits floats are rounded to before hashing, by
+        default None (exact). Contexts which only differ beyond the precision
+        get the same hash.
+
+    Returns
+    -------
+    int
+        Unsigned 64 bit hash.
+
+    Raises
+    ------
+    TypeError
+        If a context feature value has a type which cannot be hashed canonically.
+
+    Examples
+    --------
+    >>> context_hash({"gravity": 9.8, "length": 1}, env=CARLPendulum)
+    """
+    hasher = hashlib.blake2b(digest_size=8)
+    if isinstance(env, type):
+        env = f"{env.__module__}.{env.__qualname__}"
+    _update_hash(hasher, env, None)
+    if context_space is not None:
+        vector = context_space.encode_context(context)
+        context = {
+            **context,
+            **{name: vector[i] for name, i in context_space.feature_index.items()},
+        }
+    _update_hash(hasher, context, precision)
+    return int.from_bytes(hasher.digest(), "little")
+
+
+class ContextInterner(Mapping[int, Mapping[str, Any]]):
+    """
+    Interning table of contexts.
+
+    Maps each distinct context to its canonical hash (see `context_hash`),
+    which serves as a cheap integer id, e.g. as a cache key. Identical
+    contexts are stored once, so interning a context set deduplicates it.
+
+    Parameters
+    ----------
+    env : type | str | None, optional
+        Env class (or name) of the contexts, by default None.
+    context_space : ContextSpace | None, optional
+        Context space of the env, by default None.
+    precision : int | None, optional
+        Number of significant digits floats are rounded to, by default None.
+
+    Examples
+    --------
+    >>> interner = ContextInterner(env=CARLPendulum)
+    >>> unique_contexts = interner.dedup(sampled_contexts)
+    >>> context = interner[interner.intern(sampled_contexts[0])]
+    """
+
+    def __init__(
+        self,
+        env: type | str | None = None,
+        context_space: ContextSpace | None = None,
+        precision: int | None = None,
+    ) -> None:
+        self.env = env
+        self.context_space = context_space
+        self.precision = precision
+        self._contexts: dict[int, Mapping[str, Any]] = {}
+
+    def hash(self, context: Mapping[str, Any]) -> int:
+        """Canonical hash of a context (see `context_hash`)."""
+        return context_hash(
+            context,
+            env=self.env,
+            context_space=self.context_space,
+            precision=self.precision,
+        )
+
+    def intern(self, context: Mapping[str, Any]) -> int:
+        """Add a context if it is new.
+
+        Parameters
+        ----------
+        context : Mapping[str, Any]
+            The context.
+
+        Returns
+        -------
+        int
+            Id of the context. The first interned of identical contexts is
+            kept under this id.
+        """
+        context_id = self.hash(context)
+        self._contexts.setdefault(context_id, context)
+        return context_id
+
+    def dedup(
+        self, contexts: Mapping[Any, Mapping[str, Any]]
+    ) -> dict[int, Mapping[str, Any]]:
+        """Intern a context set and drop duplicates.
+
+        Parameters
+        ----------
+        contexts : Contexts
+            Context set (or `ContextTable`).
+
+        Returns
+        -------
+        dict[int, Mapping[str, Any]]
+            The distinct contexts by id, in the order of their first occurrence.
+        """
+        return {
+            context_id: self._contexts[context_id]
+            for context_id in map(self.intern, contexts.values())
+        }
+
+    def __getitem__(self, context_id: int) -> Mapping[str, Any]:
+        return self._contexts[context_id]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._contexts)
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Roughly estimate the memory used by an object.
+
+    Arrays (NumPy, JAX) count with their buffer size, containers and dataclasses
+    (e.g. Brax systems) recursively, everything else with `sys.getsizeof`.
+
+    Parameters
+    ----------
+    value : Any
+        The object.
+
+    Returns
+    -------
+    int
+        Estimated size in bytes.
+    """
+    if hasattr(value, "nbytes") and not isinstance(value, type):
+        return int(value.nbytes)
+    if isinstance(value, Mapping):
+        return sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(
+            estimate_nbytes(getattr(value, f.name)) for f in dataclasses.fields(value)
+        )
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Least recently used cache.
+
+    Used to keep built simulators (or their expensive parts) per context, so
+    switching back to a recently used context does not rebuild them. The cache
+    can be bounded by the number of entries and/or their total size.
+
+    Parameters
+    ----------
+    max_entries : int | None, optional
+        Maximum number of entries, by default 32. If None, unbounded.
+    max_bytes : int | None, optional
+        Maximum total size of the entries in bytes, by default None (unbounded).
+        An entry larger than `max_bytes` is not cached.
+    sizeof : Callable[[Any], int] | None, optional
+        Function computing the size of an entry in bytes, by default None.
+        If None, use `estimate_nbytes`. Only used if `max_bytes` is set.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups which found an entry.
+    misses : int
+        Number of lookups which did not find an entry.
+    nbytes : int
+        Total size of the entries (0 if `max_bytes` is not set).
+
+    Examples
+    --------
+    >>> cache = LRUCache(max_entries=2)
+    >>> sys = cache.get_or_build(context_hash(context), lambda: build(context))
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = 32,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof if sizeof is not None else estimate_nbytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get an entry and mark it as most recently used.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the entry.
+        default : Any, optional
+            Returned if there is no entry for `key`, by default None.
+
+        Returns
+        -------
+        Any
+            The entry or `default`.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Add or replace an entry and evict the least recently used ones if needed.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the entry.
+        value : Any
+            The entry.
+        """
+        nbytes = self.sizeof(value) if self.max_bytes is not None else 0
+        self.pop(key)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while (self.max_entries is not None and len(self) > self.max_entries) or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_nbytes
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Get an entry or build and add it if there is none.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the entry.
+        build : Callable[[], Any]
+            Builds the entry.
+
+        Returns
+        -------
+        Any
+            The cached or newly built entry.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+        self.misses += 1
+        value = build()
+        self.put(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the entry.
+        default : Any, optional
+            Returned if there is no entry for `key`, by default None.
+
+        Returns
+        -------
+        Any
+            The removed entry or `default`.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.nbytes -= entry[1]
+        return entry[0]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self.nbytes = 0
@@ -23,7 +23,7 @@ def build() -> Tuple[pd.DataFrame, Dict, Dict]:
     outdir = filepath.parent.parent.parent.parent / "docs/source/environments/data"
     print("Build environment overview table.")
     # Create snapshot
-    local_vars = vars(carl.envs)
+    local_vars = {name: getattr(carl.envs, name) for name in carl.envs.__all__}
 
     k_env_family = "Env. Family"
     k_env_name = "Name"
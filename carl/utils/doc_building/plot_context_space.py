@@ -5,6 +5,7 @@ Boxplot
 - number of CFs changing the dynamics
 - number of CFs changing the reward
 """
+
 from __future__ import annotations
 
 if __name__ == "__main__":
@@ -17,7 +18,7 @@ if __name__ == "__main__":
 
     import carl.envs
 
-    global_vars = vars(carl.envs)
+    global_vars = {name: getattr(carl.envs, name) for name in carl.envs.__all__}
     vars = {
         k: v for k, v in global_vars.items() if "Env" in k or "Meta" in k or "CARL" in k
     }
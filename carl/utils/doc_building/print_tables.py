@@ -96,7 +96,7 @@ if __name__ == "__main__":
 
         plt.show()
 
-    global_vars = vars(carl.envs)
+    global_vars = {name: getattr(carl.envs, name) for name in carl.envs.__all__}
     vars = {
         k: v for k, v in global_vars.items() if "Env" in k or "Meta" in k or "CARL" in k
     }
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class SumTree:
+    """
+    Sum tree over non-negative weights.
+
+    A complete binary tree stored in one array, where every node holds the sum
+    of its children. Sampling an index proportional to its weight and
+    updating weights both take O(log n). All operations are vectorized over
+    batches of indices.
+
+    Parameters
+    ----------
+    weights : np.ndarray
+        Initial non-negative weights, shape (n,).
+
+    Raises
+    ------
+    ValueError
+        If there are no weights or some are negative or not finite.
+
+    Examples
+    --------
+    >>> tree = SumTree(np.ones(4))
+    >>> tree.update([2], [3.0])
+    >>> tree.sample(np.random.default_rng(0), size=10)  # index 2 half of the time
+    """
+
+    def __init__(self, weights: np.ndarray) -> None:
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0:
+            raise ValueError("Weights must be a non-empty 1D array.")
+        self.n = len(weights)
+        self.depth = int(np.ceil(np.log2(self.n))) if self.n > 1 else 0
+        self.capacity = 1 << self.depth
+        # Node i has the children 2i and 2i + 1, the root is node 1
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+        self.rebuild(weights)
+
+    @staticmethod
+    def _check(weights: np.ndarray) -> None:
+        if not np.all(np.isfinite(weights)) or np.any(weights < 0):
+            raise ValueError("Weights must be finite and non-negative.")
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def total(self) -> float:
+        """Sum of all weights."""
+        return float(self.tree[1])
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Read-only view of the weights."""
+        view = self.tree[self.capacity : self.capacity + self.n]
+        view.flags.writeable = False
+        return view
+
+    def rebuild(self, weights: np.ndarray) -> None:
+        """Replace all weights, O(n).
+
+        Parameters
+        ----------
+        weights : np.ndarray
+            Non-negative weights, shape (n,).
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        self._check(weights)
+        self.tree[:] = 0.0
+        self.tree[self.capacity : self.capacity + self.n] = weights
+        lo = self.capacity
+        while lo > 1:
+            lo //= 2
+            self.tree[lo : 2 * lo] = (
+                self.tree[2 * lo : 4 * lo : 2] + self.tree[2 * lo + 1 : 4 * lo : 2]
+            )
+
+    def update(self, indices: np.ndarray, weights: np.ndarray) -> None:
+        """Set the weights at some indices, O(k log n).
+
+        Parameters
+        ----------
+        indices : np.ndarray
+            Indices of the weights. For duplicates, the last weight is kept.
+        weights : np.ndarray
+            New non-negative weights, broadcastable to the shape of `indices`.
+        """
+        indices = np.asarray(indices, dtype=np.intp).ravel()
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), indices.shape)
+        self._check(weights)
+        if len(indices) == 0:
+            return
+        if np.any((indices < 0) | (indices >= self.n)):
+            raise IndexError(f"Indices must be in [0, {self.n}).")
+        nodes = indices + self.capacity
+        self.tree[nodes] = weights
+        if self.depth == 0:
+            # A single leaf is the root
+            return
+        if len(nodes) == 1:
+            # Plain Python is faster than array operations for a single path
+            node = int(nodes[0]) // 2
+            while node > 0:
+                self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+                node //= 2
+            return
+        # All leaves are on the same level, so the parents are recomputed level by level
+        nodes = np.unique(nodes // 2)
+        while True:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Find the indices whose cumulative weight interval contains the values.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Values in [0, total).
+
+        Returns
+        -------
+        np.ndarray
+            Indices, same shape as `values`. Only indices with positive weight are
+            returned, unless all weights are zero.
+        """
+        values = np.array(values, dtype=np.float64)
+        if values.ndim == 0:
+            value, node = float(values), 1
+            for _ in range(self.depth):
+                node *= 2
+                left_sum = self.tree[node]
+                if value >= left_sum:
+                    value -= left_sum
+                    node += 1
+            if self.tree[node] > 0:
+                return np.array(node - self.capacity)
+            return self._walk_back(np.array(node - self.capacity))
+        nodes = np.ones(values.shape, dtype=np.intp)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values >= left_sum
+            values -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        indices = nodes - self.capacity
+        if np.all(self.tree[nodes] > 0):
+            return indices
+        return self._walk_back(indices)
+
+    def _walk_back(self, indices: np.ndarray) -> np.ndarray:
+        """Move indices of zero weight to the closest preceding positive weight.
+
+        Rounding in the descent can step past the last positive weight of a
+        subtree, e.g. onto zero weights at the end or the padding leaves.
+        """
+        positive = np.flatnonzero(self.tree[self.capacity : self.capacity + self.n])
+        if len(positive) == 0:
+            return np.minimum(indices, self.n - 1)
+        before = np.searchsorted(positive, indices, side="right") - 1
+        walked = positive[np.maximum(before, 0)]
+        return np.where(self.tree[self.capacity + indices] > 0, indices, walked)
+
+    def sample(self, rng: np.random.Generator, size: int | None = None) -> np.ndarray:
+        """Sample indices proportional to their weights.
+
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator.
+        size : int | None, optional
+            Number of samples, by default None (one index as a 0d array).
+
+        Returns
+        -------
+        np.ndarray
+            Sampled indices.
+
+        Raises
+        ------
+        ValueError
+            If all weights are zero.
+        """
+        total = self.total
+        if total <= 0:
+            raise ValueError(
+                "Cannot sample from a sum tree whose weights are all zero."
+            )
+        return self.find(rng.uniform(0.0, total, size=size))
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Hot path sections of `CARLEnv` which can be timed
+TIMED_SECTIONS = {
+    "_progress_instance": "progress_instance",
+    "_update_context": "update_context",
+    "_env_reset": "env_reset",
+    "_env_step": "env_step",
+    "_add_context_to_state": "add_context_to_state",
+}
+
+
+class TimingHistogram:
+    """
+    Histogram of durations with logarithmically spaced bins.
+
+    Parameters
+    ----------
+    min_ns : float, optional
+        Upper edge of the first bin in nanoseconds, by default 100.
+    bins_per_decade : int, optional
+        Number of bins per factor of ten, by default 8.
+    n_bins : int, optional
+        Number of bins, by default 80 (up to 10 s for the defaults).
+        The last bin collects all longer durations.
+
+    Attributes
+    ----------
+    counts : list[int]
+        Number of durations per bin.
+    count : int
+        Number of recorded durations.
+    total_ns : int
+        Sum of the recorded durations.
+    min_ns : int | None
+        Shortest recorded duration.
+    max_ns : int | None
+        Longest recorded duration.
+    """
+
+    __slots__ = (
+        "_log_min",
+        "bins_per_decade",
+        "counts",
+        "count",
+        "total_ns",
+        "min_ns",
+        "max_ns",
+    )
+
+    def __init__(
+        self, min_ns: float = 100, bins_per_decade: int = 8, n_bins: int = 80
+    ) -> None:
+        self._log_min = math.log10(min_ns)
+        self.bins_per_decade = bins_per_decade
+        self.counts = [0] * n_bins
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: int | None = None
+        self.max_ns: int | None = None
+
+    def add(self, duration_ns: int) -> None:
+        """Add a duration.
+
+        Parameters
+        ----------
+        duration_ns : int
+            Duration in nanoseconds.
+        """
+        if duration_ns > 0:
+            index = math.ceil(
+                (math.log10(duration_ns) - self._log_min) * self.bins_per_decade
+            )
+            index = min(max(index, 0), len(self.counts) - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if self.min_ns is None or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if self.max_ns is None or duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    @property
+    def bin_edges_ns(self) -> np.ndarray:
+        """Upper edges of the bins in nanoseconds (the last bin is unbounded)."""
+        exponents = self._log_min + np.arange(len(self.counts)) / self.bins_per_decade
+        return 10.0**exponents
+
+    @property
+    def mean_ns(self) -> float:
+        """Mean duration in nanoseconds."""
+        return self.total_ns / self.count if self.count else math.nan
+
+    def quantile_ns(self, q: float) -> float:
+        """Approximate quantile of the durations (upper edge of its bin).
+
+        Parameters
+        ----------
+        q : float
+            Quantile in [0, 1].
+
+        Returns
+        -------
+        float
+            Duration in nanoseconds.
+        """
+        if not self.count:
+            return math.nan
+        index = int(np.searchsorted(np.cumsum(self.counts), q * self.count))
+        return min(float(self.bin_edges_ns[index]), float(self.max_ns))
+
+    def summary(self) -> dict[str, float]:
+        """Summary statistics in seconds.
+
+        Returns
+        -------
+        dict[str, float]
+            Count, total, mean, min, median, p99 and max.
+        """
+        return {
+            "count": self.count,
+            "total": self.total_ns * 1e-9,
+            "mean": self.mean_ns * 1e-9,
+            "min": (self.min_ns or 0) * 1e-9,
+            "p50": self.quantile_ns(0.5) * 1e-9,
+            "p99": self.quantile_ns(0.99) * 1e-9,
+            "max": (self.max_ns or 0) * 1e-9,
+        }
+
+
+class TimingRecorder:
+    """
+    Records the wall time of hot path sections per context.
+
+    Durations go into one `TimingHistogram` per (section, context id). The
+    most recent individual events are kept as well so they can be exported
+    as a Chrome trace (open in `chrome://tracing` or Perfetto).
+
+    Parameters
+    ----------
+    max_events : int, optional
+        Number of most recent events kept for the trace, by default 100 000.
+        Set to 0 to only keep the histograms.
+    histogram_kwargs : dict | None, optional
+        Keyword arguments for the `TimingHistogram`s.
+
+    Examples
+    --------
+    >>> recorder = env.enable_timing()
+    >>> ...  # run episodes
+    >>> recorder.summary()["update_context"]
+    >>> recorder.save_chrome_trace("trace.json")
+    """
+
+    def __init__(
+        self, max_events: int = 100_000, histogram_kwargs: dict | None = None
+    ) -> None:
+        self.histograms: dict[tuple[str, Hashable], TimingHistogram] = {}
+        self.events: deque[tuple[str, Hashable, int, int]] = deque(maxlen=max_events)
+        self.histogram_kwargs = histogram_kwargs or {}
+
+    def record(
+        self, section: str, context_id: Hashable, start_ns: int, end_ns: int
+    ) -> None:
+        """Record one timed call.
+
+        Parameters
+        ----------
+        section : str
+            Name of the timed section.
+        context_id : Hashable
+            Context id during the call.
+        start_ns : int
+            Start time from `time.perf_counter_ns`.
+        end_ns : int
+            End time from `time.perf_counter_ns`.
+        """
+        key = (section, context_id)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = TimingHistogram(**self.histogram_kwargs)
+        histogram.add(end_ns - start_ns)
+        if self.events.maxlen:
+            self.events.append((section, context_id, start_ns, end_ns))
+
+    def timed(
+        self,
+        section: str,
+        function: Callable,
+        get_context_id: Callable[[], Hashable],
+    ) -> Callable:
+        """Wrap a function so that each call is recorded.
+
+        Parameters
+        ----------
+        section : str
+            Name of the timed section.
+        function : Callable
+            Function to time.
+        get_context_id : Callable[[], Hashable]
+            Returns the current context id, called after the function.
+
+        Returns
+        -------
+        Callable
+            Timed function.
+        """
+        perf_counter_ns = time.perf_counter_ns
+
+        @functools.wraps(function)
+        def timed_function(*args: Any, **kwargs: Any) -> Any:
+            start_ns = perf_counter_ns()
+            result = function(*args, **kwargs)
+            end_ns = perf_counter_ns()
+            self.record(section, get_context_id(), start_ns, end_ns)
+            return result
+
+        return timed_function
+
+    def summary(self) -> dict[str, dict[Hashable, dict[str, float]]]:
+        """Summary statistics per section and context id.
+
+        Returns
+        -------
+        dict[str, dict[Hashable, dict[str, float]]]
+            Statistics in seconds (see `TimingHistogram.summary`).
+        """
+        summary: dict[str, dict[Hashable, dict[str, float]]] = {}
+        for (section, context_id), histogram in self.histograms.items():
+            summary.setdefault(section, {})[context_id] = histogram.summary()
+        return summary
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Convert the recorded events to the Chrome trace event format.
+
+        Returns
+        -------
+        dict[str, Any]
+            JSON serializable trace with complete ("X") events in microseconds.
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [
+            {
+                "name": section,
+                "cat": "carl",
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {"context_id": _to_json(context_id)},
+            }
+            for section, context_id, start_ns, end_ns in self.events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str | os.PathLike) -> None:
+        """Write the recorded events as a Chrome trace JSON file.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Output file.
+        """
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+    def save_summary(self, path: str | os.PathLike) -> None:
+        """Write the summary statistics and histograms as a JSON file.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Output file.
+        """
+        data = [
+            {
+                "section": section,
+                "context_id": _to_json(context_id),
+                **histogram.summary(),
+                "bin_edges_ns": histogram.bin_edges_ns.tolist(),
+                "counts": histogram.counts,
+            }
+            for (section, context_id), histogram in self.histograms.items()
+        ]
+        with open(path, "w") as file:
+            json.dump(data, file)
+
+    def clear(self) -> None:
+        """Remove all recorded timings."""
+        self.histograms.clear()
+        self.events.clear()
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from carl.envs.gymnasium.classic_control.carl_pendulum import CARLPendulum
 
 CARLPendulum.render_mode = "rgb_array"
@@ -28,5 +30,118 @@ class TestStateConstruction(unittest.TestCase):
         self.assertEqual(len(state["context"]), n)
 
 
+class TestContextSpaceCache(unittest.TestCase):
+    def test_context_space_cached(self):
+        from carl.envs.gymnasium.classic_control.carl_cartpole import CARLCartPole
+
+        context_space = CARLPendulum.get_context_space()
+        self.assertIs(context_space, CARLPendulum.get_context_space())
+        self.assertIs(context_space, CARLPendulum().get_context_space())
+        self.assertIsNot(context_space, CARLCartPole.get_context_space())
+        self.assertListEqual(
+            CARLCartPole.get_context_space().context_feature_names,
+            list(CARLCartPole.get_context_features().keys()),
+        )
+
+
+class TestFlatObservation(unittest.TestCase):
+    def test_observation_flat(self):
+        contexts = {
+            0: CARLPendulum.get_default_context(),
+            1: {"g": 5.0, "l": 2.0},
+        }
+        env = CARLPendulum(contexts=contexts, flatten_obs=True)
+        self.assertEqual(type(env.observation_space).__name__, "Box")
+        self.assertEqual(env.observation_space.dtype, np.float32)
+
+        obs, info = env.reset()
+        n_state = env.base_observation_space.shape[0]
+        self.assertEqual(obs.shape, env.observation_space.shape)
+        self.assertEqual(obs.dtype, np.float32)
+        context = [env.context[k] for k in env.obs_context_features]
+        np.testing.assert_allclose(obs[n_state:], context, rtol=1e-6)
+
+        obs_step, *_ = env.step(env.action_space.sample())
+        self.assertIsNot(obs_step, obs)
+        np.testing.assert_allclose(obs_step[n_state:], context, rtol=1e-6)
+
+        obs, info = env.reset()
+        self.assertEqual(info["context_id"], 1)
+        self.assertAlmostEqual(obs[n_state + env.obs_context_features.index("g")], 5.0)
+
+    def test_observation_flat_inplace(self):
+        env = CARLPendulum(flatten_obs="inplace")
+        obs, _ = env.reset()
+        obs_step, *_ = env.step(env.action_space.sample())
+        self.assertIs(obs_step, obs)
+        with self.assertRaises(ValueError):
+            CARLPendulum(flatten_obs="copy")
+
+    def test_observation_flat_context_modified(self):
+        env = CARLPendulum(flatten_obs=True)
+        env.reset()
+        g = env.obs_context_features.index("g")
+        env.context["g"] = 3.0
+        obs, *_ = env.step(env.action_space.sample())
+        self.assertAlmostEqual(obs[env.base_observation_space.shape[0] + g], 3.0)
+
+    def test_observation_flat_reducedcontext(self):
+        env = CARLPendulum(obs_context_features=["g", "m"], flatten_obs=True)
+        obs, _ = env.reset()
+        n_state = env.base_observation_space.shape[0]
+        self.assertEqual(obs.shape, (n_state + 2,))
+        self.assertTrue(env.observation_space.contains(obs))
+
+
+class TestTiming(unittest.TestCase):
+    def test_enable_disable(self):
+        import json
+        import os
+        import tempfile
+
+        env = CARLPendulum(contexts={0: {"g": 9.8}, 1: {"g": 5.0}})
+        recorder = env.enable_timing()
+        for _ in range(2):
+            env.reset()
+            env.step(env.action_space.sample())
+        env.disable_timing()
+        env.reset()
+        env.step(env.action_space.sample())
+
+        summary = recorder.summary()
+        self.assertSetEqual(
+            set(summary),
+            {
+                "progress_instance",
+                "update_context",
+                "env_reset",
+                "env_step",
+                "add_context_to_state",
+            },
+        )
+        self.assertSetEqual(set(summary["env_step"]), {0, 1})
+        self.assertEqual(summary["env_step"][0]["count"], 1)
+        self.assertGreater(summary["env_step"][0]["total"], 0)
+        self.assertNotIn("_env_step", env.__dict__)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "trace.json")
+            recorder.save_chrome_trace(path)
+            with open(path) as file:
+                trace = json.load(file)
+        self.assertEqual(len(trace["traceEvents"]), len(recorder.events))
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+
+    def test_histogram(self):
+        from carl.utils.timing import TimingHistogram
+
+        histogram = TimingHistogram(min_ns=100, bins_per_decade=1, n_bins=4)
+        for duration in [50, 100, 150, 5000, 10**9]:
+            histogram.add(duration)
+        self.assertListEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(histogram.min_ns, 50)
+        self.assertEqual(histogram.quantile_ns(0.5), 1000)
+
+
 if __name__ == "__main__":
     unittest.main()
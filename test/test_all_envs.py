@@ -7,7 +7,7 @@ import carl.envs
 
 class TestInitEnvs(unittest.TestCase):
     def test_init_all_envs(self):
-        global_vars = vars(carl.envs)
+        global_vars = {name: getattr(carl.envs, name) for name in carl.envs.__all__}
         mustinclude = "CARL"
         forbidden = ["defaults", "bounds", "mask"]
         for varname, var in global_vars.items():
@@ -0,0 +1,143 @@
+import os
+import unittest
+
+import numpy as np
+
+from carl.context.context_space import CategoricalContextFeature
+from carl.context.context_table import ContextTable
+from carl.context.shared_selection import SharedSchedule, SharedSelector
+from carl.envs.carl_async_vector_env import CARLAsyncVectorEnv, shard_context_indices
+from carl.envs.gymnasium.classic_control import CARLCartPole, CARLPendulum
+
+
+class CARLCategoricalPendulum(CARLPendulum):
+    @staticmethod
+    def get_context_features():
+        return {
+            **CARLPendulum.get_context_features(),
+            "mode": CategoricalContextFeature("mode", choices=["a", "b"]),
+        }
+
+
+class TestShardContextIndices(unittest.TestCase):
+    def test_shards(self):
+        shards = shard_context_indices(7, 3)
+        self.assertEqual([s.tolist() for s in shards], [[0, 1, 2], [3, 4], [5, 6]])
+        shards = shard_context_indices(2, 3)
+        self.assertEqual([s.tolist() for s in shards], [[0], [1], [0]])
+
+
+class TestCARLAsyncVectorEnv(unittest.TestCase):
+    def test_reset_step(self):
+        contexts = {f"c{i}": {"gravity": 5.0 + i} for i in range(4)}
+        env = CARLAsyncVectorEnv(CARLCartPole, num_envs=2, contexts=contexts)
+        try:
+            obs, info = env.reset(seed=0)
+            self.assertEqual(obs["obs"].shape, (2, 4))
+            self.assertEqual(obs["context"].shape, (2, 8))
+            np.testing.assert_array_equal(info["context_id"], [0, 2])
+            np.testing.assert_array_equal(env.context_ids, [0, 2])
+            gravity_idx = CARLCartPole.get_context_space().feature_index["gravity"]
+            np.testing.assert_allclose(env.context_values[:, gravity_idx], [5.0, 7.0])
+
+            seen_final = False
+            for _ in range(100):
+                obs, reward, terminated, truncated, info = env.step(
+                    env.action_space.sample()
+                )
+                np.testing.assert_array_equal(reward, [1.0, 1.0])
+                done = terminated | truncated
+                if done.any():
+                    i = int(np.argmax(done))
+                    self.assertEqual(info["final_observation"][i].shape, (12,))
+                    self.assertIn(info["final_info"][i]["context_id"], [0, 1, 2, 3])
+                    seen_final = True
+                # Every worker only selects contexts from its own shard
+                self.assertIn(info["context_id"][0], [0, 1])
+                self.assertIn(info["context_id"][1], [2, 3])
+            self.assertTrue(seen_final)
+        finally:
+            env.close()
+
+    def test_set_contexts(self):
+        table = ContextTable({"g": np.array([1.0, 2.0, 3.0, 4.0])})
+        env = CARLAsyncVectorEnv(
+            CARLPendulum, num_envs=2, contexts=table, flatten_obs=True
+        )
+        try:
+            obs, _ = env.reset(seed=0)
+            self.assertEqual(obs.shape, (2, 10))
+            self.assertEqual(obs.dtype, np.float32)
+            env.set_contexts(shards=[[3], [0]])
+            _, info = env.reset()
+            np.testing.assert_array_equal(info["context_id"], [3, 0])
+            g_idx = CARLPendulum.get_context_space().feature_index["g"]
+            np.testing.assert_allclose(env.context_values[:, g_idx], [4.0, 1.0])
+            with self.assertRaises(ValueError):
+                env.set_contexts(shards=[[0]])
+        finally:
+            env.close()
+
+    def test_contexts_from_path(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "contexts")
+            ContextTable({"g": np.array([1.0, 2.0, 3.0, 4.0])}).save(
+                path, CARLPendulum.get_context_space()
+            )
+            env = CARLAsyncVectorEnv(CARLPendulum, num_envs=2, contexts=path)
+            try:
+                _, info = env.reset(seed=0)
+                np.testing.assert_array_equal(info["context_id"], [0, 2])
+                g_idx = CARLPendulum.get_context_space().feature_index["g"]
+                np.testing.assert_allclose(env.context_values[:, g_idx], [1.0, 3.0])
+            finally:
+                env.close()
+
+    def test_shared_selector(self):
+        contexts = {i: {"gravity": 5.0 + i} for i in range(6)}
+        schedule = SharedSchedule(len(contexts))
+        env = CARLAsyncVectorEnv(
+            CARLCartPole,
+            num_envs=3,
+            contexts=contexts,
+            context_selector=SharedSelector,
+            context_selector_kwargs={"schedule": schedule, "lease_size": 1},
+        )
+        try:
+            self.assertTrue(all(len(shard) == 6 for shard in env.shards))
+            _, info = env.reset(seed=0)
+            first = info["context_id"].tolist()
+            _, info = env.reset(seed=0)
+            # The workers share one round robin schedule over all contexts
+            self.assertListEqual(
+                sorted(first + info["context_id"].tolist()), list(range(6))
+            )
+            self.assertEqual(schedule.cursor, 6)
+            # The dictionary is shared with the workers as a memory-mapped table
+            self.assertIsInstance(env.contexts, ContextTable)
+            tmpdir = env.contexts._path
+            self.assertTrue(os.path.isdir(tmpdir))
+        finally:
+            env.close()
+        self.assertFalse(os.path.exists(tmpdir))
+
+    def test_categorical_features_raise(self):
+        with self.assertRaises(ValueError):
+            CARLAsyncVectorEnv(CARLCategoricalPendulum, num_envs=2)
+        env = CARLAsyncVectorEnv(
+            CARLCategoricalPendulum, num_envs=2, obs_context_features=["g"]
+        )
+        try:
+            obs, _ = env.reset(seed=0)
+            self.assertEqual(obs["context"].shape, (2, 1))
+        finally:
+            env.close()
+
+    def test_selector_instance_raises(self):
+        from carl.context.selection import RoundRobinSelector
+
+        selector = RoundRobinSelector(contexts={0: {}})
+        with self.assertRaises(ValueError):
+            CARLAsyncVectorEnv(CARLCartPole, num_envs=2, context_selector=selector)
@@ -0,0 +1,86 @@
+import dataclasses
+import json
+import os
+import tempfile
+import unittest
+
+from carl.bench import benchmark_env, compare_to_baseline, load_results
+from carl.bench.__main__ import main
+from carl.bench.benchmark import REPRESENTATIVE_ENVS, SELECTORS, make_contexts
+from carl.envs import ENV_FAMILIES
+from carl.envs.gymnasium.classic_control import CARLCartPole
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_make_contexts(self):
+        contexts = make_contexts(CARLCartPole, 5)
+        gravities = [context["gravity"] for context in contexts.values()]
+        self.assertEqual(len(contexts), 5)
+        self.assertAlmostEqual(gravities[0], 0.8 * 9.8)
+        self.assertAlmostEqual(gravities[-1], 1.2 * 9.8)
+
+    def test_benchmark_env(self):
+        result = benchmark_env(
+            CARLCartPole, n_contexts=3, selector="round_robin", n_steps=50, n_resets=3
+        )
+        self.assertEqual(result.key, ("CARLCartPole", 3, "round_robin"))
+        self.assertGreater(result.steps_per_s, 0)
+        self.assertGreater(result.reset_latency_s, 0)
+        self.assertGreater(result.context_switch_latency_s, 0)
+        self.assertGreater(result.memory_per_env_bytes, 0)
+
+    def test_compare_to_baseline(self):
+        result = benchmark_env(
+            CARLCartPole, n_contexts=1, selector="random", n_steps=10, n_resets=2
+        )
+        faster = dataclasses.replace(result, steps_per_s=result.steps_per_s * 2)
+        self.assertListEqual(compare_to_baseline([result], [result]), [])
+        regressions = compare_to_baseline([result], [faster], tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0]["metric"], "steps_per_s")
+        self.assertAlmostEqual(regressions[0]["change"], -0.5)
+
+    def test_representative_envs(self):
+        self.assertSetEqual(set(REPRESENTATIVE_ENVS), set(ENV_FAMILIES))
+        for family, class_name in REPRESENTATIVE_ENVS.items():
+            self.assertIn(class_name, ENV_FAMILIES[family][2])
+
+    def test_baseline(self):
+        path = os.path.join(
+            os.path.dirname(__file__), "..", "benchmarks", "baseline.json"
+        )
+        baseline = load_results(path)
+        keys = {result.key for result in baseline}
+        for selector in SELECTORS:
+            # `make bench` uses the default selectors, all of them
+            self.assertIn(("CARLCartPole", 100, selector), keys)
+        self.assertEqual(len(keys), len(baseline))
+        self.assertListEqual(compare_to_baseline(baseline, baseline), [])
+
+    def test_cli(self):
+        args = [
+            "--families",
+            "classic_control",
+            "--context-set-sizes",
+            "2",
+            "--selectors",
+            "round_robin",
+            "--n-steps",
+            "10",
+            "--n-resets",
+            "2",
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "bench.json")
+            self.assertEqual(main(args + ["--output", path]), 0)
+            with open(path) as file:
+                report = json.load(file)
+            self.assertEqual(len(report["results"]), 1)
+            self.assertEqual(report["results"][0]["env"], "CARLCartPole")
+            self.assertEqual(load_results(path)[0].n_contexts, 2)
+
+            # A much better baseline makes the run fail
+            report["results"][0]["steps_per_s"] *= 100
+            with open(path, "w") as file:
+                json.dump(report, file)
+            self.assertEqual(main(args + ["--baseline", path, "-o", path]), 1)
@@ -1,3 +1,4 @@
+import importlib.util as iutil
 import inspect
 import unittest
 
@@ -22,6 +23,184 @@ class TestBraxEnvs(unittest.TestCase):
                     print(f"Cannot instantiate {env_name} environment.")
                     raise e
 
+    def test_system_cache(self):
+        from carl.envs.brax import CARLBraxAnt
+
+        contexts = {0: {"gravity": -9.8}, 1: {"gravity": -5.0}}
+        env = CARLBraxAnt(contexts=contexts)
+        params = []
+        for _ in range(3):
+            env.reset()
+            params.append(env.env.unwrapped.system_params)
+        self.assertIs(params[0], params[2])
+        self.assertEqual(float(params[1]["gravity"]), -5.0)
+        self.assertEqual(len(env.simulator_cache), 2)
+
+    def test_context_change_without_recompilation(self):
+        import numpy as np
+
+        from carl.envs.brax import CARLBraxAnt
+
+        contexts = {
+            i: {**CARLBraxAnt.get_default_context(), "gravity": g}
+            for i, g in enumerate([-9.8, -1.0])
+        }
+        env = CARLBraxAnt(contexts=contexts)
+        action = np.zeros(env.action_space.shape, dtype=np.float32)
+        heights = []
+        for i in range(2):
+            env.reset()
+            for _ in range(20):
+                env.step(action)
+            if i == 0:
+                compile_count = env.compile_count
+            heights.append(float(env.env.unwrapped._state.pipeline_state.x.pos[0, 2]))
+        # The compiled step simulates the new context instead of the old one
+        self.assertEqual(env.compile_count, compile_count)
+        self.assertGreater(heights[1], heights[0])
+
+    def test_system_params(self):
+        from carl.envs.brax import CARLBraxAnt
+        from carl.envs.brax.brax_system import (
+            apply_system_params,
+            get_system_params,
+            load_base_system,
+        )
+
+        base_sys = load_base_system(CARLBraxAnt.asset_path)
+        self.assertIs(load_base_system(CARLBraxAnt.asset_path), base_sys)
+        context = {
+            "gravity": -3.0,
+            "friction": 0.5,
+            "mass_torso": 2.0,
+            "viscosity": 0.1,
+        }
+        params = get_system_params(context, base_sys)
+        self.assertSetEqual(set(params), {"gravity", "friction", "mass", "viscosity"})
+        sys = apply_system_params(base_sys, params)
+        self.assertEqual(float(sys.gravity[2]), -3.0)
+        self.assertAlmostEqual(float(sys.viscosity), 0.1, places=6)
+        self.assertEqual(float(sys.ang_damping), float(base_sys.ang_damping))
+        torso = base_sys.link_names.index("torso")
+        self.assertEqual(float(sys.link.inertia.mass[torso]), 2.0)
+        self.assertTrue(all(float(g.friction.min()) == 0.5 for g in sys.geoms))
+        # The base system is not changed
+        self.assertNotEqual(float(base_sys.gravity[2]), -3.0)
+        with self.assertRaises(RuntimeError):
+            get_system_params({"mass_tail": 1.0}, base_sys)
+
+    def test_viscosity(self):
+        import jax
+        import numpy as np
+        from brax.spring import pipeline
+        from jax import numpy as jp
+
+        from carl.envs.brax import CARLBraxHalfcheetah
+        from carl.envs.brax.brax_system import (
+            apply_system_params,
+            get_system_params,
+            load_base_system,
+        )
+
+        base_sys = load_base_system(CARLBraxHalfcheetah.asset_path)
+        self.assertFalse(base_sys.enable_fluid)
+        step = jax.jit(pipeline.step)
+
+        def rollout(sys):
+            state = pipeline.init(sys, sys.init_q, jp.ones(sys.qd_size()))
+            for _ in range(10):
+                state = step(sys, state, jp.zeros(sys.act_size()))
+            return np.asarray(state.q)
+
+        def with_viscosity(viscosity):
+            params = get_system_params({"viscosity": viscosity}, base_sys)
+            return apply_system_params(base_sys, params)
+
+        # Fluid forces are enabled for the viscosity, but vanish without it
+        self.assertTrue(with_viscosity(0.0).enable_fluid)
+        # (up to the float rounding of the different compiled programs)
+        np.testing.assert_allclose(
+            rollout(with_viscosity(0.0)), rollout(base_sys), atol=1e-2
+        )
+        self.assertGreater(
+            np.abs(rollout(with_viscosity(0.0)) - rollout(with_viscosity(0.5))).max(),
+            0.5,
+        )
+
+    def test_batched_contexts(self):
+        import numpy as np
+
+        from carl.envs.brax import CARLBraxAnt
+        from carl.envs.brax.brax_system import stack_system_params
+
+        contexts = {
+            i: {**CARLBraxAnt.get_default_context(), "gravity": g}
+            for i, g in enumerate([-9.8, -1.0])
+        }
+        env = CARLBraxAnt(batch_size=2, contexts=contexts)
+        obs, info = env.reset()
+        self.assertEqual(obs["obs"].shape[0], 2)
+        np.testing.assert_array_equal(obs["context"]["gravity"], [-9.8, -1.0])
+        np.testing.assert_array_equal(info["context_id"], [0, 1])
+
+        action = np.zeros(env.action_space.shape, dtype=np.float32)
+        for _ in range(20):
+            obs, _, _, _, info = env.step(action)
+        # Both envs are simulated in one step, each with its own gravity
+        height = np.asarray(env.env.unwrapped._state.pipeline_state.x.pos[:, 0, 2])
+        self.assertGreater(height[1], height[0])
+        np.testing.assert_array_equal(info["context_id"], [0, 1])
+
+        with self.assertRaises(ValueError):
+            stack_system_params(
+                [{"gravity": -9.8}, {"friction": 1.0}], env.env.unwrapped.base_sys
+            )
+
+    def test_output_backends(self):
+        import jax
+        import numpy as np
+
+        from carl.envs.brax import CARLBraxAnt
+
+        env = CARLBraxAnt(obs_context_as_dict=False, output_backend="numpy")
+        obs, _ = env.reset()
+        self.assertIsInstance(obs["obs"], np.ndarray)
+        self.assertIsInstance(obs["context"], np.ndarray)
+        # A view of the device array, not a copy
+        self.assertFalse(obs["obs"].flags.writeable)
+        action = np.zeros(env.action_space.shape, dtype=np.float32)
+        obs, reward, terminated, _, _ = env.step(action)
+        self.assertIsInstance(obs["obs"], np.ndarray)
+        self.assertIsInstance(reward, np.ndarray)
+        self.assertIsInstance(terminated, np.ndarray)
+        context = env.context
+        np.testing.assert_allclose(
+            obs["context"], [context[k] for k in env.obs_context_features], rtol=1e-6
+        )
+
+        env = CARLBraxAnt(obs_context_as_dict=False, batch_size=2)
+        obs, _ = env.reset()
+        self.assertIsInstance(obs["obs"], jax.Array)
+        self.assertIsInstance(obs["context"], jax.Array)
+        self.assertEqual(obs["context"].shape, (2, len(env.obs_context_features)))
+
+        with self.assertRaises(ValueError):
+            CARLBraxAnt(output_backend="tensorflow")
+
+    @unittest.skipUnless(iutil.find_spec("torch"), "torch is not installed")
+    def test_torch_dlpack_backend(self):
+        import torch
+
+        from carl.envs.brax import CARLBraxAnt
+
+        env = CARLBraxAnt(obs_context_as_dict=False, output_backend="torch-dlpack")
+        obs, _ = env.reset()
+        self.assertIsInstance(obs["obs"], torch.Tensor)
+        self.assertIsInstance(obs["context"], torch.Tensor)
+        action = torch.zeros(env.action_space.shape)
+        obs, reward, _, _, _ = env.step(action)
+        self.assertIsInstance(reward, torch.Tensor)
+
 
 if __name__ == "__main__":
     TestBraxEnvs().test_envs()
@@ -0,0 +1,149 @@
+import unittest
+
+import numpy as np
+
+from carl.context.context_space import (
+    CategoricalContextFeature,
+    ContextSpace,
+    UniformFloatContextFeature,
+)
+from carl.context.context_table import ContextTable
+from carl.envs.gymnasium.classic_control.carl_pendulum import CARLPendulum
+from carl.utils.cache import (
+    ContextInterner,
+    LRUCache,
+    context_hash,
+    estimate_nbytes,
+    quantize,
+)
+
+
+class TestContextHash(unittest.TestCase):
+    def test_canonical(self):
+        a = {"g": 9.8, "ids": [1, 2], "m": np.float64(1.0), "n": 2}
+        b = {"n": 2.0, "m": 1.0, "ids": (1, 2), "g": 9.8}
+        self.assertEqual(context_hash(a), context_hash(b))
+        self.assertIsInstance(context_hash(a), int)
+        self.assertLess(context_hash(a), 2**64)
+        self.assertNotEqual(context_hash(a), context_hash({**a, "g": 9.81}))
+        self.assertNotEqual(context_hash({"g": "1"}), context_hash({"g": 1}))
+        self.assertEqual(
+            context_hash({"x": np.array([0.0, -0.0])}),
+            context_hash({"x": np.array([0.0, 0.0], dtype=np.float32)}),
+        )
+        # Stable across processes
+        self.assertEqual(context_hash({"g": 9.8}), 0x2AF97DBA1668CBBA)
+        with self.assertRaises(TypeError):
+            context_hash({"f": object()})
+
+    def test_env(self):
+        context = {"g": 9.8}
+        self.assertNotEqual(
+            context_hash(context), context_hash(context, env=CARLPendulum)
+        )
+        self.assertEqual(
+            context_hash(context, env=CARLPendulum),
+            context_hash(
+                context,
+                env="carl.envs.gymnasium.classic_control.carl_pendulum.CARLPendulum",
+            ),
+        )
+
+    def test_precision(self):
+        self.assertEqual(quantize(9.80665, 3), 9.81)
+        np.testing.assert_array_equal(
+            quantize(np.array([0.0012345, -123456.0, 0.0, np.inf]), 2),
+            [0.0012, -120000.0, 0.0, np.inf],
+        )
+        a, b = {"g": 9.80001}, {"g": 9.8}
+        self.assertNotEqual(context_hash(a), context_hash(b))
+        self.assertEqual(context_hash(a, precision=4), context_hash(b, precision=4))
+
+    def test_context_space(self):
+        context_space = ContextSpace(
+            {
+                "g": UniformFloatContextFeature(
+                    "g", lower=0, upper=20, default_value=9.8
+                ),
+                "c": CategoricalContextFeature(
+                    "c", choices=["a", "b"], default_value="a"
+                ),
+            }
+        )
+        full = {"g": 9.8, "c": "a"}
+        self.assertEqual(
+            context_hash({"c": "a"}, context_space=context_space),
+            context_hash(full, context_space=context_space),
+        )
+        self.assertNotEqual(
+            context_hash({"c": "b"}, context_space=context_space),
+            context_hash(full, context_space=context_space),
+        )
+
+
+class TestContextInterner(unittest.TestCase):
+    def test_dedup(self):
+        contexts = {
+            0: {"g": 9.8, "l": 1.0},
+            1: {"l": 1.0, "g": 9.8},
+            2: {"g": 9.81, "l": 1.0},
+            3: {"g": np.float32(9.8), "l": 1},
+        }
+        interner = ContextInterner(precision=3)
+        unique = interner.dedup(contexts)
+        self.assertEqual(len(unique), 2)
+        self.assertEqual(len(interner), 2)
+        self.assertListEqual(list(unique.values()), [contexts[0], contexts[2]])
+        context_id = interner.intern({"g": 9.8, "l": 1.0})
+        self.assertIn(context_id, interner)
+        self.assertIs(interner[context_id], contexts[0])
+        self.assertEqual(context_id, interner.hash(contexts[1]))
+
+    def test_context_table(self):
+        table = ContextTable({"g": [1.0, 2.0, 1.0], "c": ["x", "y", "x"]})
+        unique = ContextInterner(env=CARLPendulum).dedup(table)
+        self.assertEqual(len(unique), 2)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_max_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)  # evicts "b", the least recently used
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_get_or_build(self):
+        cache = LRUCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return object()
+
+        first = cache.get_or_build("k", build)
+        self.assertIs(cache.get_or_build("k", build), first)
+        self.assertEqual(len(calls), 1)
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_entries=None, max_bytes=2000)
+        cache.put("a", np.zeros(100))  # 800 bytes
+        cache.put("b", np.zeros(100))
+        self.assertEqual(cache.nbytes, 1600)
+        cache.put("c", np.zeros(100))
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("a", cache)
+        cache.put("big", np.zeros(1000))  # larger than the cache
+        self.assertNotIn("big", cache)
+        self.assertEqual(cache.pop("b").shape, (100,))
+        self.assertEqual(cache.nbytes, 800)
+        cache.clear()
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+
+    def test_estimate_nbytes(self):
+        self.assertEqual(estimate_nbytes({"a": np.zeros(10), "b": [np.zeros(5)]}), 120)
@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from carl.context.context_index import ContextIndex
+from carl.context.context_space import (
+    CategoricalContextFeature,
+    ContextSpace,
+    UniformFloatContextFeature,
+)
+from carl.context.context_table import ContextTable
+
+
+class TestContextIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.context_space = ContextSpace(
+            {
+                "g": UniformFloatContextFeature(
+                    "g", lower=0, upper=100, default_value=50
+                ),
+                "l": UniformFloatContextFeature(
+                    "l", lower=0, upper=1, default_value=0.5
+                ),
+                "m": UniformFloatContextFeature(
+                    "m", lower=-np.inf, upper=np.inf, default_value=1
+                ),
+                "c": CategoricalContextFeature(
+                    "c", choices=["a", "b"], default_value="a"
+                ),
+            }
+        )
+        rng = np.random.default_rng(0)
+        self.table = ContextTable(
+            {
+                "g": rng.uniform(0, 100, 2000),
+                "l": rng.uniform(0, 1, 2000),
+                "m": rng.uniform(-5, 5, 2000),
+            },
+            keys=np.arange(2000) * 10,
+        )
+        self.index = ContextIndex(self.table, self.context_space)
+        return super().setUp()
+
+    def brute_force(self, context: dict) -> np.ndarray:
+        values = self.context_space.encode_contexts(self.table)
+        query = self.context_space.encode_context(context)
+        scale = np.array([100.0, 1.0, np.ptp(self.table.columns["m"]), 1.0])
+        distances = np.linalg.norm((values - query) / scale, axis=1)
+        return distances
+
+    def test_normalization(self):
+        # Bounds of the context space, else the range of the context set
+        self.assertEqual(self.index.offset[0], 0)
+        self.assertEqual(self.index.scale[0], 100)
+        self.assertAlmostEqual(self.index.offset[2], self.table.columns["m"].min())
+        self.assertAlmostEqual(self.index.scale[2], np.ptp(self.table.columns["m"]))
+        np.testing.assert_allclose(
+            self.index.encode({"g": 25.0, "l": 0.2})[:2], [0.25, 0.2]
+        )
+
+    def test_query(self):
+        context = {"g": 30.0, "l": 0.2, "m": 1.0}
+        distances, keys = self.index.query(context, k=5)
+        self.assertEqual(distances.shape, (5,))
+        self.assertTrue(np.all(np.diff(distances) >= 0))
+
+        brute_force = self.brute_force(context)
+        nearest = np.argsort(brute_force)[:5]
+        np.testing.assert_array_equal(keys, self.table.keys()[nearest])
+
+        distances, keys = self.index.query(
+            {"x": context, "y": {"g": 90.0, "l": 0.9, "m": -4.0}}, k=1
+        )
+        self.assertEqual(keys.shape, (2, 1))
+        self.assertEqual(keys[0, 0], self.table.keys()[nearest[0]])
+
+        _, keys = self.index.query(context, k=2, distance_upper_bound=1e-9)
+        self.assertListEqual(list(keys), [None, None])
+
+    def test_query_radius(self):
+        context = {"g": 60.0, "l": 0.6, "m": 0.0}
+        keys = self.index.query_radius(context, r=0.1)
+        brute_force = self.brute_force(context)
+        expected = self.table.keys()[brute_force <= 0.1]
+        self.assertGreater(len(expected), 0)
+        self.assertSetEqual(set(keys.tolist()), set(expected.tolist()))
+
+        keys = self.index.query_radius([context, context], r=0.1)
+        self.assertEqual(len(keys), 2)
+
+    def test_subset_of_features(self):
+        index = ContextIndex(self.table, self.context_space, context_keys=["g"])
+        distances, keys = index.query({"g": 42.0, "l": 0.0}, k=1)
+        g = self.table[keys[0]]["g"]
+        self.assertAlmostEqual(distances[0], abs(g - 42.0) / 100)
+        self.assertAlmostEqual(index.nearest_distance({"g": 42.0}), distances[0])
+
+    def test_dict_contexts(self):
+        contexts = {"a": {"g": 10.0}, "b": {"g": 20.0}, "c": {"g": 90.0}}
+        index = ContextIndex(contexts, self.context_space)
+        _, keys = index.query({"g": 80.0}, k=1)
+        self.assertEqual(keys[0], "c")
+        with self.assertRaises(ValueError):
+            ContextIndex({}, self.context_space)
+
+
+if __name__ == "__main__":
+    unittest.main()
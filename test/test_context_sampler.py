@@ -1,9 +1,13 @@
 import unittest
 
+import numpy as np
+
 from carl.context.context_space import (
+    CategoricalContextFeature,
     ContextSpace,
     NormalFloatContextFeature,
     UniformFloatContextFeature,
+    UniformIntegerContextFeature,
 )
 from carl.context.sampler import ContextSampler
 
@@ -61,6 +65,105 @@ class TestContextSampler(unittest.TestCase):
         self.assertEqual(len(contexts), 1)
         self.assertEqual(contexts[0]["gravity"], 9.8)
 
+    def test_seed_stream(self):
+        # Pinned values of the numpy Generator stream, changes break the
+        # reproducibility of seeded experiments
+        sampler = ContextSampler(
+            [UniformFloatContextFeature("gravity", lower=1, upper=10)],
+            self.cspace,
+            seed=0,
+        )
+        contexts = sampler.sample_contexts(n_contexts=3)
+        np.testing.assert_allclose(
+            [context["gravity"] for context in contexts.values()],
+            [6.732655185893089, 3.4280804238748326, 1.368761715425752],
+        )
+
+    def test_sample_context_table(self):
+        table = self.sampler.sample_context_table(n_contexts=3)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table[2]["gravity"], 9.8)
+
+    def test_sample_context_array(self):
+        context_space = ContextSpace(
+            {
+                "gravity": UniformFloatContextFeature(
+                    "gravity", lower=1, upper=10, default_value=9.8
+                ),
+                "n_legs": UniformIntegerContextFeature(
+                    "n_legs", lower=1, upper=8, default_value=4
+                ),
+                "color": CategoricalContextFeature(
+                    "color", choices=["red", "green", "blue"], default_value="red"
+                ),
+                "mass": UniformFloatContextFeature(
+                    "mass", lower=0.1, upper=10, default_value=1.0
+                ),
+            }
+        )
+        distributions = [
+            UniformFloatContextFeature("gravity", lower=2, upper=5),
+            UniformIntegerContextFeature("n_legs", lower=2, upper=3),
+            CategoricalContextFeature("color", choices=["blue", "green"]),
+        ]
+        sampler = ContextSampler(distributions, context_space, seed=1)
+        values = sampler.sample_context_array(1000)
+        self.assertEqual(values.shape, (1000, 4))
+        self.assertTrue(np.all((values[:, 0] >= 2) & (values[:, 0] <= 5)))
+        self.assertEqual(set(values[:, 1]), {2.0, 3.0})
+        # Choice indices of the context space, not of the distribution
+        self.assertEqual(set(values[:, 2]), {1.0, 2.0})
+        self.assertTrue(np.all(values[:, 3] == 1.0))
+
+        # Reproducible from the seed
+        other = ContextSampler(distributions, context_space, seed=1)
+        np.testing.assert_array_equal(other.sample_context_array(1000), values)
+
+        table = ContextSampler(
+            distributions, context_space, seed=1
+        ).sample_context_table(1000)
+        self.assertEqual(
+            table.columns["color"][0], context_space.decode_context(values[0])["color"]
+        )
+        self.assertEqual(table.columns["n_legs"].dtype, np.int64)
+
+        contexts = ContextSampler(distributions, context_space, seed=1).sample_contexts(
+            1000
+        )
+        self.assertEqual(contexts[0], context_space.decode_context(values[0]))
+
+    def test_sample_quasi_random(self):
+        context_space = ContextSpace(
+            {
+                "gravity": UniformFloatContextFeature(
+                    "gravity", lower=1, upper=10, default_value=9.8
+                ),
+                "color": CategoricalContextFeature(
+                    "color", choices=["red", "green", "blue"], default_value="red"
+                ),
+            }
+        )
+        distributions = [
+            UniformFloatContextFeature("gravity", lower=2, upper=4, log=True),
+            CategoricalContextFeature("color", choices=["blue", "green"]),
+        ]
+        sampler = ContextSampler(distributions, context_space, seed=0)
+        table = sampler.sample_context_table(32, method="sobol")
+        gravity = table.columns["gravity"]
+        self.assertTrue(np.all((gravity >= 2) & (gravity <= 4)))
+        self.assertEqual(np.sum(gravity < np.sqrt(8)), 16)
+        colors = list(table.columns["color"])
+        self.assertEqual(colors.count("blue"), 16)
+        self.assertEqual(colors.count("green"), 16)
+
+    def test_unknown_context_feature(self):
+        with self.assertRaises(ValueError):
+            ContextSampler(
+                [UniformFloatContextFeature("wind", lower=0, upper=1)],
+                self.cspace,
+                seed=0,
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
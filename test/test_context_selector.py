@@ -2,6 +2,14 @@ from typing import Any, Dict
 
 import unittest
 
+import numpy as np
+
+from carl.context.selection import (
+    PrioritizedSelector,
+    RandomSelector,
+    RoundRobinSelector,
+    StaticSelector,
+)
 from carl.envs.gymnasium.classic_control.carl_pendulum import CARLPendulum
 from carl.utils.types import Context
 
@@ -58,3 +66,117 @@ class TestContextSelection(unittest.TestCase):
         with self.assertRaises(ValueError):
             contexts = self.generate_contexts()
             _ = CARLPendulum(contexts=contexts, context_selector="bork")
+
+    def test_random_selector_seed(self):
+        contexts = {i: {"gravity": float(i)} for i in range(100)}
+        a = RandomSelector(contexts=contexts, seed=0)
+        b = RandomSelector(contexts=contexts, seed=0)
+        ids = [a.select()["gravity"] for _ in range(20)]
+        self.assertListEqual(ids, [b.select()["gravity"] for _ in range(20)])
+        self.assertGreater(len(set(ids)), 1)
+        a.seed(1)
+        b.seed(1)
+        np.testing.assert_array_equal(a.select_batch(10), b.select_batch(10))
+
+    def test_global_random_state_untouched(self):
+        contexts = {i: {"gravity": float(i)} for i in range(100)}
+        np.random.seed(0)
+        expected = np.random.random()
+        np.random.seed(0)
+        RandomSelector(contexts=contexts).select_batch(10)
+        self.assertEqual(np.random.random(), expected)
+
+    def test_env_reset_seed(self):
+        contexts = {i: {"g": float(i)} for i in range(100)}
+        selections = []
+        for _ in range(2):
+            env = CARLPendulum(contexts=contexts, context_selector=RandomSelector)
+            env.reset(seed=3)
+            ids = [env.context_id]
+            for _ in range(5):
+                env.reset()
+                ids.append(env.context_id)
+            selections.append(ids)
+        self.assertListEqual(selections[0], selections[1])
+        self.assertGreater(len(set(selections[0])), 1)
+
+    def test_select_batch(self):
+        contexts = {k: {"gravity": float(i)} for i, k in enumerate("abcde")}
+
+        selector = RoundRobinSelector(contexts=contexts)
+        np.testing.assert_array_equal(selector.select_batch(7), [0, 1, 2, 3, 4, 0, 1])
+        self.assertEqual(selector.n_calls, 7)
+        self.assertEqual(selector.context_id, 1)
+        self.assertEqual(selector.select()["gravity"], 2.0)
+
+        selector = RandomSelector(contexts=contexts, seed=0)
+        context_ids = selector.select_batch(1000)
+        self.assertEqual(context_ids.dtype, np.int64)
+        self.assertSetEqual(set(context_ids.tolist()), set(range(5)))
+        self.assertEqual(selector.context_id, context_ids[-1])
+
+        selector = StaticSelector(contexts=contexts)
+        np.testing.assert_array_equal(selector.select_batch(3), [0, 0, 0])
+
+
+class TestPrioritizedSelector(unittest.TestCase):
+    def setUp(self) -> None:
+        self.contexts = {k: {"gravity": float(i)} for i, k in enumerate("abcd")}
+        return super().setUp()
+
+    def test_priorities(self):
+        selector = PrioritizedSelector(self.contexts, seed=0, min_priority=0.0)
+        np.testing.assert_allclose(selector.probabilities, 0.25)
+        selector.update_priorities([0, 1, 2, 3], [1.0, 0.0, 3.0, 0.0])
+        np.testing.assert_allclose(selector.probabilities, [0.25, 0, 0.75, 0])
+        context_ids = selector.select_batch(4000)
+        self.assertSetEqual(set(context_ids.tolist()), {0, 2})
+        self.assertAlmostEqual(np.mean(context_ids == 2), 0.75, delta=0.03)
+        self.assertIn(selector.select()["gravity"], [0.0, 2.0])
+        with self.assertRaises(ValueError):
+            selector.update_priorities([0], [-1.0])
+
+    def test_temperature(self):
+        selector = PrioritizedSelector(self.contexts, temperature=0.5, min_priority=0.0)
+        selector.update_priorities([0, 1], [1.0, 2.0])
+        np.testing.assert_allclose(selector.probabilities, [1 / 7, 4 / 7, 1 / 7, 1 / 7])
+        with self.assertRaises(ValueError):
+            PrioritizedSelector(self.contexts, temperature=0.0)
+
+    def test_staleness_decay(self):
+        selector = PrioritizedSelector(
+            self.contexts, staleness_decay=0.5, min_priority=0.0
+        )
+        selector.update_priorities([0], [1.0])
+        selector.update_priorities([1], [1.0])
+        # Context 0 is one update stale, contexts 2 and 3 two updates
+        np.testing.assert_allclose(
+            selector.probabilities, np.array([0.5, 1.0, 0.25, 0.25]) / 2.0
+        )
+        # Rescaling the weights does not change the probabilities
+        selector._MAX_LOG_SCALE = 1.0
+        selector.update_priorities([2], [1.0])
+        np.testing.assert_allclose(
+            selector.probabilities, np.array([0.25, 0.5, 1.0, 0.125]) / 1.875
+        )
+        with self.assertRaises(ValueError):
+            PrioritizedSelector(self.contexts, staleness_decay=1.0)
+
+    def test_long_staleness(self):
+        selector = PrioritizedSelector(self.contexts, seed=0, staleness_decay=0.5)
+        for _ in range(5000):
+            selector.update_priorities([0], [1.0])
+        # Weights are rescaled many times, but stale contexts stay selectable
+        self.assertTrue(np.all(selector.tree.weights > 0))
+        self.assertTrue(np.all(selector.probabilities > 0))
+        self.assertEqual(set(selector.select_batch(100).tolist()), {0})
+
+    def test_env_feedback(self):
+        env = CARLPendulum(
+            contexts=self.contexts,
+            context_selector=PrioritizedSelector,
+            context_selector_kwargs={"seed": 0},
+        )
+        _, info = env.reset()
+        env.context_selector.update_priorities([info["context_id"]], [0.0])
+        self.assertEqual(env.context_selector.n_updates, 1)
@@ -1,13 +1,20 @@
+import copy
+import pickle
 import unittest
+from unittest import mock
 
 import gymnasium
 import numpy as np
 
 from carl.context.context_space import (
+    CategoricalContextFeature,
     ContextSpace,
+    NormalFloatContextFeature,
     UniformFloatContextFeature,
     UniformIntegerContextFeature,
 )
+from carl.context.context_table import ContextTable
+from carl.context.sampler import ContextSampler
 
 context_space_dict = {
     "gravity": UniformFloatContextFeature(
@@ -108,6 +115,334 @@ class TestContextSpace(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.context_space.sample_contexts(["false_feature"], size=0)
 
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.context_space.context_space = {}
+        with self.assertRaises(TypeError):
+            self.context_space.context_space["gravity"] = None
+        with self.assertRaises(TypeError):
+            self.context_space.default_context["gravity"] = 0.0
+        with self.assertRaises(ValueError):
+            self.context_space.lower_bounds[0] = 0.0
+
+        default_context = self.context_space.get_default_context()
+        default_context["gravity"] = 0.0
+        self.assertEqual(self.context_space.default_context["gravity"], 9.8)
+
+    def test_pickle(self):
+        context_space = pickle.loads(pickle.dumps(self.context_space))
+        self.assertDictEqual(
+            dict(context_space.context_space), dict(self.context_space.context_space)
+        )
+        np.testing.assert_array_equal(
+            context_space.default_vector, self.context_space.default_vector
+        )
+        with self.assertRaises(AttributeError):
+            context_space.context_space = {}
+        self.assertDictEqual(
+            dict(copy.deepcopy(self.context_space).default_context),
+            dict(self.context_space.default_context),
+        )
+
+        # Samplers hold a context space, e.g. to send them to worker processes
+        sampler = ContextSampler(
+            context_distributions=[
+                NormalFloatContextFeature("gravity", mu=9.8, sigma=1)
+            ],
+            context_space=self.context_space,
+            seed=0,
+        )
+        sampler_copy = pickle.loads(pickle.dumps(sampler))
+        self.assertDictEqual(
+            sampler_copy.sample_contexts(n_contexts=3),
+            sampler.sample_contexts(n_contexts=3),
+        )
+
+    def test_precomputed_attributes(self):
+        names = self.context_space.context_feature_names
+        self.assertListEqual(list(self.context_space.feature_index), names)
+        self.assertEqual(self.context_space.feature_index["length"], 3)
+        np.testing.assert_array_equal(
+            self.context_space.lower_bounds, [0.1, 0.1, 0.01, 0.05, 1, 0.002]
+        )
+        np.testing.assert_array_equal(
+            self.context_space.upper_bounds, [np.inf, 10, 1, 5, 100, 0.2]
+        )
+
+
+class TestContextSpaceBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.context_space = ContextSpace(
+            {
+                "gravity": UniformFloatContextFeature(
+                    "gravity", lower=1, upper=20, default_value=9.8
+                ),
+                "mass": UniformFloatContextFeature(
+                    "mass", lower=0.1, upper=10, default_value=1.0, log=True
+                ),
+                "n_links": UniformIntegerContextFeature(
+                    "n_links", lower=1, upper=5, default_value=2
+                ),
+                "noise": NormalFloatContextFeature(
+                    "noise", mu=0, sigma=1, lower=-1, upper=1, default_value=0
+                ),
+                "level": CategoricalContextFeature(
+                    "level", choices=["a", "b", "c"], default_value="b"
+                ),
+            }
+        )
+        return super().setUp()
+
+    def test_encode_decode(self):
+        np.testing.assert_array_equal(
+            self.context_space.default_vector, [9.8, 1.0, 2, 0, 1]
+        )
+        context = {"gravity": 3.0, "level": "c"}
+        vector = self.context_space.encode_context(context)
+        np.testing.assert_array_equal(vector, [3.0, 1.0, 2, 0, 2])
+        self.assertDictEqual(
+            self.context_space.decode_context(vector),
+            self.context_space.insert_defaults(context),
+        )
+        values = self.context_space.encode_contexts({0: context, 1: {}})
+        np.testing.assert_array_equal(values[0], vector)
+        np.testing.assert_array_equal(values[1], self.context_space.default_vector)
+
+    def test_insert_defaults_batch(self):
+        values = np.array([[2.0, "nan"], [3.0, 0]], dtype=float)
+        filled = self.context_space.insert_defaults_batch(values, ["gravity", "level"])
+        np.testing.assert_array_equal(
+            filled, [[2.0, 1.0, 2, 0, 1], [3.0, 1.0, 2, 0, 0]]
+        )
+        with self.assertRaises(ValueError):
+            self.context_space.insert_defaults_batch(values)
+
+    def test_verify_and_clip(self):
+        values = np.array(
+            [
+                [9.8, 1.0, 2, 0, 1],
+                [25.0, 1.0, 2, 0, 1],
+                [9.8, 1.0, 2.5, 0, 1],
+                [9.8, 1.0, 2, 0, 3],
+                [np.nan, 1.0, 2, 0, 1],
+            ]
+        )
+        valid = self.context_space.verify_contexts(values)
+        np.testing.assert_array_equal(valid, [True, False, False, False, False])
+        valid = self.context_space.verify_contexts(values[:, :1], ["gravity"])
+        np.testing.assert_array_equal(valid, [True, False, True, True, False])
+
+        clipped = self.context_space.clip_contexts(values[:4])
+        self.assertTrue(self.context_space.verify_contexts(clipped).all())
+        self.assertEqual(clipped[1, 0], 20.0)
+
+    def test_sample_context_array(self):
+        values = self.context_space.sample_context_array(size=1000, seed=0)
+        self.assertEqual(values.shape, (1000, 5))
+        self.assertTrue(self.context_space.verify_contexts(values).all())
+        np.testing.assert_array_equal(
+            values, self.context_space.sample_context_array(size=1000, seed=0)
+        )
+
+        values = self.context_space.sample_context_array(["level"], size=100, seed=0)
+        np.testing.assert_array_equal(
+            values[:, :4], np.tile(self.context_space.default_vector[:4], (100, 1))
+        )
+        self.assertSetEqual(set(values[:, 4]), {0, 1, 2})
+
+    def test_sample_feature_values_fallback(self):
+        from ConfigSpace.hyperparameters import (
+            BetaFloatHyperparameter,
+            Constant,
+            OrdinalHyperparameter,
+        )
+
+        from carl.context.context_space import sample_feature_values
+
+        rng = np.random.default_rng(0)
+        values = sample_feature_values(
+            OrdinalHyperparameter("o", [1, 2, 5]), size=100, rng=rng
+        )
+        self.assertEqual(values.dtype, np.float64)
+        self.assertSetEqual(set(values), {1.0, 2.0, 5.0})
+        values = sample_feature_values(Constant("c", 3.0), size=4, rng=rng)
+        np.testing.assert_array_equal(values, [3.0] * 4)
+        values = sample_feature_values(
+            BetaFloatHyperparameter("b", alpha=2, beta=3, lower=0, upper=4),
+            size=100,
+            rng=rng,
+        )
+        self.assertEqual(values.shape, (100,))
+        self.assertTrue(np.all((values >= 0) & (values <= 4)))
+
+        with self.assertRaises(TypeError):
+            sample_feature_values(OrdinalHyperparameter("o", ["a", "b"]), 2, rng)
+        with self.assertRaises(TypeError):
+            sample_feature_values(Constant("c", "x"), 2, rng)
+
+    def test_sample_context_array_quasi_random(self):
+        for method in ["sobol", "halton", "lhs"]:
+            values = self.context_space.sample_context_array(
+                size=64, seed=0, method=method
+            )
+            self.assertEqual(values.shape, (64, 5))
+            self.assertTrue(self.context_space.verify_contexts(values).all())
+            np.testing.assert_array_equal(
+                values,
+                self.context_space.sample_context_array(size=64, seed=0, method=method),
+            )
+            self.assertSetEqual(set(values[:, 4]), {0, 1, 2})
+
+        # Stratified: one context per 1/64th of the gravity range
+        values = self.context_space.sample_context_array(
+            ["gravity", "mass"], size=64, seed=0, method="lhs"
+        )
+        bins = np.floor((values[:, 0] - 1) / 19 * 64)
+        self.assertEqual(len(set(bins)), 64)
+        # Log-scale features are spread in log space
+        self.assertEqual(np.sum(values[:, 1] < 1.0), 32)
+        np.testing.assert_array_equal(
+            values[:, 2:], np.tile(self.context_space.default_vector[2:], (64, 1))
+        )
+
+        values = self.context_space.sample_context_array(
+            ["n_links", "level"], size=60, seed=0, method="lhs"
+        )
+        np.testing.assert_array_equal(
+            np.bincount(values[:, 2].astype(int)), [0, 12, 12, 12, 12, 12]
+        )
+
+        with self.assertRaises(ValueError):
+            self.context_space.sample_context_array(size=4, method="grid")
+
+    def test_sample_contexts_only_requested(self):
+        contexts = self.context_space.sample_contexts(["gravity"], size=10, seed=1)
+        for context in contexts:
+            self.assertEqual(context["mass"], 1.0)
+            self.assertEqual(context["level"], "b")
+
+    def test_table_from_array(self):
+        values = self.context_space.sample_context_array(size=10, seed=0)
+        table = ContextTable.from_array(values, self.context_space)
+        self.assertEqual(len(table), 10)
+        self.assertIn(table[0]["level"], ["a", "b", "c"])
+        self.assertIsInstance(table[0]["n_links"], int)
+        np.testing.assert_array_equal(self.context_space.encode_contexts(table), values)
+
+
+class TestContextConstraints(unittest.TestCase):
+    def setUp(self) -> None:
+        self.context_space = ContextSpace(
+            {
+                "low": UniformFloatContextFeature(
+                    "low", lower=0, upper=1, default_value=0.2
+                ),
+                "high": UniformFloatContextFeature(
+                    "high", lower=0, upper=1, default_value=0.8
+                ),
+            },
+            constraints=[lambda c: c["low"] < c["high"]],
+        )
+
+    def test_verify(self):
+        self.assertTrue(self.context_space.verify_context({"low": 0.5}))
+        self.assertFalse(self.context_space.verify_context({"low": 0.9}))
+        values = np.array([[0.1, 0.2], [0.3, 0.2]])
+        np.testing.assert_array_equal(
+            self.context_space.verify_contexts(values), [True, False]
+        )
+        np.testing.assert_array_equal(
+            self.context_space.check_constraints(values), [True, False]
+        )
+
+    def test_sample(self):
+        for method in ["random", "sobol", "lhs"]:
+            values = self.context_space.sample_context_array(
+                size=1000, seed=0, method=method
+            )
+            self.assertEqual(len(values), 1000)
+            self.assertTrue(np.all(values[:, 0] < values[:, 1]))
+        # Only "low" is sampled, so half of the samples are rejected
+        values = self.context_space.sample_context_array(["low"], size=100, seed=0)
+        self.assertTrue(np.all(values[:, 0] < 0.8))
+
+    def test_unsatisfiable(self):
+        context_space = ContextSpace(
+            self.context_space.context_space, constraints=[lambda c: c["low"] > 2]
+        )
+        with self.assertRaises(ValueError):
+            context_space.sample_context_array(size=10, seed=0)
+
+    def test_env(self):
+        from carl.envs.gymnasium.classic_control import CARLMountainCar
+
+        with self.assertRaises(ValueError):
+            CARLMountainCar(
+                contexts={0: {"min_position_start": -0.3, "max_position_start": -0.5}}
+            )
+        sampler = ContextSampler(
+            [
+                UniformFloatContextFeature("min_position_start", lower=-1, upper=0),
+                UniformFloatContextFeature("max_position_start", lower=-1, upper=0),
+            ],
+            CARLMountainCar.get_context_space(),
+            seed=0,
+        )
+        contexts = sampler.sample_contexts(50)
+        for context in contexts.values():
+            self.assertLessEqual(
+                context["min_position_start"], context["max_position_start"]
+            )
+        env = CARLMountainCar(contexts=contexts)
+        env.reset()
+
+    def test_cartpole_initial_state_bounds(self):
+        from carl.envs.gymnasium.classic_control import CARLCartPole
+
+        # Swapped initial state bounds are rejected
+        with self.assertRaises(ValueError):
+            CARLCartPole(
+                contexts={0: {"initial_state_lower": 0.1, "initial_state_upper": -0.1}}
+            )
+        env = CARLCartPole(
+            contexts={0: {"initial_state_lower": 0.05, "initial_state_upper": 0.05}}
+        )
+        state, _ = env.reset()
+        np.testing.assert_allclose(state["obs"], 0.05)
+
+    def test_pickle_env_context_spaces(self):
+        from carl.envs.gymnasium.classic_control import (
+            CARLCartPole,
+            CARLMountainCar,
+            CARLMountainCarContinuous,
+        )
+
+        for env_class in [CARLCartPole, CARLMountainCar, CARLMountainCarContinuous]:
+            context_space = env_class.get_context_space()
+            restored = pickle.loads(pickle.dumps(context_space))
+            self.assertEqual(len(restored.constraints), len(context_space.constraints))
+            self.assertTrue(restored.verify_context(env_class.get_default_context()))
+
+    def test_table_checked_once(self):
+        from carl.envs.gymnasium.classic_control import CARLMountainCar
+
+        table = ContextTable({"min_position_start": np.linspace(-0.6, -0.5, 100)})
+        with mock.patch.object(
+            ContextSpace,
+            "check_constraints",
+            autospec=True,
+            side_effect=ContextSpace.check_constraints,
+        ) as check_constraints:
+            for _ in range(3):
+                CARLMountainCar(contexts=table)
+            self.assertEqual(check_constraints.call_count, 1)
+            self.assertTrue(table.validated_for(CARLMountainCar.get_context_space()))
+            # Other tables are still checked
+            with self.assertRaises(ValueError):
+                CARLMountainCar(
+                    contexts=ContextTable({"min_position_start": np.array([-0.3])})
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,117 @@
+import itertools
+import unittest
+
+import numpy as np
+
+from carl.context.context_space import UniformFloatContextFeature
+from carl.context.context_stream import ContextStream
+from carl.context.sampler import ContextSampler
+from carl.context.selection import StreamSelector, make_context_selector
+from carl.envs.gymnasium.classic_control import CARLCartPole
+
+
+def gravity_stream():
+    for i in itertools.count():
+        yield {"gravity": 1.0 + i}
+
+
+class TestContextStream(unittest.TestCase):
+    def test_window(self):
+        stream = ContextStream(gravity_stream(), window_size=3)
+        self.assertEqual(stream.n_drawn, 1)
+        self.assertEqual(stream.window, {0: {"gravity": 1.0}})
+        for expected_id in range(1, 10):
+            self.assertEqual(stream.draw(), expected_id)
+        self.assertEqual(len(stream), 3)
+        self.assertEqual(list(stream), [7, 8, 9])
+        self.assertEqual(stream[9], {"gravity": 10.0})
+        with self.assertRaises(KeyError):
+            stream[2]
+
+    def test_sources(self):
+        stream = ContextStream(lambda: {"gravity": 2.0})
+        stream.draw()
+        self.assertEqual(stream.window, {0: {"gravity": 2.0}, 1: {"gravity": 2.0}})
+
+        stream = ContextStream([{"gravity": 1.0}, {"gravity": 2.0}])
+        stream.draw()
+        with self.assertRaises(RuntimeError):
+            stream.draw()
+
+        sampler = ContextSampler(
+            [UniformFloatContextFeature("gravity", lower=5, upper=15)],
+            CARLCartPole.get_context_space(),
+            seed=0,
+        )
+        stream = ContextStream(sampler, window_size=4, chunk_size=8)
+        for _ in range(20):
+            stream.draw()
+        self.assertEqual(stream.n_drawn, 21)
+        for context in stream.values():
+            self.assertTrue(5 <= context["gravity"] <= 15)
+            self.assertEqual(context["length"], 0.5)
+
+        with self.assertRaises(ValueError):
+            ContextStream(gravity_stream(), window_size=0)
+
+    def test_selector(self):
+        stream = ContextStream(gravity_stream(), window_size=2)
+        selector = make_context_selector(stream)
+        self.assertIsInstance(selector, StreamSelector)
+        ids = []
+        for _ in range(5):
+            context = selector.select()
+            ids.append(selector.context_id)
+            self.assertEqual(context["gravity"], 1.0 + selector.context_id)
+        self.assertEqual(ids, [0, 1, 2, 3, 4])
+        self.assertEqual(selector.context_key, 4)
+        np.testing.assert_array_equal(selector.context_ids, [3, 4])
+
+        with self.assertRaises(ValueError):
+            StreamSelector({0: {"gravity": 1.0}})
+
+        rngs = [
+            StreamSelector(ContextStream(gravity_stream()), seed=0).rng
+            for _ in range(2)
+        ]
+        self.assertEqual(rngs[0].random(), rngs[1].random())
+
+    def test_env(self):
+        env = CARLCartPole(
+            contexts=ContextStream(gravity_stream(), window_size=4), flatten_obs=True
+        )
+        index = env.obs_context_features.index("gravity")
+        for episode in range(10):
+            obs, _ = env.reset()
+            self.assertEqual(env.context_id, episode)
+            self.assertEqual(env.env.unwrapped.gravity, 1.0 + episode)
+            self.assertEqual(obs[env._n_state + index], 1.0 + episode)
+            # Filled with defaults
+            self.assertEqual(env.context["length"], 0.5)
+        self.assertEqual(list(env.contexts.window), [6, 7, 8, 9])
+
+    def test_constraints(self):
+        from carl.envs.gymnasium.classic_control import CARLMountainCar
+
+        # Every other context has swapped start positions
+        starts = itertools.cycle(
+            [
+                {"min_position_start": -0.3, "max_position_start": -0.5},
+                {"min_position_start": -0.6, "max_position_start": -0.4},
+            ]
+        )
+        env = CARLMountainCar(contexts=ContextStream(starts))
+        for _ in range(5):
+            env.reset()
+            self.assertLessEqual(
+                env.context["min_position_start"], env.context["max_position_start"]
+            )
+        self.assertEqual(env.contexts.n_rejected, 5)
+
+        invalid = {"min_position_start": -0.3, "max_position_start": -0.5}
+        with self.assertRaises(RuntimeError):
+            CARLMountainCar(contexts=ContextStream(itertools.repeat(invalid)))
+
+
+if __name__ == "__main__":
+    unittest.main()
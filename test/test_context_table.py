@@ -0,0 +1,188 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from carl.context.context_space import (
+    CategoricalContextFeature,
+    ContextSpace,
+    UniformFloatContextFeature,
+    UniformIntegerContextFeature,
+)
+from carl.context.context_table import ContextRow, ContextTable
+from carl.context.selection import RandomSelector, RoundRobinSelector
+from carl.envs.gymnasium.classic_control.carl_pendulum import CARLPendulum
+
+CARLPendulum.render_mode = "rgb_array"
+
+
+class TestContextTable(unittest.TestCase):
+    def setUp(self) -> None:
+        self.table = ContextTable(
+            {"g": np.linspace(5, 15, 11), "m": np.ones(11, dtype=np.float32)}
+        )
+        return super().setUp()
+
+    def test_row_access(self):
+        self.assertEqual(len(self.table), 11)
+        self.assertEqual(self.table.keys(), range(11))
+        row = self.table[3]
+        self.assertIsInstance(row, ContextRow)
+        self.assertEqual(row["g"], 8.0)
+        self.assertIsInstance(row["g"], float)
+        self.assertDictEqual(dict(row), {"g": 8.0, "m": 1.0})
+        self.assertIn(10, self.table)
+        self.assertNotIn(11, self.table)
+        with self.assertRaises(KeyError):
+            self.table[11]
+
+    def test_columns_not_copied(self):
+        g = np.arange(4.0)
+        table = ContextTable({"g": g})
+        self.assertIs(table.columns["g"], g)
+
+    def test_keys(self):
+        table = ContextTable({"g": [1.0, 2.0]}, keys=["a", "b"])
+        self.assertEqual(table["b"]["g"], 2.0)
+        self.assertEqual(table.row_index("b"), 1)
+        with self.assertRaises(ValueError):
+            ContextTable({"g": [1.0, 2.0]}, keys=["a", "a"])
+        with self.assertRaises(ValueError):
+            ContextTable({"g": [1.0, 2.0], "m": [1.0]})
+
+    def test_from_to_contexts(self):
+        contexts = {"a": {"g": 1.0, "l": 2.0}, "b": {"g": 3.0, "l": 4.0}}
+        table = ContextTable.from_contexts(contexts)
+        self.assertDictEqual(table.to_contexts(), contexts)
+
+    def test_with_defaults(self):
+        table = self.table.with_defaults(CARLPendulum.get_context_space())
+        self.assertListEqual(
+            table.column_names, CARLPendulum.get_context_space().context_feature_names
+        )
+        self.assertIs(table.columns["g"], self.table.columns["g"])
+        # Default columns do not allocate memory per context
+        self.assertEqual(table.columns["dt"].strides, (0,))
+        self.assertEqual(table[5]["dt"], 0.05)
+
+    def test_take_and_pickle(self):
+        shard = self.table.take([2, 5])
+        self.assertEqual(list(shard.keys()), [2, 5])
+        self.assertEqual(shard[5]["g"], 10.0)
+        keyed = ContextTable({"g": [1.0, 2.0]}, keys=["a", "b"])
+        self.assertEqual(list(keyed.take([1]).keys()), ["b"])
+
+        restored = pickle.loads(pickle.dumps(keyed))
+        self.assertEqual(restored.to_contexts(), keyed.to_contexts())
+
+
+class TestContextTableFile(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "contexts")
+        self.context_space = ContextSpace(
+            {
+                "gravity": UniformFloatContextFeature(
+                    "gravity", lower=1, upper=20, default_value=9.8
+                ),
+                "n_links": UniformIntegerContextFeature(
+                    "n_links", lower=1, upper=5, default_value=2
+                ),
+                "level": CategoricalContextFeature(
+                    "level", choices=["a", "b", "c"], default_value="b"
+                ),
+                "shape": CategoricalContextFeature(
+                    "shape", choices=[1, "two"], default_value=1
+                ),
+            }
+        )
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_save_load(self):
+        table = ContextTable(
+            {
+                "gravity": np.linspace(1, 20, 100),
+                "level": np.array(["a", "c"] * 50, dtype=object),
+                "shape": np.array([1, "two"] * 50, dtype=object),
+            },
+            keys=np.arange(100) * 3,
+        )
+        content_hash = table.save(self.path, self.context_space)
+        loaded = ContextTable.load(self.path, self.context_space, verify=True)
+        self.assertEqual(loaded.content_hash, content_hash)
+        self.assertListEqual(
+            loaded.column_names, self.context_space.context_feature_names
+        )
+        # Columns are memory-mapped, not copied
+        self.assertIsInstance(loaded.columns["gravity"].base, np.memmap)
+        self.assertIsInstance(loaded.columns["level"].base, np.memmap)
+        self.assertEqual(loaded[297], {**table[297], "n_links": 2})
+        self.assertEqual(loaded[3]["shape"], "two")
+        self.assertEqual(loaded[6]["shape"], 1)
+        self.assertIs(loaded.with_defaults(self.context_space), loaded)
+
+        # Same content, same hash
+        self.assertEqual(
+            table.save(os.path.join(self.tmpdir.name, "copy"), self.context_space),
+            content_hash,
+        )
+
+    def test_pickle_by_path(self):
+        table = ContextTable({"gravity": np.linspace(1, 20, 10_000)})
+        table.save(self.path, self.context_space)
+        loaded = ContextTable.load(self.path)
+        self.assertLess(len(pickle.dumps(loaded)), 1000)
+        shard = loaded.take(np.arange(100, 200))
+        self.assertLess(len(pickle.dumps(shard)), 1000)
+        restored = pickle.loads(pickle.dumps(shard))
+        self.assertEqual(list(restored.keys()), list(range(100, 200)))
+        self.assertEqual(restored[150]["gravity"], table[150]["gravity"])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            ContextTable({"wind": [1.0]}).save(self.path, self.context_space)
+        ContextTable({"gravity": [1.0]}).save(self.path, self.context_space)
+        with self.assertRaises(ValueError):
+            ContextTable.load(self.path, CARLPendulum.get_context_space())
+        np.save(os.path.join(self.path, "column_0.npy"), np.array([2.0]))
+        with self.assertRaises(ValueError):
+            ContextTable.load(self.path, verify=True)
+
+    def test_env_from_path(self):
+        context_space = CARLPendulum.get_context_space()
+        ContextTable({"g": np.linspace(5, 15, 1000)}).save(self.path, context_space)
+        env = CARLPendulum(contexts=self.path)
+        self.assertIsInstance(env.contexts, ContextTable)
+        env.reset()
+        env.reset()
+        self.assertEqual(env.context_id, 1)
+        self.assertEqual(env.unwrapped.g, np.linspace(5, 15, 1000)[1])
+
+
+class TestContextTableEnv(unittest.TestCase):
+    def test_env(self):
+        table = ContextTable({"g": np.linspace(5, 15, 1000)})
+        env = CARLPendulum(contexts=table)
+        self.assertIsInstance(env.contexts, ContextTable)
+        self.assertIsInstance(env.context_selector, RoundRobinSelector)
+        self.assertIs(env.context_selector.contexts_keys, env.contexts.keys())
+        for i in range(3):
+            obs, info = env.reset()
+            self.assertEqual(info["context_id"], i)
+            self.assertEqual(env.context["g"], table.columns["g"][i])
+            self.assertEqual(env.unwrapped.g, table.columns["g"][i])
+            self.assertEqual(len(obs["context"]), len(env.obs_context_features))
+
+    def test_env_random_selector(self):
+        table = ContextTable({"g": np.linspace(5, 15, 1000)}, keys=np.arange(1000) * 2)
+        env = CARLPendulum(contexts=table, context_selector=RandomSelector)
+        env.reset()
+        self.assertEqual(env.context["g"], table.columns["g"][env.context_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
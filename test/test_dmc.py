@@ -1,5 +1,7 @@
 import pytest
 
+from carl.context.context_space import UniformFloatContextFeature
+from carl.context.sampler import ContextSampler
 from carl.envs.dmc import (
     CARLDmcFingerEnv,
     CARLDmcFishEnv,
@@ -75,6 +77,18 @@ class TestFinger:
                 raise_error=True,
             )
 
+    def test_context_space_constraints(self):
+        import pickle
+
+        context_space = CARLDmcFingerEnv.get_context_space()
+        assert context_space.verify_context({"spinner_length": 0.18})
+        assert not context_space.verify_context({"spinner_length": 0.81})
+        assert not context_space.verify_context(
+            {"limb_length_0": 0.1, "limb_length_1": 0.1, "spinner_length": 0.1}
+        )
+        restored = pickle.loads(pickle.dumps(context_space))
+        assert not restored.verify_context({"spinner_length": 0.81})
+
     def test_finger_tasks(self):
         tasks = [spin_context, turn_hard_context, turn_easy_context]
         contexts = [{}, {"spinner_length": 0.2}]
@@ -156,11 +170,14 @@ class TestPointmass:
             _ = CARLDmcPointMassEnv(
                 contexts={
                     0: {
-                        "starting_x": 0.3,
+                        "starting_x": 0.1,
                     }
                 },
                 task=task,
             )
+            # Outside of the grid, rejected before the model is built
+            with pytest.raises(ValueError):
+                CARLDmcPointMassEnv(contexts={0: {"starting_x": 0.3}}, task=task)
 
     def test_constraints(self):
         # Is starting point inside grid?
@@ -183,3 +200,32 @@ class TestPointmass:
                 target_y=0.3,
                 area_size=0.6,
             )
+
+    def test_sample_valid_contexts(self):
+        context_space = CARLDmcPointMassEnv.get_context_space()
+        assert not context_space.verify_context({"starting_x": 0.3})
+        assert context_space.verify_context({"starting_x": 0.1})
+
+        sampler = ContextSampler(
+            [UniformFloatContextFeature("starting_x", lower=-0.3, upper=0.3)],
+            context_space,
+            seed=0,
+        )
+        contexts = sampler.sample_contexts(100)
+        assert all(abs(c["starting_x"]) < 0.15 for c in contexts.values())
+        CARLDmcPointMassEnv(contexts=contexts).reset()
+
+
+class TestSimulatorCache:
+    def test_reuse_env(self):
+        contexts = {0: {"gravity": -9.81}, 1: {"gravity": -5.0}}
+        env = CARLDmcWalkerEnv(contexts=contexts)
+        envs = []
+        for _ in range(4):
+            env.reset()
+            envs.append(env.env.env)
+        assert envs[0] is envs[2]
+        assert envs[1] is envs[3]
+        assert envs[0] is not envs[1]
+        assert len(env.simulator_cache) == 2
+        assert env.simulator_cache.hits == 2
@@ -168,6 +168,51 @@ class TestGoalWrapper(unittest.TestCase):
                 _, wrapped_reward, _, _, _ = env.step(action)
                 assert wrapped_reward >= 0, "Negative reward."
 
+    def test_goal_in_brax_state(self):
+        import numpy as np
+
+        from carl.envs.brax.brax_walker_goal_wrapper import STATE_INDICES
+
+        default = CARLBraxAnt.get_default_goal_context()
+        contexts = {
+            0: {**default, "target_distance": 10.0, "target_direction": 1},
+            1: {**default, "target_distance": 12.0, "target_direction": 2},
+        }
+        env = CARLBraxAnt(contexts=contexts)
+        env.reset()
+        np.testing.assert_allclose(env.goal_position, [0.0, 10.0], atol=1e-6)
+        position = np.zeros(2)
+        for _ in range(5):
+            state, reward, _, _, info = env.step(env.action_space.sample())
+            velocity = np.asarray(state["obs"])[STATE_INDICES["ant"]]
+            previous = np.linalg.norm(env.goal_position - position)
+            position = position + velocity * env.dt
+            current = np.linalg.norm(env.goal_position - position)
+            np.testing.assert_allclose(env.position, position, atol=1e-5)
+            self.assertAlmostEqual(
+                float(reward), max(0.0, previous - current), places=5
+            )
+            self.assertEqual(float(info["success"]), 0.0)
+
+    def test_batched_goals(self):
+        import numpy as np
+
+        default = CARLBraxAnt.get_default_goal_context()
+        contexts = {
+            0: {**default, "target_distance": 10.0, "target_direction": 1},
+            1: {**default, "target_distance": 12.0, "target_direction": 2},
+        }
+        env = CARLBraxAnt(contexts=contexts, batch_size=2)
+        env.reset()
+        np.testing.assert_allclose(env.goal_position, [[0, 10], [12, 0]], atol=1e-6)
+        for _ in range(5):
+            _, reward, terminated, _, info = env.step(env.action_space.sample())
+        self.assertEqual(np.shape(reward), (2,))
+        self.assertTrue(np.all(np.asarray(reward) >= 0))
+        np.testing.assert_array_equal(info["success"], [0.0, 0.0])
+        self.assertEqual(np.shape(env.position), (2, 2))
+        self.assertEqual(env.compile_count, 2)
+
 
 class TestLanguageWrapper(unittest.TestCase):
     def test_reset(self) -> None:
@@ -190,7 +235,8 @@ class TestLanguageWrapper(unittest.TestCase):
         assert (
             str(env.context["target_distance"]) in state["obs"]["goal"]
         ), "Distance not in goal."
-        assert "north north east" in state["obs"]["goal"], "Direction not in goal."
+        # First context sampled with seed 0
+        assert "north north west" in state["obs"]["goal"], "Direction not in goal."
         assert info is not None, "No info returned."
 
     def test_step(self):
@@ -213,7 +259,7 @@ class TestLanguageWrapper(unittest.TestCase):
             assert "obs" in state.keys(), "Observation not in state."
             assert "goal" in state["obs"].keys(), "Goal not in observation."
             assert type(state["obs"]["goal"]) is str, "Goal is not a string."
-            assert "north north east" in state["obs"]["goal"], "Direction not in goal."
+            assert "north north west" in state["obs"]["goal"], "Direction not in goal."
             assert (
                 str(env.context["target_distance"]) in state["obs"]["goal"]
             ), "Distance not in goal."
@@ -0,0 +1,50 @@
+import inspect
+import subprocess
+import sys
+import unittest
+
+import carl.envs
+import carl.envs.gymnasium
+
+BACKENDS = ["jax", "brax", "dm_control", "Box2D", "pygame", "ConfigSpace"]
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_carl_does_not_import_backends(self):
+        code = (
+            "import sys\n"
+            "import carl\n"
+            f"print(','.join(m for m in {BACKENDS!r} if m in sys.modules))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        # The import time is dominated by the backends, so none may be imported
+        self.assertEqual(output[-1], "")
+
+    def test_lazy_env_access(self):
+        from carl.envs.gymnasium.classic_control import CARLCartPole
+
+        self.assertIs(carl.envs.CARLCartPole, CARLCartPole)
+        self.assertIs(carl.envs.gymnasium.CARLCartPole, CARLCartPole)
+        self.assertIn("CARLCartPole", dir(carl.envs))
+        members = dict(inspect.getmembers(carl.envs.gymnasium))
+        self.assertIs(members["CARLCartPole"], CARLCartPole)
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            carl.envs.CARLDoesNotExist
+
+    def test_registered_envs(self):
+        import gymnasium
+
+        import carl  # noqa: F401
+
+        self.assertIn("carl/CARLCartPole-v0", gymnasium.envs.registry)
+
+
+if __name__ == "__main__":
+    unittest.main()
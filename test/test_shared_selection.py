@@ -0,0 +1,94 @@
+import multiprocessing as mp
+import unittest
+
+import numpy as np
+
+from carl.context.shared_selection import SharedSchedule, SharedSelector
+
+
+def _select_in_worker(selector: SharedSelector, n: int, queue: mp.Queue) -> None:
+    queue.put(selector.select_batch(n).tolist())
+
+
+class TestSharedSchedule(unittest.TestCase):
+    def test_round_robin(self):
+        schedule = SharedSchedule(5)
+        np.testing.assert_array_equal(schedule.lease(3), [0, 1, 2])
+        np.testing.assert_array_equal(schedule.lease(4), [3, 4, 0, 1])
+        self.assertEqual(schedule.cursor, 7)
+        np.testing.assert_array_equal(schedule.visit_counts, [2, 2, 1, 1, 1])
+
+    def test_random(self):
+        schedule = SharedSchedule(10, schedule="random", seed=0)
+        first_pass = schedule.lease(10)
+        self.assertListEqual(sorted(first_pass.tolist()), list(range(10)))
+        second_pass = np.concatenate([schedule.lease(4), schedule.lease(6)])
+        self.assertListEqual(sorted(second_pass.tolist()), list(range(10)))
+        self.assertFalse(np.array_equal(first_pass, second_pass))
+        schedule.lease(3)
+        counts = schedule.visit_counts
+        self.assertEqual(counts.sum(), 23)
+        self.assertEqual(set(counts.tolist()), {2, 3})
+
+        # The orders only depend on the seed
+        other = SharedSchedule(10, schedule="random", seed=0)
+        np.testing.assert_array_equal(other.lease(10), first_pass)
+
+        # Without a seed, it is drawn from OS entropy, not the global random state
+        np.random.seed(1)
+        expected = np.random.random()
+        np.random.seed(1)
+        first = SharedSchedule(10, schedule="random")
+        self.assertEqual(np.random.random(), expected)
+        self.assertNotEqual(SharedSchedule(10, schedule="random").seed, first.seed)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            SharedSchedule(0)
+        with self.assertRaises(ValueError):
+            SharedSchedule(3, schedule="bork")
+
+
+class TestSharedSelector(unittest.TestCase):
+    def setUp(self) -> None:
+        self.contexts = {f"c{i}": {"gravity": float(i)} for i in range(12)}
+        return super().setUp()
+
+    def test_selectors_share_schedule(self):
+        schedule = SharedSchedule(len(self.contexts))
+        a = SharedSelector(self.contexts, schedule, lease_size=2)
+        b = SharedSelector(self.contexts, schedule, lease_size=2)
+        self.assertEqual(a.select()["gravity"], 0.0)
+        self.assertEqual(b.select()["gravity"], 2.0)
+        self.assertEqual(a.select()["gravity"], 1.0)
+        np.testing.assert_array_equal(b.select_batch(3), [3, 4, 5])
+        self.assertEqual(b.context_key, "c5")
+        np.testing.assert_array_equal(a.select_batch(2), [7, 8])
+        with self.assertRaises(ValueError):
+            SharedSelector({0: {}}, schedule)
+
+    def test_processes(self):
+        ctx = mp.get_context("spawn")
+        schedule = SharedSchedule(
+            len(self.contexts), schedule="random", context="spawn"
+        )
+        selectors = [
+            SharedSelector(self.contexts, schedule, lease_size=1) for _ in range(3)
+        ]
+        queue = ctx.Queue()
+        processes = [
+            ctx.Process(target=_select_in_worker, args=(selector, 4, queue))
+            for selector in selectors
+        ]
+        for process in processes:
+            process.start()
+        context_ids = sum((queue.get(timeout=60) for _ in processes), [])
+        for process in processes:
+            process.join()
+        # Together, the workers cover the context set exactly once
+        self.assertListEqual(sorted(context_ids), list(range(12)))
+        self.assertEqual(schedule.cursor, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
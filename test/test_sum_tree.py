@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from carl.utils.sum_tree import SumTree
+
+
+class TestSumTree(unittest.TestCase):
+    def test_total_and_update(self):
+        for n in [1, 2, 5, 8, 1000]:
+            with self.subTest(n=n):
+                rng = np.random.default_rng(n)
+                weights = rng.uniform(0, 1, n)
+                tree = SumTree(weights)
+                self.assertAlmostEqual(tree.total, weights.sum())
+                indices = rng.integers(n, size=3)
+                weights[indices] = [0.5, 2.0, 3.0]
+                for i in indices:
+                    tree.update([i], weights[i])
+                tree.update(indices[:0], [])
+                self.assertAlmostEqual(tree.total, weights.sum())
+                np.testing.assert_allclose(tree.weights, weights)
+                tree.update(np.arange(n), weights[::-1])
+                self.assertAlmostEqual(tree.total, weights.sum())
+
+    def test_find(self):
+        tree = SumTree(np.array([1.0, 0.0, 2.0, 1.0, 0.5]))
+        np.testing.assert_array_equal(
+            tree.find(np.array([0.0, 0.99, 1.0, 2.99, 3.0, 4.4])), [0, 0, 2, 2, 3, 4]
+        )
+        self.assertEqual(tree.find(1.5), 2)
+
+    def test_find_overshoot(self):
+        # Rounding can push values onto zero weights, which are never returned
+        tree = SumTree(np.array([1.0, 0.0, 2.0, 0.0, 0.0]))
+        np.testing.assert_array_equal(tree.find(np.array([2.99, 3.0, 3.5])), [2, 2, 2])
+        self.assertEqual(tree.find(3.0), 2)
+
+    def test_sample(self):
+        tree = SumTree(np.array([1.0, 0.0, 3.0]))
+        samples = tree.sample(np.random.default_rng(0), size=10000)
+        counts = np.bincount(samples, minlength=3)
+        self.assertEqual(counts[1], 0)
+        self.assertAlmostEqual(counts[2] / counts[0], 3, delta=0.3)
+        tree.update([0, 2], 0.0)
+        with self.assertRaises(ValueError):
+            tree.sample(np.random.default_rng(0))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            SumTree(np.array([]))
+        with self.assertRaises(ValueError):
+            SumTree(np.array([1.0, -1.0]))
+        tree = SumTree(np.ones(3))
+        with self.assertRaises(ValueError):
+            tree.update([0], [np.nan])
+        with self.assertRaises(IndexError):
+            tree.update([3], [1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
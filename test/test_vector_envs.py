@@ -0,0 +1,140 @@
+import unittest
+
+import numpy as np
+
+from carl.context.selection import RandomSelector
+from carl.envs.gymnasium.classic_control import (
+    CARLAcrobot,
+    CARLCartPole,
+    CARLMountainCar,
+    CARLMountainCarContinuous,
+    CARLPendulum,
+)
+from carl.envs.gymnasium.vector import (
+    CARLVectorAcrobot,
+    CARLVectorCartPole,
+    CARLVectorMountainCar,
+    CARLVectorMountainCarContinuous,
+    CARLVectorPendulum,
+)
+
+PAIRS = [
+    (CARLVectorCartPole, CARLCartPole),
+    (CARLVectorPendulum, CARLPendulum),
+    (CARLVectorMountainCar, CARLMountainCar),
+    (CARLVectorMountainCarContinuous, CARLMountainCarContinuous),
+    (CARLVectorAcrobot, CARLAcrobot),
+]
+
+
+class TestVectorEnvs(unittest.TestCase):
+    def test_matches_single_env(self):
+        for vector_cls, single_cls in PAIRS:
+            with self.subTest(env=vector_cls.__name__):
+                venv = vector_cls(num_envs=3, seed=0)
+                venv.reset(seed=0)
+                env = single_cls()
+                env.reset(seed=0)
+                env.env.unwrapped.state = venv.state[0].astype(
+                    env.env.unwrapped.state.dtype
+                )
+                for _ in range(50):
+                    action = venv.action_space.sample()
+                    obs, reward, terminated, truncated, info = venv.step(action)
+                    s_obs, s_reward, s_terminated, _, _ = env.step(action[0])
+                    self.assertEqual(terminated[0], s_terminated)
+                    self.assertAlmostEqual(reward[0], s_reward, places=4)
+                    if terminated[0] or truncated[0]:
+                        obs = info["final_observation"][0]["obs"]
+                        np.testing.assert_allclose(obs, s_obs["obs"], atol=1e-5)
+                        break
+                    np.testing.assert_allclose(obs["obs"][0], s_obs["obs"], atol=1e-5)
+
+    def test_cartpole_masses_match_single_env(self):
+        contexts = {0: {"masscart": 2.0, "masspole": 0.5, "length": 1.0}}
+        venv = CARLVectorCartPole(num_envs=1, contexts=contexts, seed=0)
+        venv.reset(seed=0)
+        env = CARLCartPole(contexts=contexts)
+        env.reset(seed=0)
+        # The single env keeps the derived masses of its defaults
+        self.assertAlmostEqual(env.env.unwrapped.total_mass, 1.1)
+        self.assertAlmostEqual(env.env.unwrapped.polemass_length, 0.05)
+        env.env.unwrapped.state = venv.state[0].copy()
+        for action in [0, 1, 1, 0, 1, 0, 0, 1, 1, 1]:
+            obs, *_ = venv.step(np.array([action]))
+            s_obs, *_ = env.step(action)
+            np.testing.assert_allclose(obs["obs"][0], s_obs["obs"], atol=1e-5)
+
+    def test_per_env_contexts(self):
+        contexts = {0: {"gravity": 9.8}, 1: {"gravity": 20.0}}
+        venv = CARLVectorCartPole(num_envs=4, contexts=contexts, seed=1)
+        obs, info = venv.reset()
+        np.testing.assert_array_equal(info["context_id"], [0, 1, 0, 1])
+        np.testing.assert_array_equal(
+            venv.context_feature("gravity"), [9.8, 20.0, 9.8, 20.0]
+        )
+        gravity_idx = venv.obs_context_features.index("gravity")
+        np.testing.assert_allclose(
+            obs["context"][:, gravity_idx], [9.8, 20.0, 9.8, 20.0], rtol=1e-6
+        )
+
+        # Same state and action, different gravity -> different dynamics
+        venv.state[:] = [0.0, 0.0, 0.1, 0.0]
+        obs, *_ = venv.step(np.zeros(4, dtype=np.int64))
+        np.testing.assert_allclose(obs["obs"][0], obs["obs"][2])
+        self.assertGreater(abs(obs["obs"][1, 3]), abs(obs["obs"][0, 3]))
+
+    def test_seeded_random_selector(self):
+        contexts = {i: {"gravity": 5.0 + i} for i in range(10)}
+        context_ids = []
+        for _ in range(2):
+            venv = CARLVectorCartPole(
+                num_envs=8,
+                contexts=contexts,
+                context_selector=RandomSelector,
+                seed=3,
+            )
+            _, info = venv.reset()
+            context_ids.append(info["context_id"])
+            np.testing.assert_array_equal(
+                venv.context_feature("gravity"), 5.0 + info["context_id"]
+            )
+        np.testing.assert_array_equal(*context_ids)
+        _, info = venv.reset(seed=3)
+        np.testing.assert_array_equal(info["context_id"], context_ids[0])
+
+    def test_flat_obs(self):
+        venv = CARLVectorPendulum(
+            num_envs=2, obs_context_features=["g", "l"], flatten_obs=True, seed=0
+        )
+        obs, _ = venv.reset()
+        self.assertEqual(obs.shape, (2, 5))
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertIn(obs[0], venv.single_observation_space)
+        next_obs, *_ = venv.step(venv.action_space.sample())
+        self.assertIsNot(next_obs, obs)
+
+        venv = CARLVectorPendulum(num_envs=2, flatten_obs="inplace", seed=0)
+        obs, _ = venv.reset()
+        next_obs, *_ = venv.step(venv.action_space.sample())
+        self.assertIs(next_obs, obs)
+
+    def test_autoreset(self):
+        contexts = {0: {"gravity": 9.8}, 1: {"gravity": 20.0}, 2: {"gravity": 5.0}}
+        venv = CARLVectorCartPole(num_envs=2, contexts=contexts, seed=0)
+        venv.reset()
+        venv.state[0] = [3.0, 0.0, 0.0, 0.0]
+        obs, _, terminated, truncated, info = venv.step(np.zeros(2, dtype=np.int64))
+        np.testing.assert_array_equal(terminated, [True, False])
+        np.testing.assert_array_equal(info["_final_observation"], [True, False])
+        self.assertGreater(info["final_observation"][0]["obs"][0], 2.4)
+        self.assertEqual(info["final_info"][0]["context_id"], 0)
+        self.assertEqual(info["context_id"][0], 2)
+        self.assertLess(abs(obs["obs"][0, 0]), 2.4)
+
+        venv = CARLVectorPendulum(num_envs=2, seed=0)
+        venv.reset()
+        for _ in range(venv.max_episode_steps):
+            _, _, terminated, truncated, _ = venv.step(venv.action_space.sample())
+        self.assertFalse(terminated.any())
+        self.assertTrue(truncated.all())